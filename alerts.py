@@ -0,0 +1,255 @@
+import bisect
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+from data_paths import data_path
+
+# 스캔 결과 변화 알림 엔진
+# 스캔 스냅샷이 들어올 때마다 종목별 직전 값과 비교해 값이 바뀐 종목/필드만 규칙을 확인합니다.
+# (처음 보는 종목은 기준값만 저장하고 알림 없음)
+# 규칙은 필드별로 미리 색인해 두므로 규칙 수와 무관하게 바뀐 값 1개당 사전 조회/이진 탐색 1번으로 끝납니다.
+#   enters / exits : 값이 value가 됨 / value에서 벗어남 (예: 추천이 "🔥 강력 매수"로 진입)
+#   contains       : 새 값에 value 문자열이 포함됨 (직전 값에는 없음)
+#   changes        : 값이 바뀌면 항상
+#   crosses_above / crosses_below : 숫자가 value를 상향/하향 돌파 (예: 점수 7점 돌파)
+# 알림은 싱크(알림 리스트를 받는 함수) 목록으로 전달합니다. 기본: 콘솔 로그 + JSONL 파일.
+
+# 규칙 파일 경로 (JSON 리스트, 없으면 DEFAULT_ALERT_RULES)
+ALERT_RULES_PATH = os.environ.get(
+    "TTEOKSANG_ALERT_RULES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "alert_rules.json")
+)
+ALERT_STATE_PATH = data_path("alerts", "state.json")   # 소스별 종목별 직전 값
+ALERT_LOG_PATH = data_path("alerts", "alerts.jsonl")   # 발생한 알림 기록
+
+# source를 생략한 규칙은 모든 소스에 적용
+DEFAULT_ALERT_RULES = [
+    {"id": "yf_strong_buy", "source": "yf_swing", "field": "recommendation", "type": "enters",
+     "value": "🔥 강력 매수 (과매도 반등)", "message": "🔥 강력 매수 진입"},
+    {"id": "yf_strong_sell", "source": "yf_swing", "field": "recommendation", "type": "enters",
+     "value": "📉 강력 매도 (추세 이탈/과매수)", "message": "📉 강력 매도 진입"},
+    {"id": "score_cross_up_7", "field": "score", "type": "crosses_above", "value": 7.0,
+     "message": "점수 7점 상향 돌파"},
+    {"id": "score_cross_down_5", "field": "score", "type": "crosses_below", "value": 5.0,
+     "message": "점수 5점 하향 이탈"},
+    {"id": "macd_turn_up", "source": "yf_swing", "field": "MACD_Trend", "type": "enters", "value": "양전환",
+     "message": "MACD 양전환"},
+    # Alpaca 투자 의견은 혼조 상태("혼조 (매수/매도 신호 충돌)" 등)에도 매수/매도 문구가 들어가므로 정확한 라벨로만 판단
+    {"id": "ap_opinion_buy", "source": "ap_swing", "field": "recommendation", "type": "enters", "value": "매수",
+     "message": "투자 의견 매수 전환"},
+    {"id": "ap_opinion_sell", "source": "ap_swing", "field": "recommendation", "type": "enters", "value": "매도",
+     "message": "투자 의견 매도 전환"},
+]
+
+RULE_TYPES = {"enters", "exits", "contains", "changes", "crosses_above", "crosses_below"}
+
+# 결과 딕셔너리 컬럼 별칭 (scan_history의 공통 컬럼과 같은 의미)
+FIELD_ALIASES = {
+    "recommendation": ["Recommendation", "trade_opinion"],
+    "score": ["Score"],
+}
+
+
+# ✅ 규칙 파일 로드 (없거나 잘못되면 기본 규칙)
+def load_alert_rules(path: str = None):
+    path = path or ALERT_RULES_PATH
+    if not os.path.exists(path):
+        return DEFAULT_ALERT_RULES
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+        return [rule for rule in rules if rule.get("type") in RULE_TYPES and rule.get("field")]
+    except (OSError, ValueError, TypeError, AttributeError):
+        return DEFAULT_ALERT_RULES
+
+
+def _field_value(row: dict, field: str):
+    for name in FIELD_ALIASES.get(field, [field]):
+        value = row.get(name)
+        if value is not None:
+            return None if isinstance(value, float) and value != value else value  # NaN -> None
+    return None
+
+
+def _as_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# ✅ 규칙 색인: {field: {"enters": {값: [규칙]}, "exits": {...}, "contains": [...], "changes": [...],
+#                       "crosses_above": (정렬된 기준값, [규칙]), "crosses_below": (...)}}
+def build_rule_index(rules: list):
+    index = {}
+    for rule in rules:
+        entry = index.setdefault(rule["field"], {"enters": {}, "exits": {}, "contains": [], "changes": [],
+                                                 "crosses_above": [], "crosses_below": []})
+        kind = rule["type"]
+        if kind in ("enters", "exits"):
+            entry[kind].setdefault(rule["value"], []).append(rule)
+        else:
+            entry[kind].append(rule)
+    for entry in index.values():
+        for kind in ("crosses_above", "crosses_below"):
+            ordered = sorted(entry[kind], key=lambda r: float(r["value"]))
+            entry[kind] = ([float(r["value"]) for r in ordered], ordered)
+    return index
+
+
+# ✅ 필드 값 1개 변화에 걸리는 규칙
+def match_rules(entry: dict, previous, current):
+    matched = list(entry["changes"])
+    matched += entry["enters"].get(current, [])
+    matched += entry["exits"].get(previous, [])
+    if entry["contains"] and isinstance(current, str):
+        matched += [r for r in entry["contains"]
+                    if r["value"] in current and not (isinstance(previous, str) and r["value"] in previous)]
+
+    prev_num, curr_num = _as_number(previous), _as_number(current)
+    if prev_num is not None and curr_num is not None:
+        thresholds, ordered = entry["crosses_above"]
+        if thresholds and curr_num > prev_num:
+            # prev < 기준값 <= curr
+            matched += ordered[bisect.bisect_right(thresholds, prev_num):bisect.bisect_right(thresholds, curr_num)]
+        thresholds, ordered = entry["crosses_below"]
+        if thresholds and curr_num < prev_num:
+            # curr < 기준값 <= prev
+            matched += ordered[bisect.bisect_right(thresholds, curr_num):bisect.bisect_right(thresholds, prev_num)]
+    return matched
+
+
+# ✅ 콘솔 로그 싱크
+def log_sink(alerts: list):
+    for alert in alerts:
+        print(f"🔔 [{alert['source']}] {alert['ticker']}: {alert['message']} "
+              f"({alert['previous']} -> {alert['current']})")
+
+
+# ✅ JSONL 파일 싱크 (알림 1건 = 1줄)
+def jsonl_sink(path: str = ALERT_LOG_PATH):
+    lock = threading.Lock()
+
+    def sink(alerts: list):
+        with lock, open(path, "a", encoding="utf-8") as f:
+            for alert in alerts:
+                f.write(json.dumps(alert, ensure_ascii=False, default=str) + "\n")
+
+    return sink
+
+
+# ✅ 최근 알림 조회 (JSONL 파일 끝에서 limit건, 최신순)
+def load_recent_alerts(limit: int = 50, path: str = ALERT_LOG_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        lines = deque(f, maxlen=limit)
+    alerts = []
+    for line in reversed(lines):
+        try:
+            alerts.append(json.loads(line))
+        except ValueError:
+            continue
+    return alerts
+
+
+class AlertEngine:
+    # rules: 규칙 리스트 / sinks: 알림 리스트를 받는 함수 목록 / state_path: 직전 값 저장 파일 (None이면 메모리만)
+    def __init__(self, rules: list = None, sinks: list = None, state_path: str = None):
+        self.rules = rules if rules is not None else load_alert_rules()
+        self.sinks = sinks if sinks is not None else [log_sink]
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._indexes = {}  # source -> 규칙 색인
+        self._state = self._load_state()
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        tmp_path = f"{self.state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, self.state_path)
+
+    def _index_for(self, source: str):
+        if source not in self._indexes:
+            rules = [r for r in self.rules if r.get("source") in (None, source)]
+            self._indexes[source] = build_rule_index(rules)
+        return self._indexes[source]
+
+    # ✅ 스냅샷 1회 평가 -> 발생한 알림 리스트 (싱크로도 전달)
+    # results에 없는 종목은 그대로 두므로 일부 종목만 다시 분석한 결과도 넣을 수 있습니다.
+    def evaluate(self, results: list, source: str, scanned_at: datetime = None):
+        index = self._index_for(source)
+        if not index:
+            return []
+        alerted_at = (scanned_at or datetime.now()).isoformat(timespec="seconds")
+        alerts = []
+        with self._lock:
+            known = self._state.setdefault(source, {})
+            changed = False
+            for row in results:
+                ticker = str(row.get("ticker", "")).upper()
+                recommendation = _field_value(row, "recommendation")
+                if not ticker or (isinstance(recommendation, str) and recommendation.startswith("❌")):
+                    continue  # 분석 실패 결과는 상태로 쓰지 않음
+                values = {field: _field_value(row, field) for field in index}
+                previous = known.get(ticker)
+                if previous == values:
+                    continue
+                known[ticker] = values
+                changed = True
+                if previous is None:
+                    continue  # 처음 보는 종목: 기준값만 저장
+                for field, current in values.items():
+                    before = previous.get(field)
+                    if field not in previous or before == current:
+                        continue  # 규칙이 새로 추가된 필드는 이번 값이 기준값
+                    for rule in match_rules(index[field], before, current):
+                        alerts.append({
+                            "alerted_at": alerted_at, "source": source, "ticker": ticker,
+                            "rule_id": rule["id"], "field": field, "previous": before, "current": current,
+                            "message": rule.get("message", rule["id"]),
+                        })
+            if changed:
+                self._save_state()
+
+        for sink in self.sinks if alerts else []:
+            try:
+                sink(alerts)
+            except Exception as e:
+                print(f"❌ 알림 전송 실패 ({getattr(sink, '__name__', sink)}): {e}")
+        return alerts
+
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+
+def get_default_engine():
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = AlertEngine(sinks=[log_sink, jsonl_sink(ALERT_LOG_PATH)], state_path=ALERT_STATE_PATH)
+        return _default_engine
+
+
+# ✅ 기본 엔진으로 알림 확인 (실패해도 분석 흐름을 막지 않음)
+def check_alerts(results: list, source: str, scanned_at: datetime = None):
+    try:
+        return get_default_engine().evaluate(results, source, scanned_at)
+    except Exception as e:
+        print(f"❌ 알림 확인 실패 ({source}): {e}")
+        return []
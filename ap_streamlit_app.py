@@ -1,6 +1,20 @@
 import streamlit as st
 import pandas as pd
-from ap_swing_stock_data import merge_swing_data  # 분리된 로직 파일에서 함수 임포트
+from batch_runner import AP_DEFAULT_SYMBOLS, get_fresh_items, update_section_items
+from position_sizing import (DEFAULT_ACCOUNT_EQUITY, DEFAULT_ATR_MULTIPLE, DEFAULT_MAX_HEAT_PCT,
+                             DEFAULT_MAX_POSITION_PCT, DEFAULT_RISK_PCT, plan_positions)
+
+
+# ✅ 분리된 로직 파일의 분석 함수 (첫 호출 시 임포트 - 배치 결과가 유효하면 시작 시 로드하지 않음)
+def merge_swing_data(symbols, **kwargs):
+    from ap_swing_stock_data import merge_swing_data as _merge_swing_data
+    return _merge_swing_data(symbols, **kwargs)
+
+
+def refresh_swing_data(symbols, **kwargs):
+    from ap_swing_stock_data import refresh_swing_data as _refresh_swing_data
+    return _refresh_swing_data(symbols, **kwargs)
+
 
 # Streamlit 앱 시작
 st.set_page_config(layout="wide", page_title="주식 스윙 분석기")
@@ -13,7 +27,7 @@ st.markdown("""
 
 # --- 세션 상태 초기화 ---
 if 'symbols_to_analyze' not in st.session_state:
-    st.session_state.symbols_to_analyze = ["SMCI", "OPTT", "APP"]  # 초기 분석할 종목 리스트
+    st.session_state.symbols_to_analyze = list(AP_DEFAULT_SYMBOLS)  # 초기 분석할 종목 리스트
 
 if 'new_symbol_input_value' not in st.session_state:
     st.session_state.new_symbol_input_value = ""
@@ -21,7 +35,18 @@ if 'new_symbol_input_value' not in st.session_state:
 # 분석 완료된 종목 목록과 그 결과를 저장하는 캐시
 # {'ticker': {...analysis_data...}, 'ticker2': {...}} 형태
 if 'all_swing_data_cache' not in st.session_state:
-    st.session_state.all_swing_data_cache = {}
+    # 배치 실행기가 미리 계산한 결과 중 유효한 것은 바로 채워 넣음 (오래된 종목은 '새로 추가된 종목 분석'에서 계산)
+    st.session_state.all_swing_data_cache = get_fresh_items("ap_watchlist", st.session_state.symbols_to_analyze)
+
+# --- 포지션 크기 / 리스크 예산 설정 (매수 신호 종목의 손절가·수량 계산에 사용) ---
+st.sidebar.header("💼 리스크 예산")
+account_equity = st.sidebar.number_input("계좌 평가금액 ($)", min_value=1.0, value=float(DEFAULT_ACCOUNT_EQUITY),
+                                         step=1000.0, key="account_equity")
+risk_per_trade_pct = st.sidebar.slider("거래당 리스크 (%)", 0.1, 5.0, DEFAULT_RISK_PCT, 0.1, key="risk_per_trade_pct")
+stop_atr_multiple = st.sidebar.slider("손절 폭 (ATR 배수)", 0.5, 5.0, DEFAULT_ATR_MULTIPLE, 0.5, key="stop_atr_multiple")
+max_position_pct = st.sidebar.slider("종목당 최대 비중 (%)", 1.0, 100.0, DEFAULT_MAX_POSITION_PCT, 1.0,
+                                     key="max_position_pct")
+max_heat_pct = st.sidebar.slider("포트폴리오 리스크 한도 (%)", 1.0, 20.0, DEFAULT_MAX_HEAT_PCT, 0.5, key="max_heat_pct")
 
 st.header("종목 관리")
 
@@ -104,6 +129,7 @@ def reanalyze_all_symbols():
                 st.session_state.all_swing_data_cache = {}
                 for result in all_results:
                     st.session_state.all_swing_data_cache[result['ticker']] = result
+                update_section_items("ap_watchlist", {r['ticker']: r for r in all_results})
                 st.success("모든 종목 재분석 완료!")
             else:
                 st.error("모든 종목 재분석에 실패했습니다. 일부 종목의 데이터가 없거나 API 오류일 수 있습니다.")
@@ -111,8 +137,29 @@ def reanalyze_all_symbols():
     else:
         st.warning("분석할 종목이 없습니다. 종목을 추가해주세요.")
 
+# --- 증분 새로고침 함수 (마지막 분석 이후 새 봉만 반영, 지표가 바뀐 종목만 신호 재계산) ---
+def refresh_all_symbols():
+    if st.session_state.symbols_to_analyze:
+        with st.spinner("새 봉을 반영하는 중입니다..."):
+            refreshed_results = refresh_swing_data(
+                st.session_state.symbols_to_analyze,
+                rsi_period=14, ma_periods=[5, 20, 50], bb_period=20, bb_num_std_dev=2,
+                macd_short=12, macd_long=26, macd_signal=9, vma_period=20,
+                stoch_k_period=14, stoch_d_period=3, atr_period=14, adx_period=14
+            )
+            if refreshed_results:
+                for result in refreshed_results:
+                    st.session_state.all_swing_data_cache[result['ticker']] = result
+                update_section_items("ap_watchlist", {r['ticker']: r for r in refreshed_results})
+                st.success("새 봉 반영 완료!")
+            else:
+                st.error("새로고침에 실패했습니다. 일부 종목의 데이터가 없거나 API 오류일 수 있습니다.")
+        st.rerun()
+    else:
+        st.warning("분석할 종목이 없습니다. 종목을 추가해주세요.")
+
 # --- 분석 버튼 및 전체 재분석 버튼 ---
-col_start, col_reanalyze_all = st.columns(2)
+col_start, col_refresh_all, col_reanalyze_all = st.columns(3)
 
 with col_start:
     if st.button("새로 추가된 종목 분석 시작", key="start_analysis_button"):
@@ -137,6 +184,7 @@ with col_start:
                     for result in newly_analyzed_results:
                         ticker = result['ticker']
                         st.session_state.all_swing_data_cache[ticker] = result
+                    update_section_items("ap_watchlist", {r['ticker']: r for r in newly_analyzed_results})
                     st.success("새롭게 추가된 종목 분석 완료!")
                 else:
                     st.warning(
@@ -144,6 +192,10 @@ with col_start:
         else:
             st.warning("분석할 종목이 없습니다. 종목을 추가해주세요.")
 
+with col_refresh_all:
+    if st.button("⚡ 새 봉만 반영해 새로고침", key="refresh_all_button"):
+        refresh_all_symbols()
+
 with col_reanalyze_all:
     if st.button("모든 종목 전체 재분석", key="reanalyze_all_button"):
         reanalyze_all_symbols()
@@ -159,8 +211,14 @@ if st.session_state.all_swing_data_cache:
 
     if all_swing_data_summary:
         st.header("📊 분석 결과 요약")
+        position_plan, heat_summary = plan_positions(
+            all_swing_data_summary, equity=account_equity, risk_pct=risk_per_trade_pct,
+            atr_multiple=stop_atr_multiple, max_position_pct=max_position_pct, max_heat_pct=max_heat_pct)
+        position_by_ticker = position_plan.set_index("ticker").to_dict("index")
+
         summary_df_data = []
         for item in all_swing_data_summary:
+            position = position_by_ticker.get(item['ticker'])
             summary_df_data.append({
                 "종목": item['ticker'],
                 "현재가": f"{item['current_price']:.2f}" if item['current_price'] is not None else "N/A",
@@ -172,10 +230,29 @@ if st.session_state.all_swing_data_cache:
                 "투자 의견": item['trade_opinion'],
                 "매수 적정가": f"{item['buy_target_price']:.2f}" if item['buy_target_price'] is not None else "N/A",
                 "매도 적정가": f"{item['sell_target_price']:.2f}" if item['sell_target_price'] is not None else "N/A",
+                "손절가": f"{position['stop']:.2f}" if position and pd.notna(position['stop']) else "-",
+                "수량": f"{position['shares']:,}" if position else "-",
+                "투자 비중(%)": f"{position['position_pct']:.1f}" if position and pd.notna(position['position_pct']) else "-",
+                "위험 금액($)": f"{position['dollar_risk']:.0f}" if position and pd.notna(position['dollar_risk']) else "-",
+                "R 배수": f"{position['r_multiple']:.2f}" if position and pd.notna(position['r_multiple']) else "-",
             })
         summary_df = pd.DataFrame(summary_df_data)
         st.dataframe(summary_df, use_container_width=True)
 
+        # 매수 신호 종목 전체를 동시에 들고 있다가 모두 손절될 때의 손실 (포트폴리오 열)
+        st.subheader("💼 포지션 계획 / 포트폴리오 리스크")
+        col_heat, col_invested, col_cash, col_positions = st.columns(4)
+        col_heat.metric("포트폴리오 리스크", f"{heat_summary['heat_pct']:.2f}%" if heat_summary['heat_pct'] is not None
+                        else "N/A", help=f"한도 {heat_summary['max_heat_pct']:.1f}%")
+        col_invested.metric("총 투자금", f"${heat_summary['invested']:,.0f}")
+        col_cash.metric("남는 현금", f"${heat_summary['cash']:,.0f}")
+        col_positions.metric("매수 종목 수", heat_summary['positions'])
+        if heat_summary['capped']:
+            st.warning(f"⚠️ 계산된 수량의 포트폴리오 리스크가 {heat_summary['heat_before_cap_pct']:.2f}%로 "
+                       f"한도 또는 계좌 금액을 넘어 모든 수량을 같은 비율로 줄였습니다.")
+        elif position_plan.empty:
+            st.info("현재 매수 신호가 있는 종목이 없습니다.")
+
         st.header("🔍 상세 분석")
         for item in all_swing_data_summary:
             with st.expander(f"**{item['ticker']} 상세 분석**"):
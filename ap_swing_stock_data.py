@@ -1,8 +1,12 @@
-import requests
+import threading
 from datetime import datetime, timedelta
 import pandas as pd
 import pytz
 import streamlit as st
+from rule_engine import evaluate_trade_frame
+from scan_history import record_scan, SOURCE_AP_SWING
+from async_fetch import open_session, fetch_json, fetch_many, run_sync
+from indicator_state import seed_state
 
 headers = {
     'accept': 'application/json',
@@ -10,14 +14,69 @@ headers = {
     'APCA-API-SECRET-KEY': st.secrets['API_SECRET_KEY']
 }
 
+PRICE_BASE_URL = 'https://data.alpaca.markets/v2/stocks/bars'
+LATEST_BAR_URL = 'https://data.alpaca.markets/v2/stocks/bars/latest'
+BARS_SYMBOLS_PER_REQUEST = 20  # 일봉 요청 1건당 종목 수 (여러 건을 동시에 요청)
+
+# 증분 새로고침(refresh_swing_data) 상태를 처음부터 다시 만드는 주기 (일)
+# 전체 분석은 항상 최근 1년 봉으로 계산하므로, 오래 이어 붙인 상태(EWM 시작점, OBV 누적)와 차이가 벌어지지 않게 함
+STATE_RESEED_DAYS = 5
+
+_swing_states = {}  # symbol -> {"params", "state", "seeded_on", "indicators", "item"}
+_swing_states_lock = threading.Lock()
+
+
+# ✅ 일봉 조회 (next_page_token 페이지를 끝까지 따라감)
+async def fetch_daily_bars_async(session, symbols: list, params: dict):
+    bars = {}
+    page_params = dict(params, symbols=','.join(symbols))
+    while True:
+        data = await fetch_json(session, PRICE_BASE_URL, params=page_params, timeout=30)
+        for symbol, symbol_bars in (data.get('bars') or {}).items():
+            bars.setdefault(symbol, []).extend(symbol_bars)
+        next_page_token = data.get('next_page_token')
+        if not next_page_token:
+            return bars
+        page_params = dict(page_params, page_token=next_page_token)
+
+
+# ✅ 최신 봉 조회
+async def fetch_latest_bars_async(session, symbols: list):
+    data = await fetch_json(session, LATEST_BAR_URL, params={'symbols': ','.join(symbols), 'feed': 'delayed_sip'})
+    return data.get('bars') or {}
+
+
+# ✅ 일봉(종목 묶음별) + 최신 봉을 한 이벤트 루프에서 동시 조회
+async def fetch_price_base_async(symbols: list, daily_bar_params: dict):
+    return await fetch_price_groups_async([(symbols, daily_bar_params)], symbols)
+
+
+# ✅ 조회 기간이 다른 종목 그룹별 일봉 + 최신 봉 동시 조회 (groups: [(종목 리스트, 일봉 파라미터)])
+async def fetch_price_groups_async(groups: list, latest_symbols: list):
+    requests = []
+    for symbols, params in groups:
+        for i in range(0, len(symbols), BARS_SYMBOLS_PER_REQUEST):
+            requests.append((symbols[i:i + BARS_SYMBOLS_PER_REQUEST], params))
+    async with open_session(headers) as session:
+        results = await fetch_many(
+            [fetch_daily_bars_async(session, chunk, params) for chunk, params in requests]
+            + [fetch_latest_bars_async(session, latest_symbols)]
+        )
+    daily_data = {}
+    for (chunk, _), result in zip(requests, results[:-1]):
+        if isinstance(result, Exception):
+            print(f"❌ 일봉 조회 실패 ({','.join(chunk)}): {result}")
+            continue
+        daily_data.update(result)
+    latest_data = results[-1]
+    if isinstance(latest_data, Exception):
+        print(f"❌ 최신 봉 조회 실패: {latest_data}")
+        latest_data = {}
+    return daily_data, latest_data
 
-# ✅ 가격 기본 정보(1년치)
-def price_base_data(symbols: list):
-    price_base_url = 'https://data.alpaca.markets/v2/stocks/bars'
-    latest_bar_url = 'https://data.alpaca.markets/v2/stocks/bars/latest'
-
-    timeframe = '1D'
 
+# ✅ 일봉 조회 기간 (종료일: 2일 전 평일, 시작일: 종료일 1년 전) -> (start, end) 'YYYY-MM-DD'
+def daily_bar_window():
     seoul_tz = pytz.timezone('Asia/Seoul')
     now_seoul = datetime.now(seoul_tz)
     today_date = now_seoul.date()
@@ -28,9 +87,12 @@ def price_base_data(symbols: list):
     end = end.strftime('%Y-%m-%d')
 
     start = (datetime.strptime(end, '%Y-%m-%d').date() - timedelta(days=365)).strftime('%Y-%m-%d')
+    return start, end
 
-    daily_bar_params = {
-        'symbols': ','.join(symbols),
+
+def daily_bar_params(start: str, end: str):
+    timeframe = '1D'
+    return {
         'timeframe': timeframe,
         'start': start,
         'end': end,
@@ -40,25 +102,29 @@ def price_base_data(symbols: list):
         'sort': 'asc'
     }
 
-    daily_response = requests.get(price_base_url, headers=headers, params=daily_bar_params)
-    daily_data = daily_response.json().get('bars', {})
 
-    latest_params = {
-        'symbols': ','.join(symbols),
-        'feed': 'delayed_sip'
-    }
-    latest_response = requests.get(latest_bar_url, headers=headers, params=latest_params)
-    latest_data = latest_response.json().get('bars', {})
+# ✅ 가격 기본 정보(1년치) -> (종목별 확정 일봉, 종목별 최신 봉)
+def price_base_parts(symbols: list):
+    start, end = daily_bar_window()
+    return run_sync(fetch_price_base_async(symbols, daily_bar_params(start, end)))
+
 
+def _combine_price_parts(symbols: list, daily_data: dict, latest_data: dict):
     final_data = {}
     for symbol in symbols:
-        final_data[symbol] = daily_data.get(symbol, [])
+        final_data[symbol] = list(daily_data.get(symbol, []))
         if symbol in latest_data and latest_data[symbol] is not None:
             latest_bar_for_symbol = latest_data[symbol]
             final_data[symbol].append(latest_bar_for_symbol)
     return final_data
 
 
+# ✅ 가격 기본 정보(1년치, 마지막 봉은 최신 봉)
+def price_base_data(symbols: list):
+    daily_data, latest_data = price_base_parts(symbols)
+    return _combine_price_parts(symbols, daily_data, latest_data)
+
+
 # ✅ rsi 계산
 def calculate_rsi(price_data: dict, period: int = 14):
     rsi_results = {}
@@ -288,128 +354,69 @@ def calculate_adx(price_data: dict, period: int = 14):
 
 
 # ✅ 매수/매도 로직 함수
+# 규칙은 rule_engine.TRADE_BUY_RULES / TRADE_SELL_RULES에 선언되어 있으며,
+# 여러 종목은 determine_trade_signals_batch로 한 번에 평가합니다.
 def determine_trade_signals(symbol_data: dict):
-    current_price = symbol_data.get('current_price')
-    previous_close = symbol_data.get('previous_close')
-    volume = symbol_data.get('volume')
-    rsi = symbol_data.get('rsi')
-    ma_5 = symbol_data.get('ma_5')
-    ma_20 = symbol_data.get('ma_20')
-    ma_50 = symbol_data.get('ma_50')
-    bb_upper = symbol_data.get('bb_upper')
-    bb_lower = symbol_data.get('bb_lower')
-    macd_line = symbol_data.get('macd_line')
-    macd_signal = symbol_data.get('macd_signal')
-    stoch_k = symbol_data.get('stoch_k')
-    stoch_d = symbol_data.get('stoch_d')
-    atr = symbol_data.get('atr')
-    adx = symbol_data.get('adx')
-    plus_di = symbol_data.get('plus_di')
-    minus_di = symbol_data.get('minus_di')
-    vma = symbol_data.get('vma')
-
-    buy_signal_reasons = []
-    sell_signal_reasons = []
-
-    buy_target_price = None
-    sell_target_price = None
-
-    if current_price is None or previous_close is None:
-        return {'buy_signal': False, 'sell_signal': False, 'trade_opinion': '데이터 부족',
-                'buy_reasons': [], 'sell_reasons': [],
-                'buy_target_price': None, 'sell_target_price': None}
-
-    # --- 매수 신호 판단 ---
-    if rsi is not None and rsi <= 30:
-        buy_signal_reasons.append("RSI 과매도 (<= 30)")
-    if ma_5 is not None and ma_20 is not None and ma_50 is not None:
-        if ma_5 > ma_20 and ma_20 > ma_50 and current_price > ma_50:
-            buy_signal_reasons.append("이동평균선 정배열 및 주가 MA50 상회")
-        elif ma_5 > ma_20 and current_price > ma_5:
-            buy_signal_reasons.append("MA5가 MA20 상회하며 주가 상승 추세")
-    if current_price is not None and ma_5 is not None and ma_20 is not None and ma_50 is not None:
-        if current_price > ma_5 and current_price > ma_20 and current_price > ma_50:
-            buy_signal_reasons.append("현재가가 모든 주요 이동평균선 위에 위치")
-    if current_price is not None and bb_lower is not None and bb_upper is not None:
-        if current_price < bb_lower * 1.01:
-            buy_signal_reasons.append("볼린저 밴드 하단 근접")
-    if macd_line is not None and macd_signal is not None and macd_line > macd_signal:
-        buy_signal_reasons.append("MACD 골든크로스 (MACD > Signal)")
-    if stoch_k is not None and stoch_d is not None and stoch_k <= 20 and stoch_k > stoch_d:
-        buy_signal_reasons.append("스토캐스틱 과매도 구간에서 상승 전환 (K > D, K<=20)")
-    if atr is not None and current_price is not None and previous_close is not None:
-        if current_price > (previous_close + atr):
-            buy_signal_reasons.append(f"ATR 상향 돌파 (전일 종가 + {atr:.2f} 이상)")
-    if adx is not None and adx > 25 and plus_di is not None and minus_di is not None and plus_di > minus_di:
-        buy_signal_reasons.append("강한 상승 추세 (ADX > 25, +DI > -DI)")
-
-    # --- 매도 신호 판단 ---
-    if rsi is not None and rsi >= 70:
-        sell_signal_reasons.append("RSI 과매수 (>= 70)")
-    if ma_5 is not None and ma_20 is not None and ma_50 is not None:
-        if ma_5 < ma_20 and ma_20 < ma_50 and current_price < ma_50:
-            sell_signal_reasons.append("이동평균선 역배열 및 주가 MA50 하회")
-        elif ma_5 < ma_20 and current_price < ma_5:
-            sell_signal_reasons.append("MA5가 MA20 하회하며 주가 하락 추세")
-    if current_price is not None and bb_upper is not None:
-        if current_price > bb_upper * 0.99:
-            sell_signal_reasons.append("볼린저 밴드 상단 근접")
-    if macd_line is not None and macd_signal is not None and macd_line < macd_signal:
-        sell_signal_reasons.append("MACD 데드크로스 (MACD < Signal)")
-    if stoch_k is not None and stoch_d is not None and stoch_k >= 80 and stoch_k < stoch_d:
-        sell_signal_reasons.append("스토캐스틱 과매수 구간에서 하락 전환 (K < D, K>=80)")
-    if atr is not None and current_price is not None and previous_close is not None:
-        if current_price < (previous_close - atr):
-            sell_signal_reasons.append(f"ATR 하향 돌파 (전일 종가 - {atr:.2f} 이하)")
-    if adx is not None and adx > 25 and plus_di is not None and minus_di is not None and minus_di > plus_di:
-        sell_signal_reasons.append("강한 하락 추세 (ADX > 25, -DI > +DI)")
-
-    # --- 거래량 필터링 ---
-    if volume is not None and vma is not None and volume > vma * 1.5:
-        if buy_signal_reasons:
-            buy_signal_reasons.append("높은 거래량 동반 매수 신호 (Volume > 1.5 * VMA)")
-        if sell_signal_reasons:
-            sell_signal_reasons.append("높은 거래량 동반 매도 신호 (Volume > 1.5 * VMA)")
-
-    # --- 매수/매도 적정 가격 판단 ---
-    if bb_lower is not None:
-        buy_target_price = bb_lower
-    elif ma_20 is not None:
-        buy_target_price = ma_20
-    if bb_upper is not None:
-        sell_target_price = bb_upper
-    elif ma_20 is not None:
-        sell_target_price = ma_20
-
-    # --- 최종 신호 결정 로직 ---
-    actual_buy_signal = len(buy_signal_reasons) > 0
-    actual_sell_signal = len(sell_signal_reasons) > 0
-
-    trade_opinion = "관망"
-    if actual_buy_signal and actual_sell_signal:
-        if "ATR 상향 돌파" in buy_signal_reasons or "강한 상승 추세" in buy_signal_reasons:
-            trade_opinion = "강력 매수 (ATR 또는 ADX 기반 혼조)"
-        elif "ATR 하향 돌파" in sell_signal_reasons or "강한 하락 추세" in sell_signal_reasons:
-            trade_opinion = "강력 매도 (ATR 또는 ADX 기반 혼조)"
-        elif len(buy_signal_reasons) > len(sell_signal_reasons) and rsi is not None and rsi <= 35:
-            trade_opinion = "매수 고려 (혼조세 속 매수 우위)"
-        elif len(sell_signal_reasons) > len(buy_signal_reasons) and rsi is not None and rsi >= 65:
-            trade_opinion = "매도 고려 (혼조세 속 매도 우위)"
-        else:
-            trade_opinion = "혼조 (매수/매도 신호 충돌)"
-    elif actual_buy_signal:
-        trade_opinion = "매수"
-    elif actual_sell_signal:
-        trade_opinion = "매도"
+    return determine_trade_signals_batch([symbol_data])[0]
 
+
+# ✅ 매수/매도 로직 (종목 테이블 단위 벡터화 평가)
+def determine_trade_signals_batch(symbol_data_list: list):
+    if not symbol_data_list:
+        return []
+    signal_frame = evaluate_trade_frame(symbol_data_list)
+    return signal_frame.to_dict('records')
+
+
+# ✅ 지표 + 매매 신호 -> 화면/이력용 결과 딕셔너리
+def _build_item_data(symbol: str, symbol_indicators: dict, trade_signals: dict):
+    current_price = symbol_indicators['current_price']
+    previous_close = symbol_indicators['previous_close']
+
+    buy_reasons_str = ', '.join(trade_signals['buy_reasons']) if trade_signals['buy_reasons'] else '해당 없음'
+    sell_reasons_str = ', '.join(trade_signals['sell_reasons']) if trade_signals['sell_reasons'] else '해당 없음'
+
+    item_data = {
+        'ticker': symbol,
+        'volume': symbol_indicators['volume'],
+        'current_price': current_price,
+        'previous_close': previous_close,
+        'rsi': symbol_indicators['rsi'],
+        'ma_5': symbol_indicators['ma_5'],
+        'ma_20': symbol_indicators['ma_20'],
+        'ma_50': symbol_indicators['ma_50'],
+        'bb_middle': symbol_indicators['bb_middle'],
+        'bb_upper': symbol_indicators['bb_upper'],
+        'bb_lower': symbol_indicators['bb_lower'],
+        'macd_line': symbol_indicators['macd_line'],
+        'macd_signal': symbol_indicators['macd_signal'],
+        'macd_histogram': symbol_indicators['macd_histogram'],
+        'vma': symbol_indicators['vma'],
+        'obv': symbol_indicators['obv'],
+        'stoch_k': symbol_indicators['stoch_k'],
+        'stoch_d': symbol_indicators['stoch_d'],
+        'atr': symbol_indicators['atr'],
+        'adx': symbol_indicators['adx'],
+        'plus_di': symbol_indicators['plus_di'],
+        'minus_di': symbol_indicators['minus_di'],
+        'buy_signal': trade_signals['buy_signal'],
+        'buy_reasons': buy_reasons_str,
+        'buy_target_price': trade_signals['buy_target_price'],
+        'sell_signal': trade_signals['sell_signal'],
+        'sell_reasons': sell_reasons_str,
+        'sell_target_price': trade_signals['sell_target_price'],
+        'trade_opinion': trade_signals['trade_opinion']
+    }
+    return item_data
+
+
+def _indicator_params(rsi_period, ma_periods, bb_period, bb_num_std_dev, macd_short, macd_long, macd_signal,
+                      vma_period, stoch_k_period, stoch_d_period, atr_period, adx_period):
     return {
-        'buy_signal': actual_buy_signal,
-        'buy_reasons': buy_signal_reasons,
-        'buy_target_price': buy_target_price,
-        'sell_signal': actual_sell_signal,
-        'sell_reasons': sell_signal_reasons,
-        'sell_target_price': sell_target_price,
-        'trade_opinion': trade_opinion
+        "rsi_period": rsi_period, "ma_periods": tuple(ma_periods), "bb_period": bb_period,
+        "bb_num_std_dev": bb_num_std_dev, "macd_short": macd_short, "macd_long": macd_long,
+        "macd_signal": macd_signal, "vma_period": vma_period, "stoch_k_period": stoch_k_period,
+        "stoch_d_period": stoch_d_period, "atr_period": atr_period, "adx_period": adx_period,
     }
 
 
@@ -418,7 +425,8 @@ def merge_swing_data(symbols: list, rsi_period: int = 14, ma_periods: list = [5,
                      bb_num_std_dev: float = 2, macd_short: int = 12, macd_long: int = 26, macd_signal: int = 9,
                      vma_period: int = 20, stoch_k_period: int = 14, stoch_d_period: int = 3, atr_period: int = 14,
                      adx_period: int = 14):
-    historical_price_data = price_base_data(symbols)
+    daily_data, latest_data = price_base_parts(symbols)
+    historical_price_data = _combine_price_parts(symbols, daily_data, latest_data)
     if not historical_price_data:
         return []
 
@@ -433,7 +441,7 @@ def merge_swing_data(symbols: list, rsi_period: int = 14, ma_periods: list = [5,
     calculated_atr_data = calculate_atr(historical_price_data, period=atr_period)
     calculated_adx_data = calculate_adx(historical_price_data, period=adx_period)
 
-    final_data_list = []
+    symbol_indicators_list = []
     for symbol in symbols:
         current_price = None
         previous_close = None
@@ -475,42 +483,96 @@ def merge_swing_data(symbols: list, rsi_period: int = 14, ma_periods: list = [5,
             'minus_di': calculated_adx_data.get(symbol, {}).get('minus_di')
         }
 
-        trade_signals = determine_trade_signals(symbol_indicators)
+        symbol_indicators_list.append(symbol_indicators)
 
-        buy_reasons_str = ', '.join(trade_signals['buy_reasons']) if trade_signals['buy_reasons'] else '해당 없음'
-        sell_reasons_str = ', '.join(trade_signals['sell_reasons']) if trade_signals['sell_reasons'] else '해당 없음'
+    all_trade_signals = determine_trade_signals_batch(symbol_indicators_list)
 
-        item_data = {
-            'ticker': symbol,
-            'volume': symbol_indicators['volume'],
-            'current_price': current_price,
-            'previous_close': previous_close,
-            'rsi': symbol_indicators['rsi'],
-            'ma_5': symbol_indicators['ma_5'],
-            'ma_20': symbol_indicators['ma_20'],
-            'ma_50': symbol_indicators['ma_50'],
-            'bb_middle': symbol_indicators['bb_middle'],
-            'bb_upper': symbol_indicators['bb_upper'],
-            'bb_lower': symbol_indicators['bb_lower'],
-            'macd_line': symbol_indicators['macd_line'],
-            'macd_signal': symbol_indicators['macd_signal'],
-            'macd_histogram': symbol_indicators['macd_histogram'],
-            'vma': symbol_indicators['vma'],
-            'obv': symbol_indicators['obv'],
-            'stoch_k': symbol_indicators['stoch_k'],
-            'stoch_d': symbol_indicators['stoch_d'],
-            'atr': symbol_indicators['atr'],
-            'adx': symbol_indicators['adx'],
-            'plus_di': symbol_indicators['plus_di'],
-            'minus_di': symbol_indicators['minus_di'],
-            'buy_signal': trade_signals['buy_signal'],
-            'buy_reasons': buy_reasons_str,
-            'buy_target_price': trade_signals['buy_target_price'],
-            'sell_signal': trade_signals['sell_signal'],
-            'sell_reasons': sell_reasons_str,
-            'sell_target_price': trade_signals['sell_target_price'],
-            'trade_opinion': trade_signals['trade_opinion']
-        }
-        final_data_list.append(item_data)
-
-    return final_data_list
\ No newline at end of file
+    final_data_list = []
+    for symbol, symbol_indicators, trade_signals in zip(symbols, symbol_indicators_list, all_trade_signals):
+        final_data_list.append(_build_item_data(symbol, symbol_indicators, trade_signals))
+
+    # 증분 새로고침용 지표 상태 저장 (확정 일봉으로 상태를 만들고, 최신 봉은 스냅샷에만 반영)
+    params = _indicator_params(rsi_period, ma_periods, bb_period, bb_num_std_dev, macd_short, macd_long, macd_signal,
+                               vma_period, stoch_k_period, stoch_d_period, atr_period, adx_period)
+    today = datetime.now().date()
+    with _swing_states_lock:
+        for item in final_data_list:
+            symbol = item['ticker']
+            state = seed_state(daily_data.get(symbol, []), params)
+            _swing_states[symbol] = {
+                "params": params, "state": state, "seeded_on": today,
+                "indicators": state.snapshot(latest_data.get(symbol)), "item": item,
+            }
+
+    record_scan(final_data_list, SOURCE_AP_SWING)
+    return final_data_list
+
+# ✅ 증분 새로고침 (마지막 분석 이후 새 일봉 + 최신 봉만 조회)
+# 종목별로 보관한 지표 상태(indicator_state)에 새 봉만 이어 붙이고, 지표가 바뀐 종목만 매매 신호를 다시 계산합니다.
+# 상태가 없거나 파라미터가 다르거나 STATE_RESEED_DAYS가 지난 종목은 merge_swing_data로 전체 분석합니다.
+def refresh_swing_data(symbols: list, rsi_period: int = 14, ma_periods: list = [5, 20, 50], bb_period: int = 20,
+                       bb_num_std_dev: float = 2, macd_short: int = 12, macd_long: int = 26, macd_signal: int = 9,
+                       vma_period: int = 20, stoch_k_period: int = 14, stoch_d_period: int = 3, atr_period: int = 14,
+                       adx_period: int = 14):
+    params = _indicator_params(rsi_period, ma_periods, bb_period, bb_num_std_dev, macd_short, macd_long, macd_signal,
+                               vma_period, stoch_k_period, stoch_d_period, atr_period, adx_period)
+    today = datetime.now().date()
+    with _swing_states_lock:
+        entries = {symbol: _swing_states.get(symbol) for symbol in symbols}
+
+    full_symbols, incremental_symbols = [], []
+    for symbol, entry in entries.items():
+        if (entry is None or entry["params"] != params or entry["state"].last_t is None
+                or (today - entry["seeded_on"]).days >= STATE_RESEED_DAYS):
+            full_symbols.append(symbol)
+        else:
+            incremental_symbols.append(symbol)
+
+    results = {}
+    if full_symbols:
+        for item in merge_swing_data(full_symbols, rsi_period, ma_periods, bb_period, bb_num_std_dev, macd_short,
+                                     macd_long, macd_signal, vma_period, stoch_k_period, stoch_d_period, atr_period,
+                                     adx_period):
+            results[item['ticker']] = item
+    if not incremental_symbols:
+        return [results[symbol] for symbol in symbols if symbol in results]
+
+    # 마지막 확정 봉 다음 날부터 조회 (시작일이 같은 종목끼리 묶어서 요청)
+    _, end = daily_bar_window()
+    groups = {}
+    for symbol in incremental_symbols:
+        last_date = datetime.strptime(entries[symbol]["state"].last_t[:10], '%Y-%m-%d').date()
+        start = (last_date + timedelta(days=1)).strftime('%Y-%m-%d')
+        if start <= end:
+            groups.setdefault(start, []).append(symbol)
+    daily_data, latest_data = run_sync(fetch_price_groups_async(
+        [(group_symbols, daily_bar_params(start, end)) for start, group_symbols in groups.items()],
+        incremental_symbols
+    ))
+
+    changed_symbols, changed_indicators = [], []
+    with _swing_states_lock:
+        for symbol in incremental_symbols:
+            entry = entries[symbol]
+            if symbol not in latest_data:
+                print(f"❌ 최신 봉 없음, 이전 결과 유지: {symbol}")
+                results[symbol] = entry["item"]
+                continue
+            for bar in daily_data.get(symbol, []):
+                entry["state"].update(bar)
+            indicators = entry["state"].snapshot(latest_data[symbol])
+            if indicators == entry["indicators"]:
+                results[symbol] = entry["item"]  # 입력이 같으면 매매 신호도 같음
+                continue
+            entry["indicators"] = indicators
+            changed_symbols.append(symbol)
+            changed_indicators.append(indicators)
+
+    for symbol, indicators, trade_signals in zip(changed_symbols, changed_indicators,
+                                                 determine_trade_signals_batch(changed_indicators)):
+        item = _build_item_data(symbol, indicators, trade_signals)
+        entries[symbol]["item"] = item
+        results[symbol] = item
+
+    record_scan([results[symbol] for symbol in incremental_symbols], SOURCE_AP_SWING)
+    return [results[symbol] for symbol in symbols if symbol in results]
@@ -0,0 +1,310 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import batch_runner
+import single_flight
+
+# 헤드리스 HTTP API (Streamlit 없이 분석 결과 조회)
+# 배치 실행기 아티팩트(data/precomputed/latest.json)를 공용 결과 캐시로 사용합니다.
+#   GET /analyze?tickers=AAPL,MSFT           yf 스윙 분석 (swing_stock_data)
+#   GET /analyze?tickers=SMCI,APP&source=ap  Alpaca 스윙 분석 (merge_swing_data)
+#   GET /market                              시장 스냅샷 (market_data)
+#   GET /gems                                보석 후보 (get_gem_candidates)
+# - 유효 시간(batch_runner.SECTION_TTL_SECONDS)이 지난 종목/섹션만 계산하고 결과는 아티팩트에 다시 저장
+#   (앱/배치/API가 같은 결과를 공유, 같은 계산이 동시에 들어오면 single_flight로 1건만 실행)
+# - /market, /gems는 요청 안에서 계산하지 않음: 오래된 결과를 stale 표시와 경과 시간(age_seconds)과 함께 바로 돌려주고
+#   백그라운드 스레드에서 다시 계산 (결과가 아직 없으면 202)
+# - 응답 본문 해시를 ETag로 보내고 If-None-Match가 같으면 304 (본문 없음)
+# - 아티팩트가 바뀌지 않았고 결과가 유효하면 직렬화해 둔 응답을 그대로 재사용 (높은 빈도 폴링용)
+# - 분석 실패 종목은 FAILURE_TTL_SECONDS 동안 다시 계산하지 않음
+# 계산 함수(providers)는 make_server에 넘겨 교체할 수 있습니다 (로컬 확인용 가짜 데이터 등).
+#
+# 사용 예:
+#   python api_server.py --port 8765
+#   curl 'http://127.0.0.1:8765/analyze?tickers=AAPL,MSFT'
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_TICKERS_PER_REQUEST = 50
+FAILURE_TTL_SECONDS = 60
+STALE_MAX_AGE_SECONDS = 10  # 오래된 섹션 응답의 max-age (백그라운드 계산이 끝나면 새 결과로 바뀜)
+MAX_RESPONSE_CACHE = 1024
+TICKER_PATTERN = re.compile(r"^[A-Z0-9.\-^=]{1,15}$")
+
+# 분석 경로 -> 아티팩트 섹션
+ANALYZE_SECTIONS = {"yf": "yf_watchlist", "ap": "ap_watchlist"}
+
+
+# ✅ 기본 계산 함수 (배치 실행기와 같은 함수, 종목 단위는 {ticker: result} 반환)
+def default_providers():
+    return {
+        "yf_watchlist": batch_runner.compute_yf_watchlist,
+        "ap_watchlist": batch_runner.compute_ap_watchlist,
+        "market": batch_runner.compute_market,
+        "gems": batch_runner.compute_gems,
+    }
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ResultService:
+    # 아티팩트 캐시 조회 + 누락분 계산 + 응답 캐시 (HTTP 처리와 분리)
+    def __init__(self, providers: dict = None):
+        self.providers = {**default_providers(), **(providers or {})}
+        self._lock = threading.Lock()
+        self._snapshot = (None, {})   # (아티팩트 mtime, 아티팩트)
+        self._responses = {}          # 요청 키 -> (mtime, 만료 시각, etag, 본문)
+        self._failures = {}           # (섹션, ticker) -> (실패 시각, 메시지)
+        self._refreshing = set()      # 백그라운드 계산 중인 섹션
+        self._section_errors = {}     # 섹션 -> (실패 시각, 메시지)
+
+    # ✅ 아티팩트 (파일이 바뀐 경우에만 다시 읽음)
+    def artifact(self):
+        try:
+            mtime = os.stat(batch_runner.ARTIFACT_PATH).st_mtime_ns
+        except OSError:
+            return None, {}
+        with self._lock:
+            if self._snapshot[0] == mtime:
+                return self._snapshot
+        artifact = batch_runner.load_artifact()
+        with self._lock:
+            self._snapshot = (mtime, artifact)
+        return mtime, artifact
+
+    def _fresh_items(self, section: str, tickers: list, artifact: dict):
+        ttl = batch_runner.SECTION_TTL_SECONDS[section]
+        items = (artifact.get(section) or {}).get("items", {})
+        fresh, expires_in = {}, float(ttl)
+        for ticker in tickers:
+            item = items.get(ticker)
+            remaining = batch_runner.seconds_until_stale(item.get("computed_at"), ttl) if item else 0.0
+            if remaining > 0:
+                fresh[ticker] = item["result"]
+                expires_in = min(expires_in, remaining)
+        return fresh, expires_in
+
+    def _recent_failures(self, section: str, tickers: list):
+        now = time.monotonic()
+        with self._lock:
+            return {t: entry[1] for t in tickers
+                    if (entry := self._failures.get((section, t))) and now - entry[0] <= FAILURE_TTL_SECONDS}
+
+    # ✅ 누락 종목 계산 -> 아티팩트 저장 (실패 종목은 잠시 기억)
+    def _compute_items(self, section: str, tickers: list):
+        results = single_flight.do(("api", section, tuple(tickers)), self.providers[section], tickers)
+        batch_runner.update_section_items(section, results)
+        now = time.monotonic()
+        with self._lock:
+            for ticker in tickers:
+                if ticker in results:
+                    self._failures.pop((section, ticker), None)
+                else:
+                    self._failures[(section, ticker)] = (now, "분석 실패 또는 데이터 부족")
+            if len(self._failures) > MAX_RESPONSE_CACHE:
+                self._failures = {k: v for k, v in self._failures.items() if now - v[0] <= FAILURE_TTL_SECONDS}
+
+    def _compute_section(self, section: str):
+        try:
+            batch_runner.update_section(section, single_flight.do(("api", section), self.providers[section]))
+        except Exception as e:
+            print(f"❌ {section} 백그라운드 계산 실패: {e}")
+            with self._lock:
+                self._section_errors[section] = (time.monotonic(), f"{section} 계산 실패: {e}")
+        else:
+            with self._lock:
+                self._section_errors.pop(section, None)
+        finally:
+            with self._lock:
+                self._refreshing.discard(section)
+                self._responses.pop(("section", section), None)  # 실패도 다음 요청에 바로 반영
+
+    # ✅ 섹션 백그라운드 재계산 시작 (이미 계산 중이거나 최근 실패했으면 건너뜀) -> 계산 중 여부
+    def _refresh_in_background(self, section: str):
+        with self._lock:
+            if section in self._refreshing:
+                return True
+            error = self._section_errors.get(section)
+            if error is not None and time.monotonic() - error[0] <= FAILURE_TTL_SECONDS:
+                return False
+            self._refreshing.add(section)
+        threading.Thread(target=self._compute_section, args=(section,), name=f"refresh-{section}", daemon=True).start()
+        return True
+
+    def _section_error(self, section: str):
+        with self._lock:
+            error = self._section_errors.get(section)
+        return error[1] if error is not None else None
+
+    def _cached_response(self, key, mtime):
+        with self._lock:
+            cached = self._responses.get(key)
+        if cached is not None and cached[0] == mtime and time.time() < cached[1]:
+            return cached[2], cached[3], cached[4], int(cached[1] - time.time())
+        return None
+
+    def _store_response(self, key, mtime, expires_in: float, payload: dict, status: int = 200):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+        with self._lock:
+            if len(self._responses) >= MAX_RESPONSE_CACHE:
+                self._responses.clear()
+            self._responses[key] = (mtime, time.time() + expires_in, status, etag, body)
+        return status, etag, body, int(expires_in)
+
+    # ✅ /analyze -> (상태 코드, etag, 본문, 남은 유효 시간(초))
+    def analyze(self, tickers: list, source: str = "yf"):
+        section = ANALYZE_SECTIONS.get(source)
+        if section is None:
+            raise ApiError(400, f"알 수 없는 source: {source} (yf, ap)")
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+        if not tickers:
+            raise ApiError(400, "tickers 파라미터가 필요합니다 (예: tickers=AAPL,MSFT)")
+        if len(tickers) > MAX_TICKERS_PER_REQUEST:
+            raise ApiError(400, f"한 번에 최대 {MAX_TICKERS_PER_REQUEST}개 종목까지 조회할 수 있습니다")
+        invalid = [t for t in tickers if not TICKER_PATTERN.match(t)]
+        if invalid:
+            raise ApiError(400, f"잘못된 종목 코드: {', '.join(invalid)}")
+
+        key = ("analyze", section, tuple(tickers))
+        mtime, artifact = self.artifact()
+        cached = self._cached_response(key, mtime)
+        if cached is not None:
+            return cached
+
+        fresh, _ = self._fresh_items(section, tickers, artifact)
+        failed = self._recent_failures(section, [t for t in tickers if t not in fresh])
+        missing = [t for t in tickers if t not in fresh and t not in failed]
+        if missing:
+            try:
+                self._compute_items(section, missing)
+            except Exception as e:
+                raise ApiError(503, f"{section} 계산 실패: {e}")
+            mtime, artifact = self.artifact()
+            fresh, _ = self._fresh_items(section, tickers, artifact)
+            failed = self._recent_failures(section, [t for t in tickers if t not in fresh])
+
+        _, expires_in = self._fresh_items(section, list(fresh), artifact)
+        if failed:
+            expires_in = min(expires_in, FAILURE_TTL_SECONDS)
+        payload = {"source": source, "results": [fresh[t] for t in tickers if t in fresh], "failed": failed}
+        return self._store_response(key, mtime, expires_in, payload)
+
+    # ✅ /market, /gems -> (상태 코드, etag, 본문, 남은 유효 시간(초))
+    # 유효하면 200, 오래됐으면 마지막 결과를 stale로 200 + 백그라운드 재계산, 결과가 아예 없으면 202
+    def section(self, section: str):
+        key = ("section", section)
+        mtime, artifact = self.artifact()
+        cached = self._cached_response(key, mtime)
+        if cached is not None:
+            return cached
+
+        ttl = batch_runner.SECTION_TTL_SECONDS[section]
+        entry = artifact.get(section) or {}
+        expires_in = batch_runner.seconds_until_stale(entry.get("computed_at"), ttl)
+        age = batch_runner.age_seconds(entry.get("computed_at"))
+        payload = {"computed_at": entry.get("computed_at"), "age_seconds": round(age) if age is not None else None,
+                   "stale": expires_in <= 0, "refreshing": False, "data": entry.get("data")}
+        if expires_in > 0:
+            return self._store_response(key, mtime, expires_in, payload)
+
+        payload["refreshing"] = self._refresh_in_background(section)
+        error = self._section_error(section)
+        if error is not None:
+            payload["error"] = error
+        if "data" not in entry:
+            if not payload["refreshing"]:
+                raise ApiError(503, error or f"{section} 계산 실패")
+            return self._store_response(key, mtime, STALE_MAX_AGE_SECONDS, payload, status=202)
+        return self._store_response(key, mtime, STALE_MAX_AGE_SECONDS, payload)
+
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "TteoksangAPI/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        service = self.server.service
+        try:
+            if url.path == "/analyze":
+                tickers = ",".join(query.get("tickers", [])).split(",")
+                source = query.get("source", ["yf"])[0]
+                status, etag, body, max_age = service.analyze(tickers, source)
+            elif url.path in ("/market", "/gems"):
+                status, etag, body, max_age = service.section(url.path.strip("/"))
+            elif url.path == "/healthz":
+                self._send(200, json.dumps({"status": "ok", "single_flight": single_flight.stats()}).encode("utf-8"))
+                return
+            else:
+                raise ApiError(404, f"없는 경로: {url.path}")
+        except ApiError as e:
+            self._send(e.status, json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8"))
+            return
+        except Exception as e:
+            self._send(500, json.dumps({"error": f"서버 오류: {e}"}, ensure_ascii=False).encode("utf-8"))
+            return
+
+        headers = {"ETag": etag, "Cache-Control": f"max-age={max(max_age, 0)}"}
+        if status == 200 and etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self._send(304, b"", headers)
+        else:
+            self._send(status, body, headers)
+
+    def _send(self, status: int, body: bytes, headers: dict = None):
+        self.send_response(status)
+        if status != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+# ✅ 서버 생성 (providers: 섹션 이름 -> 계산 함수, 일부만 넘기면 나머지는 기본값)
+def make_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, providers: dict = None, quiet: bool = False):
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    server.service = ResultService(providers)
+    server.quiet = quiet
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="떡상 분석 결과 HTTP API")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--quiet", action="store_true", help="요청 로그 출력 안 함")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, quiet=args.quiet)
+    print(f"✅ API 서버 시작: http://{args.host}:{args.port} (/analyze, /market, /gems)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+import aiohttp
+
+# asyncio 기반 공용 HTTP 조회 모듈
+# - 전역 세마포어로 동시 요청 수 제한, 호스트별 세마포어로 사이트별 요청 수 제한
+# - 수백 개 요청도 스레드 하나(이벤트 루프)에서 처리
+# - 같은 루프에서 같은 요청(세션 헤더, URL, 파라미터)이 진행 중이면 새로 보내지 않고 결과를 공유
+# - fetch_many: 개별 실패는 예외 객체로 돌려주고, 전체 제한 시간을 넘기면 남은 요청을 모두 취소
+# - run_sync: 동기 코드(Streamlit, 기존 함수)에서 코루틴 실행
+# - run_in_background: 동기 코드와 겹쳐서 실행 (Future 반환, 결과가 필요할 때 result())
+
+# 전역 동시 요청 수
+MAX_CONCURRENCY = 64
+
+# 호스트별 동시 요청 수 (없으면 DEFAULT_HOST_LIMIT)
+DEFAULT_HOST_LIMIT = 8
+HOST_LIMITS = {
+    "finance.yahoo.com": 2,
+    "query1.finance.yahoo.com": 4,
+    "query2.finance.yahoo.com": 4,
+    "data.alpaca.markets": 10,
+    "production.dataviz.cnn.io": 2,
+    "finviz.com": 4,
+}
+
+DEFAULT_TIMEOUT = 10  # 요청 1건 제한 시간 (초)
+
+# 세마포어는 이벤트 루프에 묶이므로 루프별로 생성
+_limits = {}
+_limits_lock = threading.Lock()
+
+
+def _loop_limits():
+    loop = asyncio.get_running_loop()
+    with _limits_lock:
+        limits = _limits.get(loop)
+        if limits is None:
+            # 종료된 루프의 세마포어 정리
+            for old_loop in [l for l in _limits if l.is_closed()]:
+                _limits.pop(old_loop, None)
+            limits = {"global": asyncio.Semaphore(MAX_CONCURRENCY), "hosts": {}, "inflight": {}}
+            _limits[loop] = limits
+        return limits
+
+
+def _host_semaphore(url: str):
+    host = urlsplit(url).hostname or ""
+    hosts = _loop_limits()["hosts"]
+    if host not in hosts:
+        hosts[host] = asyncio.Semaphore(HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT))
+    return hosts[host]
+
+
+# ✅ 공용 세션 생성 (연결 수는 세마포어로 제한하므로 커넥터 제한은 전역 값에 맞춤)
+def open_session(headers: dict = None):
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENCY, limit_per_host=max(HOST_LIMITS.values()) * 2)
+    return aiohttp.ClientSession(headers=headers, connector=connector)
+
+
+def _freeze(mapping):
+    return tuple(sorted((str(k), str(v)) for k, v in mapping.items())) if mapping else ()
+
+
+# ✅ 요청 1건 (진행 중인 같은 요청이 있으면 그 결과를 함께 기다림)
+# 결과(JSON 딕셔너리 등)는 호출자끼리 공유하므로 수정하지 않습니다.
+async def fetch(session, url: str, params: dict = None, headers: dict = None,
+                timeout: float = DEFAULT_TIMEOUT, as_json: bool = True):
+    key = (_freeze(session.headers), url, _freeze(params), _freeze(headers), as_json)
+    inflight = _loop_limits()["inflight"]
+    entry = inflight.get(key)  # [task, 기다리는 호출자 수]
+    if entry is None:
+        task = asyncio.ensure_future(_fetch(session, url, params, headers, timeout, as_json))
+        entry = [task, 0]
+        inflight[key] = entry
+        task.add_done_callback(lambda done: inflight.pop(key, None) if inflight.get(key, [None])[0] is done else None)
+    entry[1] += 1
+    try:
+        # 한 호출자가 취소되어도 같은 요청을 기다리는 다른 호출자에게는 영향이 없도록 shield
+        return await asyncio.shield(entry[0])
+    except asyncio.CancelledError:
+        if entry[1] == 1:
+            entry[0].cancel()  # 마지막 호출자가 취소되면 요청도 취소
+        raise
+    finally:
+        entry[1] -= 1
+
+
+# ✅ 실제 요청 (전역 + 호스트 세마포어 안에서 실행)
+async def _fetch(session, url: str, params: dict, headers: dict, timeout: float, as_json: bool):
+    async with _loop_limits()["global"], _host_semaphore(url):
+        async with session.get(url, params=params, headers=headers,
+                               timeout=aiohttp.ClientTimeout(total=timeout)) as res:
+            res.raise_for_status()
+            if as_json:
+                return await res.json(content_type=None)
+            return await res.text()
+
+
+async def fetch_json(session, url: str, params: dict = None, headers: dict = None, timeout: float = DEFAULT_TIMEOUT):
+    return await fetch(session, url, params, headers, timeout, as_json=True)
+
+
+async def fetch_text(session, url: str, params: dict = None, headers: dict = None, timeout: float = DEFAULT_TIMEOUT):
+    return await fetch(session, url, params, headers, timeout, as_json=False)
+
+
+async def _capture(coro):
+    try:
+        return await coro
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        return e
+
+
+# ✅ 여러 코루틴 동시 실행 (결과 순서 유지, 실패는 예외 객체로 반환)
+# deadline(초)을 넘기면 끝나지 않은 요청은 취소하고 asyncio.TimeoutError 객체로 채움
+async def fetch_many(coros: list, deadline: float = None):
+    tasks = [asyncio.ensure_future(_capture(c)) for c in coros]
+    if not tasks:
+        return []
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+    except asyncio.CancelledError:
+        for task in tasks:
+            task.cancel()
+        raise
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    return [task.result() if task in done else asyncio.TimeoutError("deadline exceeded") for task in tasks]
+
+
+# ✅ 동기 코드에서 코루틴 실행
+# 실행 중인 이벤트 루프가 있는 스레드(예: 다른 비동기 코드 내부)에서는 별도 스레드에서 실행
+def run_sync(coro, timeout: float = None):
+    if timeout is not None:
+        coro = asyncio.wait_for(coro, timeout)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result = {}
+
+    def runner():
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=runner, daemon=True)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+# ✅ 코루틴을 별도 스레드의 이벤트 루프에서 바로 시작 (동기 작업과 네트워크 대기를 겹치기 위함)
+def run_in_background(coro):
+    future = Future()
+
+    def runner():
+        try:
+            future.set_result(asyncio.run(coro))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=runner, daemon=True).start()
+    return future
@@ -0,0 +1,141 @@
+import os
+import threading
+
+import pandas as pd
+
+from data_paths import data_path
+
+# 종목별 OHLCV 봉 저장소 (Parquet)
+# 경로: data/bars/interval=<interval>/<SYMBOL>.parquet (인덱스: Date, 컬럼: Open/High/Low/Close/Volume)
+# - append_bars: 기존 봉과 합치고 같은 시각은 새 값으로 교체 (장중 임시 봉 갱신)
+# - refresh_bars: 마지막 저장 시각 이후 봉만 여러 종목 한 번에 다운로드
+# - bar_matrix: 여러 종목의 한 필드를 (날짜 × 종목) 테이블로 조회
+
+BAR_STORE_DIR = os.path.dirname(data_path("bars", "_"))
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+DOWNLOAD_CHUNK_SIZE = 100  # yf.download 1회당 종목 수
+
+_lock = threading.Lock()
+
+
+def _interval_dir(interval: str):
+    return os.path.join(BAR_STORE_DIR, f"interval={interval}")
+
+
+def bar_path(symbol: str, interval: str = "1d"):
+    return os.path.join(_interval_dir(interval), f"{symbol.upper()}.parquet")
+
+
+# ✅ yfinance 다운로드 결과 -> 표준 봉 테이블 (멀티인덱스 컬럼이면 해당 종목만 추출)
+def normalize_bars(frame: pd.DataFrame, symbol: str = None):
+    if frame is None or frame.empty:
+        return pd.DataFrame(columns=BAR_COLUMNS, dtype=float)
+    if isinstance(frame.columns, pd.MultiIndex):
+        for level in range(frame.columns.nlevels):
+            if set(BAR_COLUMNS) & set(frame.columns.get_level_values(level)):
+                other = 1 - level
+                symbols = frame.columns.get_level_values(other)
+                if symbol is not None and symbol in symbols:
+                    frame = frame.xs(symbol, axis=1, level=other)
+                elif symbols.nunique() > 1:
+                    return pd.DataFrame(columns=BAR_COLUMNS, dtype=float)  # 여러 종목 결과에 해당 종목 없음
+                else:
+                    frame = frame.droplevel(other, axis=1)
+                break
+    frame = frame[[c for c in BAR_COLUMNS if c in frame.columns]].astype(float).dropna(how="all")
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame.index = index.rename("Date")
+    return frame[~frame.index.duplicated(keep="last")].sort_index()
+
+
+# ✅ 저장된 봉 조회 (없으면 빈 테이블)
+def load_bars(symbol: str, interval: str = "1d", start=None):
+    path = bar_path(symbol, interval)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=BAR_COLUMNS, dtype=float)
+    bars = pd.read_parquet(path)
+    if start is not None:
+        bars = bars[bars.index >= pd.Timestamp(start)]
+    return bars
+
+
+# ✅ 마지막 저장 봉 시각 (없으면 None)
+def last_timestamp(symbol: str, interval: str = "1d"):
+    bars = load_bars(symbol, interval)
+    return bars.index[-1] if not bars.empty else None
+
+
+# ✅ 봉 추가 저장 (같은 시각은 새 값으로 교체) -> 합쳐진 전체 봉 반환
+def append_bars(symbol: str, frame: pd.DataFrame, interval: str = "1d"):
+    new_bars = normalize_bars(frame, symbol)
+    path = bar_path(symbol, interval)
+    with _lock:
+        existing = load_bars(symbol, interval)
+        if new_bars.empty:
+            return existing
+        combined = pd.concat([existing, new_bars]) if not existing.empty else new_bars
+        combined = combined[~combined.index.duplicated(keep="last")].sort_index()
+        if combined.equals(existing):
+            return existing  # 바뀐 봉이 없으면 파일을 다시 쓰지 않음 (범위 인덱스 재계산 방지)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        combined.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+    return combined
+
+
+# ✅ 저장소에 있는 종목 목록
+def list_symbols(interval: str = "1d"):
+    directory = _interval_dir(interval)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len(".parquet")] for name in os.listdir(directory) if name.endswith(".parquet"))
+
+
+# ✅ 여러 종목의 한 필드를 (날짜 × 종목) 테이블로 조회
+def bar_matrix(symbols: list = None, field: str = "Close", interval: str = "1d", start=None):
+    symbols = symbols if symbols is not None else list_symbols(interval)
+    columns = {}
+    for symbol in symbols:
+        bars = load_bars(symbol, interval, start)
+        if not bars.empty and field in bars.columns:
+            columns[symbol.upper()] = bars[field]
+    if not columns:
+        return pd.DataFrame()
+    return pd.DataFrame(columns).sort_index()
+
+
+# ✅ 새 봉만 받아서 저장 (저장된 봉이 없는 종목은 period만큼, 있는 종목은 마지막 봉 시각부터)
+# 마지막 봉부터 다시 받는 이유: 장중에 저장된 임시 봉을 확정 값으로 교체하기 위함
+def refresh_bars(symbols: list, period: str = "1y", interval: str = "1d"):
+    from yf_client import download
+
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+    last_seen = {s: last_timestamp(s, interval) for s in symbols}
+    groups = {}
+    for symbol, last in last_seen.items():
+        groups.setdefault(None if last is None else last.normalize(), []).append(symbol)
+
+    updated = []
+    for start, group in groups.items():
+        for i in range(0, len(group), DOWNLOAD_CHUNK_SIZE):
+            chunk = group[i:i + DOWNLOAD_CHUNK_SIZE]
+            kwargs = {"interval": interval, "auto_adjust": True, "group_by": "ticker", "progress": False}
+            if start is None:
+                kwargs["period"] = period
+            else:
+                kwargs["start"] = start.strftime("%Y-%m-%d")
+            try:
+                frame = download(chunk if len(chunk) > 1 else chunk[0], **kwargs)
+            except Exception as e:
+                print(f"❌ 봉 다운로드 실패 ({len(chunk)}개 종목): {e}")
+                continue
+            for symbol in chunk:
+                bars = normalize_bars(frame, symbol).dropna(subset=["Close"])
+                if bars.empty:
+                    continue
+                append_bars(symbol, bars, interval)
+                updated.append(symbol)
+    return updated
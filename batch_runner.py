@@ -0,0 +1,307 @@
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from data_paths import data_path
+
+try:
+    import fcntl  # 프로세스 간 파일 잠금 (POSIX)
+except ImportError:
+    fcntl = None
+
+# 헤드리스 배치 실행기
+# 기본 관심 종목 / 시장 스냅샷 / 보석 후보를 미리 계산해 로컬 아티팩트(JSON)로 저장합니다.
+# Streamlit 앱은 시작 시 이 아티팩트를 바로 읽어 화면을 띄우고, 오래된 항목만 다시 계산합니다.
+#
+# 사용 예 (cron 등):
+#   python batch_runner.py                      # 오래된 섹션만 1회 계산
+#   python batch_runner.py --force              # 전체 강제 재계산
+#   python batch_runner.py --interval 30        # 30분마다 반복 실행
+#   python batch_runner.py --sections market yf_watchlist
+#   python batch_runner.py --sections crypto --interval 15   # 코인 스캔 (기본 실행에는 포함되지 않음)
+
+ARTIFACT_PATH = data_path("precomputed", "latest.json")
+# 앱 / 배치 실행기 / API 서버가 각자 프로세스에서 아티팩트를 고쳐 쓰므로 갱신은 잠금 파일로 직렬화
+ARTIFACT_LOCK_PATH = f"{ARTIFACT_PATH}.lock"
+
+# 기본 관심 종목 (앱과 배치 실행기가 공유)
+YF_DEFAULT_TICKERS = ["OPTT", "APP", "LAES", "TSSI"]
+AP_DEFAULT_SYMBOLS = ["SMCI", "OPTT", "APP"]
+
+# 섹션별 유효 시간 (초)
+SECTION_TTL_SECONDS = {
+    "calibration": 24 * 60 * 60,  # 섹터 프로파일 보정 (다른 섹션보다 먼저 실행)
+    "market": 5 * 60,
+    "yf_watchlist": 30 * 60,
+    "ap_watchlist": 30 * 60,
+    "gems": 24 * 60 * 60,
+    "crypto": 15 * 60,  # 코인 스캔 (24시간 시장, --sections crypto로 지정할 때만 실행)
+}
+SECTIONS = list(SECTION_TTL_SECONDS)
+DEFAULT_SECTIONS = [name for name in SECTIONS if name != "crypto"]
+
+_lock = threading.Lock()
+
+
+def _json_default(value):
+    # numpy/pandas 스칼라 등 JSON 기본 타입이 아닌 값 처리
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+# ✅ 아티팩트 로드 (없거나 손상되면 빈 딕셔너리)
+def load_artifact(path: str = None):
+    path = path or ARTIFACT_PATH
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# ✅ 아티팩트 저장 (임시 파일에 쓴 뒤 교체)
+def save_artifact(artifact: dict, path: str = None):
+    path = path or ARTIFACT_PATH
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, default=_json_default)
+    os.replace(tmp_path, path)
+
+
+# ✅ 계산 후 지난 초 (시각이 없거나 잘못되면 None)
+def age_seconds(computed_at):
+    if not computed_at:
+        return None
+    try:
+        return (datetime.now() - datetime.fromisoformat(computed_at)).total_seconds()
+    except ValueError:
+        return None
+
+
+def is_fresh(computed_at, ttl_seconds: float):
+    age = age_seconds(computed_at)
+    return age is not None and age <= ttl_seconds
+
+
+# ✅ 유효 시간이 끝날 때까지 남은 초 (시각이 없거나 잘못되면 0)
+def seconds_until_stale(computed_at, ttl_seconds: float):
+    age = age_seconds(computed_at)
+    return max(ttl_seconds - age, 0.0) if age is not None else 0.0
+
+
+# ✅ 섹션 데이터 조회 (유효 시간 내일 때만 반환)
+def get_fresh_section(name: str, artifact: dict = None, ttl_seconds: float = None):
+    artifact = artifact if artifact is not None else load_artifact()
+    section = artifact.get(name)
+    ttl_seconds = ttl_seconds if ttl_seconds is not None else SECTION_TTL_SECONDS[name]
+    if section and is_fresh(section.get("computed_at"), ttl_seconds):
+        return section.get("data")
+    return None
+
+
+# ✅ 종목 단위 섹션에서 유효한 결과만 골라 반환 ({ticker: result})
+def get_fresh_items(name: str, tickers: list, artifact: dict = None, ttl_seconds: float = None):
+    artifact = artifact if artifact is not None else load_artifact()
+    ttl_seconds = ttl_seconds if ttl_seconds is not None else SECTION_TTL_SECONDS[name]
+    items = (artifact.get(name) or {}).get("items", {})
+    fresh = {}
+    for ticker in tickers:
+        item = items.get(ticker)
+        if item and is_fresh(item.get("computed_at"), ttl_seconds):
+            fresh[ticker] = item["result"]
+    return fresh
+
+
+# ✅ 아티팩트 읽기-수정-저장 잠금 (스레드 잠금 + 프로세스 간 flock, flock이 없는 OS는 스레드 잠금만)
+@contextmanager
+def _artifact_lock():
+    with _lock:
+        if fcntl is None:
+            yield
+            return
+        with open(ARTIFACT_LOCK_PATH, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# ✅ 섹션 갱신 (다른 섹션은 그대로 유지)
+def update_section(name: str, data):
+    with _artifact_lock():
+        artifact = load_artifact()
+        artifact[name] = {"computed_at": datetime.now().isoformat(timespec="seconds"), "data": data}
+        save_artifact(artifact)
+
+
+# ✅ 종목 단위 섹션 갱신 (전달한 종목만 교체)
+def update_section_items(name: str, results: dict):
+    if not results:
+        return
+    now = datetime.now().isoformat(timespec="seconds")
+    with _artifact_lock():
+        artifact = load_artifact()
+        section = artifact.get(name) or {"items": {}}
+        items = dict(section.get("items", {}))
+        for ticker, result in results.items():
+            items[ticker] = {"computed_at": now, "result": result}
+        artifact[name] = {"computed_at": now, "items": items}
+        save_artifact(artifact)
+
+
+def _stale_tickers(name: str, tickers: list, artifact: dict, force: bool):
+    if force:
+        return list(tickers)
+    fresh = get_fresh_items(name, tickers, artifact)
+    return [t for t in tickers if t not in fresh]
+
+
+# --- 섹션별 계산 (무거운 모듈은 필요한 시점에 임포트) ---
+
+def compute_calibration():
+    from sector_calibration import run_calibration
+    summary = run_calibration()
+    if summary["version"] is None:
+        raise RuntimeError("보정할 데이터 부족 (섹터 인덱스 / 봉 저장소 확인)")
+    return summary
+
+
+def compute_market():
+    # 시장 폭 시계열은 봉 저장소에 쌓인 유니버스로 증분 갱신 (마지막 저장일 이후만)
+    from market_breadth import update_breadth
+    try:
+        update_breadth()
+    except Exception as e:
+        print(f"❌ 시장 폭 갱신 실패: {e}")
+    from yf_market_data import market_data
+    market = market_data()
+    if "error" in market:
+        raise RuntimeError(market["error"])
+    return market
+
+
+def compute_yf_watchlist(tickers: list):
+    from yf_swing_stock_data import swing_stock_data
+    from scan_history import record_scan, SOURCE_YF_SWING
+
+    # 뉴스 감성은 한 번에 조회/점수화 (종목별 분석은 메모리 캐시만 사용)
+    try:
+        from news_sentiment import news_sentiment
+        news_sentiment(tickers)
+    except Exception as e:
+        print(f"❌ 뉴스 헤드라인 일괄 조회 실패 (종목별로 조회): {e}")
+
+    results = {}
+    for ticker in tickers:
+        data = swing_stock_data(ticker)
+        if data and data.get("Score") is not None:  # 분석 실패/데이터 부족 결과에는 Score가 없음
+            results[ticker] = data
+        else:
+            print(f"❌ {ticker} 분석 실패: {data.get('Recommendation', '알 수 없음')}")
+    record_scan(list(results.values()), SOURCE_YF_SWING)
+    return results
+
+
+def compute_ap_watchlist(symbols: list):
+    # 반복 실행(--interval) 중에는 이전 실행의 지표 상태를 이어 받아 새 봉만 반영
+    from ap_swing_stock_data import refresh_swing_data
+    results = refresh_swing_data(symbols)
+    return {item["ticker"]: item for item in results}
+
+
+def compute_gems():
+    from yf_gem_discovery import get_gem_candidates
+    return get_gem_candidates()
+
+
+def compute_crypto():
+    from crypto_scanner import scan_crypto
+    return scan_crypto()
+
+
+# ✅ 오래된 섹션만 계산해 아티팩트 갱신
+def run_batch(sections: list = None, force: bool = False):
+    sections = sections or DEFAULT_SECTIONS
+    artifact = load_artifact()
+    summary = {}
+
+    for name in sections:
+        started = time.time()
+        try:
+            if name == "calibration":
+                if not force and get_fresh_section("calibration", artifact) is not None:
+                    summary[name] = "fresh"
+                    continue
+                update_section("calibration", compute_calibration())
+            elif name == "market":
+                if not force and get_fresh_section("market", artifact) is not None:
+                    summary[name] = "fresh"
+                    continue
+                update_section("market", compute_market())
+            elif name == "yf_watchlist":
+                stale = _stale_tickers(name, YF_DEFAULT_TICKERS, artifact, force)
+                if not stale:
+                    summary[name] = "fresh"
+                    continue
+                update_section_items(name, compute_yf_watchlist(stale))
+            elif name == "ap_watchlist":
+                stale = _stale_tickers(name, AP_DEFAULT_SYMBOLS, artifact, force)
+                if not stale:
+                    summary[name] = "fresh"
+                    continue
+                update_section_items(name, compute_ap_watchlist(stale))
+            elif name == "gems":
+                if not force and get_fresh_section("gems", artifact) is not None:
+                    summary[name] = "fresh"
+                    continue
+                update_section("gems", compute_gems())
+            elif name == "crypto":
+                if not force and get_fresh_section("crypto", artifact) is not None:
+                    summary[name] = "fresh"
+                    continue
+                update_section("crypto", compute_crypto())
+            else:
+                summary[name] = "unknown section"
+                continue
+            summary[name] = f"updated ({time.time() - started:.1f}s)"
+        except Exception as e:
+            summary[name] = f"failed: {e}"
+        print(f"  -> {name}: {summary[name]}")
+
+    # 지난 날짜 스캔 이력 파티션 병합 (스캔마다 파일이 1개씩 늘어나 조회가 느려지지 않도록)
+    try:
+        from scan_history import compact_history
+        compacted = compact_history()
+        if compacted:
+            print(f"  -> scan_history: {compacted}개 파티션 병합")
+    except Exception as e:
+        print(f"❌ 스캔 이력 병합 실패: {e}")
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="떡상 사전 계산 배치 실행기")
+    parser.add_argument("--sections", nargs="*", choices=SECTIONS, help="계산할 섹션 (기본: crypto 제외 전체)")
+    parser.add_argument("--force", action="store_true", help="유효 시간과 관계없이 강제 재계산")
+    parser.add_argument("--interval", type=float, default=0, help="반복 실행 간격(분), 0이면 1회 실행")
+    args = parser.parse_args()
+
+    while True:
+        print(f"--- {datetime.now():%Y-%m-%d %H:%M:%S} 배치 실행 ---")
+        run_batch(args.sections, force=args.force)
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval * 60)
+
+
+if __name__ == "__main__":
+    main()
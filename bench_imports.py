@@ -0,0 +1,117 @@
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+# 임포트(시작) 비용 측정 스크립트
+# 모듈마다 새 파이썬 프로세스에서 `-X importtime`으로 임포트해 누적 시간을 집계합니다.
+# Streamlit 앱은 화면 코드를 실행하지 않고, 파일 최상단 import 문만 뽑아서 측정합니다.
+#
+# 사용 예:
+#   python bench_imports.py                       # 기본 모듈 + 앱 시작 비용
+#   python bench_imports.py yf_market_data --top 10
+#   python bench_imports.py --repeat 5            # 5회 측정 중 최솟값
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 앱 시작 시 최상단에서 임포트되는 비용을 측정할 진입점
+ENTRY_POINTS = ["yf_streamlit_app.py", "ap_streamlit_app.py"]
+
+# 개별 측정 대상 모듈
+MODULES = [
+    "yf_swing_stock_data",
+    "yf_market_data",
+    "yf_gem_discovery",
+    "ap_swing_stock_data",
+    "rule_engine",
+    "scan_history",
+    "sector_ranking",
+    "sector_index",
+    "batch_runner",
+]
+
+
+# ✅ 파일 최상단의 import 문만 추출 (함수 내부 지연 임포트는 제외)
+def top_level_imports(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+    return list(dict.fromkeys(names))
+
+
+# ✅ -X importtime 출력 파싱 -> [(모듈, 자체 us, 누적 us, 깊이)]
+def parse_importtime(stderr: str):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append((name.strip(), int(self_us), int(cumulative_us), (len(name) - len(name.lstrip()) - 1) // 2))
+        except ValueError:
+            continue  # 헤더 줄
+    return rows
+
+
+# ✅ 새 프로세스에서 모듈 목록 임포트 비용 측정
+def measure(modules: list):
+    code = "\n".join(f"import {name}" for name in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_DIR, capture_output=True, text=True,
+    )
+    rows = parse_importtime(proc.stderr)
+    top_rows = [r for r in rows if r[3] == 0]
+    # 무거운 패키지: 저장소 내 모듈과 인터프리터 기본 모듈을 뺀 최상위 패키지 (중첩 임포트 포함)
+    packages = [
+        r for r in rows
+        if "." not in r[0] and r[0] not in ("site", "encodings")
+        and not os.path.exists(os.path.join(REPO_DIR, f"{r[0]}.py"))
+    ]
+    error = None
+    if proc.returncode != 0:
+        error = (proc.stderr.strip().splitlines() or ["알 수 없는 오류"])[-1]
+    return {
+        "total_ms": sum(r[2] for r in top_rows) / 1000,
+        "packages": sorted(packages, key=lambda r: r[2], reverse=True),
+        "module_count": len(rows),
+        "error": error,
+    }
+
+
+def measure_best(modules: list, repeat: int):
+    results = [measure(modules) for _ in range(max(1, repeat))]
+    return min(results, key=lambda r: r["total_ms"])
+
+
+def print_result(label: str, result: dict, top: int):
+    status = f"  ⚠️ {result['error']}" if result["error"] else ""
+    print(f"{label:<28} {result['total_ms']:>9.1f} ms  ({result['module_count']} modules){status}")
+    for name, _, cumulative_us, _ in result["packages"][:top]:
+        print(f"    {name:<36} {cumulative_us / 1000:>9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모듈별 임포트(시작) 비용 측정")
+    parser.add_argument("modules", nargs="*", help="측정할 모듈 (기본: 주요 모듈 + 앱 진입점)")
+    parser.add_argument("--top", type=int, default=5, help="모듈별로 표시할 무거운 패키지 개수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 측정 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    print(f"{'대상':<28} {'누적 시간':>12}")
+    if not args.modules:
+        for entry in ENTRY_POINTS:
+            imports = top_level_imports(os.path.join(REPO_DIR, entry))
+            print_result(f"[app] {entry}", measure_best(imports, args.repeat), args.top)
+    for module in args.modules or MODULES:
+        print_result(module, measure_best([module], args.repeat), args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import fcluster, leaves_list, linkage
+from scipy.spatial.distance import squareform
+
+import bar_store
+from market_breadth import load_bar_matrices
+
+# 관심 종목 / 보석 후보 상관관계 · 집중도 분석
+# 일간 수익률의 지수가중(EW) 공분산을 종목 묶음별 상태로 보관하고, 새 봉이 들어오면 그 날짜 행만 반영합니다.
+# (종목 N개일 때 봉 1개당 N×N 외적 1번 - 500종목도 수 ms)
+# 마지막 봉은 장중 임시 봉일 수 있어 상태에는 넣지 않고 조회할 때만 한 칸 더 계산합니다 (indicator_state와 같은 방식).
+# 상관계수로 계층적 군집(평균 연결)을 만들어 같은 묶음에 종목이 몰리면 집중 경고를 띄우고,
+# 보석 후보 상위 K개를 고를 때 이미 고른 종목과 상관이 높은 종목은 뒤로 미룹니다.
+
+CORR_HALF_LIFE_BARS = 60       # EW 공분산 반감기 (거래일)
+CORR_LOOKBACK_BARS = 252       # 상태를 처음 만들 때 사용하는 최근 봉 수
+CORR_MIN_RETURNS = 40          # 이보다 수익률 관측이 적은 종목은 상관계수 NaN
+CLUSTER_MIN_CORR = 0.7         # 평균 상관이 이 이상인 종목끼리 같은 묶음
+CONCENTRATION_MIN_NAMES = 3    # 같은 묶음 종목이 이 개수 이상이면 집중 경고
+CONCENTRATION_MAX_SHARE = 0.4  # 또는 전체의 이 비율 초과 (2종목 이상 묶음)
+DIVERSIFY_MAX_CORR = 0.8       # 상위 K개 선택 시 이미 고른 종목과 상관이 이 이상이면 뒤로 미룸
+MAX_CACHED_STATES = 8          # 보관하는 종목 묶음 상태 수 (관심 종목, 보석 후보 등)
+
+_lock = threading.Lock()
+_states = OrderedDict()  # 종목 튜플 -> ReturnCovariance
+
+
+class ReturnCovariance:
+    def __init__(self, symbols: list, half_life: float = CORR_HALF_LIFE_BARS):
+        n = len(symbols)
+        self.symbols = list(symbols)
+        self.alpha = 1 - 0.5 ** (1 / half_life)
+        self.mean = np.zeros(n)
+        self.cov = np.zeros((n, n))
+        self.counts = np.zeros(n)  # 종목별 수익률 관측 수
+        self.last_date = None      # 마지막으로 반영한 확정 봉 날짜
+
+    # ✅ 수익률 1행 반영 결과 (상태는 바꾸지 않음, NaN = 거래 없음 -> 편차 0)
+    def _step(self, returns: np.ndarray):
+        observed = ~np.isnan(returns)
+        deviation = np.where(observed, returns - self.mean, 0.0)
+        mean = self.mean + self.alpha * deviation
+        cov = (1 - self.alpha) * (self.cov + self.alpha * np.outer(deviation, deviation))
+        return mean, cov, self.counts + observed
+
+    # ✅ 확정 봉 수익률 반영 (마지막 반영 날짜 이전/같으면 무시)
+    def update(self, date, returns: np.ndarray):
+        if self.last_date is not None and date <= self.last_date:
+            return False
+        self.mean, self.cov, self.counts = self._step(returns)
+        self.last_date = date
+        return True
+
+    # ✅ 상관계수 테이블 (pending: 장중 임시 봉 수익률, 상태에는 반영하지 않음)
+    def correlation(self, pending: np.ndarray = None):
+        cov, counts = self.cov, self.counts
+        if pending is not None:
+            _, cov, counts = self._step(pending)
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = np.clip(cov / np.outer(std, std), -1.0, 1.0)
+        valid = (counts >= CORR_MIN_RETURNS) & (std > 0)
+        corr[~valid, :] = np.nan
+        corr[:, ~valid] = np.nan
+        np.fill_diagonal(corr, np.where(valid, 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.symbols, columns=self.symbols)
+
+    # ✅ 일부 종목만 잘라낸 상태 (같은 이력, 다시 계산하지 않음)
+    def subset(self, symbols: list):
+        positions = [self.symbols.index(s) for s in symbols]
+        state = ReturnCovariance(symbols)
+        state.alpha = self.alpha
+        state.mean = self.mean[positions]
+        state.cov = self.cov[np.ix_(positions, positions)]
+        state.counts = self.counts[positions]
+        state.last_date = self.last_date
+        return state
+
+
+def _find_state(key: tuple):
+    if key in _states:
+        _states.move_to_end(key)
+        return _states[key]
+    for symbols, state in _states.items():
+        if set(key) <= set(symbols):
+            return state.subset(list(key))
+    return None
+
+
+# ✅ 종목 리스트의 최신 상관계수 테이블 (봉 저장소 기준, 저장된 봉이 없는 종목 제외)
+# refresh=True면 새 봉만 받아 저장소부터 갱신
+def correlation_matrix(symbols: list, refresh: bool = False):
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+    if refresh and symbols:
+        bar_store.refresh_bars(symbols)
+    closes = load_bar_matrices(symbols)["Close"]
+    if closes.empty:
+        return pd.DataFrame()
+    closes = closes[[s for s in symbols if s in closes.columns]]
+    returns = closes.pct_change(fill_method=None).iloc[1:]
+    if returns.empty:
+        return pd.DataFrame()
+    committed, pending = returns.iloc[:-1], returns.iloc[-1].to_numpy(float)
+
+    key = tuple(closes.columns)
+    with _lock:
+        state = _find_state(key)
+        if state is None:
+            state = ReturnCovariance(list(key))
+            committed = committed.tail(CORR_LOOKBACK_BARS)
+        if state.last_date is not None:
+            committed = committed[committed.index > state.last_date]
+        for date, row in zip(committed.index, committed.to_numpy(float)):
+            state.update(date, row)
+        _states[key] = state
+        _states.move_to_end(key)
+        while len(_states) > MAX_CACHED_STATES:
+            _states.popitem(last=False)
+        return state.correlation(pending)
+
+
+# ✅ 계층적 군집 (평균 연결, 거리 = sqrt((1 - 상관) / 2)) -> 종목별 묶음 번호 (덴드로그램 순서, 상관 NaN 종목 제외)
+def cluster_symbols(corr: pd.DataFrame, min_corr: float = CLUSTER_MIN_CORR):
+    valid = corr.index[corr.notna().sum(axis=1) > 1] if len(corr) > 1 else corr.index[:0]
+    corr = corr.loc[valid, valid]
+    if len(corr) < 2:
+        return pd.Series(range(1, len(corr) + 1), index=corr.index, dtype=int)
+    distance = np.sqrt(np.clip((1 - corr.fillna(0).to_numpy()) / 2, 0, None))
+    np.fill_diagonal(distance, 0)
+    tree = linkage(squareform(distance, checks=False), method="average")
+    labels = fcluster(tree, t=np.sqrt((1 - min_corr) / 2), criterion="distance")
+    order = leaves_list(tree)
+    return pd.Series(labels[order], index=corr.index[order], dtype=int)
+
+
+# ✅ 집중도 요약: 묶음, 집중 경고, 평균 상관, 유효 독립 종목 수 (상관행렬 고유값 기준)
+def concentration_report(symbols: list, corr: pd.DataFrame = None):
+    corr = correlation_matrix(symbols) if corr is None else corr
+    clusters = cluster_symbols(corr) if not corr.empty else pd.Series(dtype=int)
+    report = {"symbols": len(clusters), "clusters": {}, "flags": [], "avg_corr": None, "effective_bets": None}
+    if clusters.empty:
+        return report
+    report["clusters"] = {symbol: int(label) for symbol, label in clusters.items()}
+
+    values = corr.loc[clusters.index, clusters.index].fillna(0).to_numpy()
+    if len(values) > 1:
+        off_diagonal = values[~np.eye(len(values), dtype=bool)]
+        report["avg_corr"] = round(float(off_diagonal.mean()), 2)
+        eigenvalues = np.clip(np.linalg.eigvalsh(values), 0, None)
+        report["effective_bets"] = round(float(eigenvalues.sum() ** 2 / (eigenvalues ** 2).sum()), 1)
+
+    for label, members in clusters.groupby(clusters).groups.items():
+        members = list(members)
+        share = len(members) / len(clusters)
+        if len(members) < 2 or (len(members) < CONCENTRATION_MIN_NAMES and share <= CONCENTRATION_MAX_SHARE):
+            continue
+        block = corr.loc[members, members].to_numpy()
+        avg_corr = float(block[~np.eye(len(members), dtype=bool)].mean())
+        report["flags"].append({
+            "cluster": int(label), "symbols": members, "share_pct": round(share * 100, 1),
+            "avg_corr": round(avg_corr, 2),
+            "message": f"⚠️ {len(members)}개 종목이 같은 흐름 (평균 상관 {avg_corr:.2f}): {', '.join(members)}",
+        })
+    report["flags"].sort(key=lambda f: len(f["symbols"]), reverse=True)
+    return report
+
+
+# ✅ 분산된 상위 K개 선택 (candidates: 선호 순 정렬된 결과 딕셔너리)
+# 이미 고른 종목과 상관이 max_corr 이상이면 뒤로 미루고, K개가 안 되면 미룬 종목으로 순서대로 채움
+def diversify_top_k(candidates: list, k: int, max_corr: float = DIVERSIFY_MAX_CORR, corr: pd.DataFrame = None):
+    if len(candidates) <= 1:
+        return candidates[:k]
+    tickers = [str(c["ticker"]).upper() for c in candidates]
+    corr = correlation_matrix(tickers) if corr is None else corr
+    picked, deferred, picked_tickers = [], [], []
+    for candidate, ticker in zip(candidates, tickers):
+        if len(picked) >= k:
+            break
+        if ticker in corr.index and picked_tickers:
+            known = [t for t in picked_tickers if t in corr.columns]
+            max_seen = corr.loc[ticker, known].max() if known else np.nan
+            if pd.notna(max_seen) and max_seen >= max_corr:
+                deferred.append(candidate)
+                continue
+        picked.append(candidate)
+        picked_tickers.append(ticker)
+    return picked + deferred[:k - len(picked)]
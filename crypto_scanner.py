@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import os
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import bar_store
+from async_fetch import fetch_many, run_sync
+from rule_engine import evaluate_swing_frame
+from yf_swing_stock_data import swing_bar_features
+
+# 코인 스윙 스캐너 (ccxt)
+# 주식과 같은 지표(swing_bar_features)와 점수 규칙(rule_engine)을 거래소 코인 마켓 수백 개에 적용합니다.
+# 1) 마켓 선택: 기준 통화(USDT) 현물 마켓을 24시간 거래대금 순으로 CRYPTO_MAX_MARKETS개
+# 2) 봉 갱신: 마켓별로 마지막 저장 봉 시각부터만 조회 (코인은 24시간 거래 -> 전체 재조회 없이 증분 갱신)
+#    여러 마켓을 동시에 요청하되, ccxt 내장 요청 간격(enableRateLimit)과 MAX_CONCURRENT_REQUESTS로 거래소 제한을 지킴
+#    봉은 봉 저장소 data/bars/interval=<거래소>-<타임프레임>/<BASE-QUOTE>.parquet 에 저장
+# 3) 점수: 진행 중인 봉은 현재가로만 쓰고 확정 봉으로 지표 계산 -> 전체 마켓을 한 번에 규칙 엔진으로 평가
+# FakeExchange(--fake)로 네트워크 없이 전체 흐름을 확인할 수 있습니다.
+#
+# 사용 예:
+#   python crypto_scanner.py                       # 1회 스캔 (binance, USDT, 1d)
+#   python crypto_scanner.py --interval 15         # 15분마다 반복 스캔
+#   python crypto_scanner.py --fake --limit 300    # 가짜 거래소로 확인
+
+CRYPTO_EXCHANGE = os.environ.get("TTEOKSANG_CRYPTO_EXCHANGE", "binance")
+CRYPTO_QUOTE = "USDT"
+CRYPTO_TIMEFRAME = "1d"
+CRYPTO_MAX_MARKETS = 300
+CRYPTO_HISTORY_BARS = 400       # 저장된 봉이 없는 마켓의 최초 조회 봉 수
+OHLCV_PAGE_LIMIT = 500          # fetch_ohlcv 1회당 봉 수
+MAX_CONCURRENT_REQUESTS = 10    # 동시에 진행하는 요청 수 (요청 간격은 ccxt rateLimit이 추가로 조절)
+FETCH_DEADLINE = 300            # 봉 갱신 전체 제한 시간 (초)
+MIN_BARS = 120                  # 지표 계산에 필요한 최소 확정 봉 수
+
+TIMEFRAME_MS = {"1m": 60_000, "5m": 300_000, "15m": 900_000, "1h": 3_600_000, "4h": 14_400_000, "1d": 86_400_000}
+
+# ✅ 코인 기준값 (주식 섹터 프로파일보다 변동성 기준을 넓게)
+CRYPTO_PROFILE = {
+    "rsi_range": (35, 75),
+    "volume_rate_min": 1.2,
+    "disparity_range": (92, 108),
+    "high_low_max": 10.0,
+}
+CRYPTO_SECTOR = "Crypto"
+
+
+# --- 거래소 ---
+
+# ✅ ccxt 비동기 거래소 생성 (요청 간격 자동 조절)
+# 이벤트 루프에 묶이므로 코루틴 안에서 만들고 사용 후 close
+def create_exchange(exchange_id: str = CRYPTO_EXCHANGE):
+    import ccxt.async_support as ccxt_async
+    return getattr(ccxt_async, exchange_id)({"enableRateLimit": True})
+
+
+# ✅ 네트워크 없는 가짜 거래소 (마켓별 고정 시드 랜덤워크 일봉, ccxt와 같은 메서드)
+# calls에 (symbol, since) 요청 기록 -> 증분 갱신 확인용
+class FakeExchange:
+    id = "fake"
+
+    def __init__(self, markets: int = 300, quote: str = CRYPTO_QUOTE, start: str = "2024-01-01"):
+        self.symbols = [f"C{i:03d}/{quote}" for i in range(markets)]
+        self.start_ms = int(pd.Timestamp(start).timestamp() * 1000)
+        self.calls = []
+
+    async def load_markets(self):
+        return {s: {"symbol": s, "base": s.split("/")[0], "quote": s.split("/")[1], "spot": True, "active": True}
+                for s in self.symbols}
+
+    async def fetch_tickers(self, symbols=None):
+        return {s: {"symbol": s, "quoteVolume": float(zlib.crc32(s.encode()) % 1_000_000)}
+                for s in (symbols or self.symbols)}
+
+    def _series(self, symbol: str, timeframe: str):
+        step = TIMEFRAME_MS[timeframe]
+        count = (int(time.time() * 1000) - self.start_ms) // step + 1
+        rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+        close = 10 * np.exp(np.cumsum(rng.normal(0, 0.04, count)))
+        high = close * (1 + rng.uniform(0, 0.03, count))
+        low = close * (1 - rng.uniform(0, 0.03, count))
+        volume = rng.uniform(1e5, 1e7, count)
+        stamps = self.start_ms + np.arange(count) * step
+        return stamps, np.column_stack([np.r_[close[0], close[:-1]], high, low, close, volume])
+
+    async def fetch_ohlcv(self, symbol, timeframe="1d", since=None, limit=None):
+        self.calls.append((symbol, since))
+        stamps, values = self._series(symbol, timeframe)
+        start = 0 if since is None else int(np.searchsorted(stamps, since))
+        end = len(stamps) if limit is None else start + limit
+        return [[int(ts), *map(float, row)] for ts, row in zip(stamps[start:end], values[start:end])]
+
+    async def close(self):
+        pass
+
+
+def _factory(exchange_id: str, exchange_factory):
+    return exchange_factory or (lambda: create_exchange(exchange_id))
+
+
+# ✅ 마켓 심볼 -> 봉 저장소 키 ("BTC/USDT" -> "BTC-USDT")
+def market_key(symbol: str):
+    return symbol.replace("/", "-").replace(":", "-").upper()
+
+
+# ✅ 거래소/타임프레임별 봉 저장소 구간 (주식 봉과 분리)
+def store_interval(exchange_id: str, timeframe: str = CRYPTO_TIMEFRAME):
+    return f"{exchange_id}-{timeframe}"
+
+
+# ✅ ccxt OHLCV 리스트 -> 표준 봉 테이블 (UTC 시각)
+def ohlcv_to_frame(rows: list):
+    frame = pd.DataFrame(rows, columns=["Date", *bar_store.BAR_COLUMNS])
+    frame.index = pd.to_datetime(frame.pop("Date"), unit="ms")
+    return bar_store.normalize_bars(frame)
+
+
+# --- 마켓 선택 / 봉 갱신 ---
+
+async def _select_markets(exchange, quote: str, limit: int):
+    markets = await exchange.load_markets()
+    symbols = [m["symbol"] for m in markets.values()
+               if m.get("quote") == quote and m.get("spot") and m.get("active") is not False]
+    try:
+        tickers = await exchange.fetch_tickers(symbols)
+        symbols.sort(key=lambda s: (tickers.get(s) or {}).get("quoteVolume") or 0, reverse=True)
+    except Exception as e:
+        print(f"⚠️ 거래대금 조회 실패, 마켓 순서대로 선택: {e}")
+        symbols.sort()
+    return symbols[:limit]
+
+
+# ✅ since 이후 봉을 페이지 단위로 끝까지 조회
+async def _fetch_since(exchange, symbol: str, timeframe: str, since: int, semaphore):
+    step = TIMEFRAME_MS[timeframe]
+    rows = []
+    while True:
+        async with semaphore:
+            page = await exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=OHLCV_PAGE_LIMIT)
+        rows.extend(page)
+        if len(page) < OHLCV_PAGE_LIMIT or page[-1][0] + step > time.time() * 1000:
+            return rows
+        since = page[-1][0] + step
+
+
+# ✅ 마켓 목록 선택 (기준 통화 현물, 거래대금 순)
+def select_markets(exchange_id: str = CRYPTO_EXCHANGE, quote: str = CRYPTO_QUOTE, limit: int = CRYPTO_MAX_MARKETS,
+                   exchange_factory=None):
+    exchange_factory = _factory(exchange_id, exchange_factory)
+
+    async def run():
+        exchange = exchange_factory()
+        try:
+            return await _select_markets(exchange, quote, limit)
+        finally:
+            await exchange.close()
+
+    return run_sync(run())
+
+
+# ✅ 여러 마켓 봉 증분 갱신 -> 갱신된 마켓 목록
+# 저장된 봉이 있으면 마지막 봉 시각부터 (진행 중이던 봉을 확정 값으로 교체), 없으면 CRYPTO_HISTORY_BARS개
+def refresh_crypto_bars(symbols: list, exchange_id: str = CRYPTO_EXCHANGE, timeframe: str = CRYPTO_TIMEFRAME,
+                        exchange_factory=None, deadline: float = FETCH_DEADLINE):
+    exchange_factory = _factory(exchange_id, exchange_factory)
+    interval = store_interval(exchange_id, timeframe)
+    first_since = int(time.time() * 1000) - CRYPTO_HISTORY_BARS * TIMEFRAME_MS[timeframe]
+    since = {}
+    for symbol in symbols:
+        last = bar_store.last_timestamp(market_key(symbol), interval)  # 저장 시각은 UTC
+        since[symbol] = first_since if last is None else int(last.timestamp() * 1000)
+
+    async def run():
+        exchange = exchange_factory()
+        try:
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+            return await fetch_many([_fetch_since(exchange, s, timeframe, since[s], semaphore) for s in symbols],
+                                    deadline=deadline)
+        finally:
+            await exchange.close()
+
+    pages = run_sync(run())
+    updated = []
+    for symbol, rows in zip(symbols, pages):
+        if isinstance(rows, BaseException):
+            print(f"❌ {symbol} 봉 조회 실패: {rows}")
+            continue
+        if rows:
+            bar_store.append_bars(market_key(symbol), ohlcv_to_frame(rows), interval)
+            updated.append(symbol)
+    return updated
+
+
+# --- 점수 ---
+
+# ✅ 저장된 봉 -> 규칙 엔진 입력 피처 (확정 봉이 부족하면 None)
+# 마지막 봉이 아직 진행 중이면 현재가로만 사용 (주식의 실시간 가격과 같은 역할)
+def crypto_features(symbol: str, bars: pd.DataFrame, timeframe: str = CRYPTO_TIMEFRAME, now: pd.Timestamp = None):
+    bars = bars.dropna(subset=["Close"])
+    if bars.empty:
+        return None
+    now = now if now is not None else pd.Timestamp.now(tz="UTC").tz_localize(None)
+    in_progress = bars.index[-1] + pd.Timedelta(milliseconds=TIMEFRAME_MS[timeframe]) > now
+    completed = bars.iloc[:-1] if in_progress else bars
+    if len(completed) < MIN_BARS:
+        return None
+    current_price = float(bars["Close"].iloc[-1]) if in_progress else None
+    return {
+        "ticker": symbol,
+        "sector": CRYPTO_SECTOR,
+        **swing_bar_features(completed.copy(), current_price),
+        "volume_rate_min": CRYPTO_PROFILE["volume_rate_min"],
+        "disp_min": CRYPTO_PROFILE["disparity_range"][0],
+        "disp_max": CRYPTO_PROFILE["disparity_range"][1],
+        "high_low_max": CRYPTO_PROFILE["high_low_max"],
+        "Bar_Time": completed.index[-1].isoformat(),
+    }
+
+
+# ✅ 저장된 봉으로 전체 마켓 점수 계산 (네트워크 호출 없음) -> 점수 순 결과 리스트
+def score_crypto_markets(symbols: list, exchange_id: str = CRYPTO_EXCHANGE, timeframe: str = CRYPTO_TIMEFRAME):
+    interval = store_interval(exchange_id, timeframe)
+    rows = []
+    for symbol in symbols:
+        try:
+            features = crypto_features(symbol, bar_store.load_bars(market_key(symbol), interval), timeframe)
+        except Exception as e:
+            print(f"❌ {symbol} 지표 계산 실패: {e}")
+            continue
+        if features is not None:
+            rows.append(features)
+    if not rows:
+        return []
+
+    scored = evaluate_swing_frame(rows)
+    results = []
+    for row, score, reasons, recommendation in zip(rows, scored["Score"], scored["Score_Reasons"],
+                                                   scored["Recommendation"]):
+        results.append({
+            **{k: v for k, v in row.items() if k not in ("volume_rate_min", "disp_min", "disp_max", "high_low_max")},
+            "Score": round(float(score), 1),
+            "Score_Reasons": reasons,
+            "Recommendation": recommendation,
+        })
+    results.sort(key=lambda item: item["Score"], reverse=True)
+    return results
+
+
+# ✅ 1회 스캔: 마켓 선택 -> 봉 증분 갱신 -> 점수 -> 스캔 이력 기록
+# exchange_factory: 거래소 객체 생성 함수 (기본 ccxt, 테스트는 FakeExchange), 봉 저장 구간은 exchange_id 기준
+def scan_crypto(symbols: list = None, exchange_id: str = CRYPTO_EXCHANGE, timeframe: str = CRYPTO_TIMEFRAME,
+                quote: str = CRYPTO_QUOTE, limit: int = CRYPTO_MAX_MARKETS, exchange_factory=None, record: bool = True):
+    if symbols is None:
+        symbols = select_markets(exchange_id, quote, limit, exchange_factory)
+    refresh_crypto_bars(symbols, exchange_id, timeframe, exchange_factory)
+    results = score_crypto_markets(symbols, exchange_id, timeframe)
+    if record and results:
+        from scan_history import record_scan, SOURCE_CRYPTO_SWING
+        record_scan(results, SOURCE_CRYPTO_SWING)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="코인 스윙 스캐너 (ccxt)")
+    parser.add_argument("--exchange", default=CRYPTO_EXCHANGE, help="ccxt 거래소 id")
+    parser.add_argument("--quote", default=CRYPTO_QUOTE, help="기준 통화")
+    parser.add_argument("--timeframe", default=CRYPTO_TIMEFRAME, choices=list(TIMEFRAME_MS), help="봉 단위")
+    parser.add_argument("--limit", type=int, default=CRYPTO_MAX_MARKETS, help="스캔할 마켓 수 (거래대금 순)")
+    parser.add_argument("--symbols", nargs="*", help="직접 지정할 마켓 (예: BTC/USDT ETH/USDT)")
+    parser.add_argument("--interval", type=float, default=0, help="반복 스캔 간격(분), 0이면 1회 실행")
+    parser.add_argument("--top", type=int, default=20, help="출력할 상위 마켓 수")
+    parser.add_argument("--fake", action="store_true", help="네트워크 없이 가짜 거래소 사용")
+    args = parser.parse_args()
+
+    exchange_id, factory = args.exchange, None
+    if args.fake:
+        fake = FakeExchange(max(args.limit, 1), args.quote)
+        exchange_id, factory = fake.id, lambda: fake
+
+    while True:
+        started = time.time()
+        print(f"--- {datetime.now():%Y-%m-%d %H:%M:%S} 코인 스캔 ({exchange_id}, {args.quote}, {args.timeframe}) ---")
+        results = scan_crypto(args.symbols, exchange_id, args.timeframe, args.quote, args.limit, factory)
+        print(f"✅ {len(results)}개 마켓 점수 계산 ({time.time() - started:.1f}s)")
+        for item in results[:args.top]:
+            print(f"  {item['ticker']:<14} {item['Score']:>5.1f}  {item['current_price']:<12} {item['Recommendation']}")
+        if args.interval <= 0:
+            break
+        time.sleep(max(args.interval * 60 - (time.time() - started), 0))
+
+
+if __name__ == "__main__":
+    main()
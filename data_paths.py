@@ -0,0 +1,15 @@
+import os
+
+# 로컬 데이터 저장 위치 (섹터 인덱스, 스캔 이력 등)
+# TTEOKSANG_DATA_DIR 환경변수로 위치 변경 가능
+DATA_DIR = os.environ.get(
+    "TTEOKSANG_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
+
+
+# ✅ DATA_DIR 하위 경로 반환 (상위 디렉토리는 자동 생성)
+def data_path(*parts):
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
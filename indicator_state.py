@@ -0,0 +1,179 @@
+from collections import deque
+
+import numpy as np
+
+# Alpaca 스윙 지표 증분 계산 상태 (ap_swing_stock_data.refresh_swing_data용)
+# 확정 봉(일봉)은 update()로 한 번만 반영하고, 장중 최신 봉(임시 봉)은 snapshot()에서 상태를 바꾸지 않고 한 칸만 더 계산합니다.
+# - EWM 계열(RSI, MACD, ATR, ADX)과 OBV: pandas ewm(adjust=False)과 같은 점화식 값을 보관
+# - 이동평균 계열(MA, 볼린저, VMA, 스토캐스틱): 가장 긴 윈도우만큼 최근 봉만 보관
+# 계산식과 최소 봉 수 조건은 ap_swing_stock_data.calculate_* 함수와 같습니다.
+
+DEFAULT_PARAMS = {
+    "rsi_period": 14, "ma_periods": (5, 20, 50), "bb_period": 20, "bb_num_std_dev": 2,
+    "macd_short": 12, "macd_long": 26, "macd_signal": 9, "vma_period": 20,
+    "stoch_k_period": 14, "stoch_d_period": 3, "atr_period": 14, "adx_period": 14,
+}
+
+# 상태에 보관하는 EWM/누적 값
+EWM_FIELDS = ["avg_gain", "avg_loss", "ema_short", "ema_long", "macd_signal", "atr",
+              "adx_tr", "adx_plus_dm", "adx_minus_dm", "adx", "obv"]
+
+
+def _ewm(previous, value, alpha):
+    return value if previous is None else previous + alpha * (value - previous)
+
+
+class SwingIndicatorState:
+    def __init__(self, params: dict = None):
+        self.params = dict(DEFAULT_PARAMS, **(params or {}))
+        p = self.params
+        self.window = max(max(p["ma_periods"]), p["bb_period"], p["vma_period"],
+                          p["stoch_k_period"] + p["stoch_d_period"] - 1)
+        self.tail = deque(maxlen=self.window)  # 최근 확정 봉
+        self.count = 0                        # 확정 봉 수
+        self.last_t = None                    # 마지막 확정 봉 시각 (Alpaca 't')
+        self.values = dict.fromkeys(EWM_FIELDS)
+
+    # ✅ 봉 1개를 반영한 EWM/누적 값 (상태는 바꾸지 않음)
+    def _step(self, bar: dict):
+        p, v = self.params, self.values
+        prev = self.tail[-1] if self.tail else None
+        high, low, close, volume = bar["h"], bar["l"], bar["c"], bar["v"]
+        new = {}
+
+        # RSI (com=period-1 -> alpha=1/period), 첫 봉의 변화량은 0
+        change = close - prev["c"] if prev else 0.0
+        alpha = 1 / p["rsi_period"]
+        new["avg_gain"] = _ewm(v["avg_gain"], max(change, 0.0), alpha)
+        new["avg_loss"] = _ewm(v["avg_loss"], max(-change, 0.0), alpha)
+
+        # MACD (span -> alpha=2/(span+1))
+        new["ema_short"] = _ewm(v["ema_short"], close, 2 / (p["macd_short"] + 1))
+        new["ema_long"] = _ewm(v["ema_long"], close, 2 / (p["macd_long"] + 1))
+        new["macd_signal"] = _ewm(v["macd_signal"], new["ema_short"] - new["ema_long"], 2 / (p["macd_signal"] + 1))
+
+        # True Range (첫 봉은 고가-저가)
+        if prev:
+            true_range = max(high - low, abs(high - prev["c"]), abs(low - prev["c"]))
+            plus_dm = max(high - prev["h"], 0.0)
+            minus_dm = max(prev["l"] - low, 0.0)
+        else:
+            true_range, plus_dm, minus_dm = high - low, 0.0, 0.0
+        new["atr"] = _ewm(v["atr"], true_range, 2 / (p["atr_period"] + 1))
+
+        # ADX
+        adx_alpha = 2 / (p["adx_period"] + 1)
+        new["adx_tr"] = _ewm(v["adx_tr"], true_range, adx_alpha)
+        new["adx_plus_dm"] = _ewm(v["adx_plus_dm"], plus_dm, adx_alpha)
+        new["adx_minus_dm"] = _ewm(v["adx_minus_dm"], minus_dm, adx_alpha)
+        plus_di = 100 * new["adx_plus_dm"] / (new["adx_tr"] + 1e-10)
+        minus_di = 100 * new["adx_minus_dm"] / (new["adx_tr"] + 1e-10)
+        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di + 1e-10)
+        new["adx"] = _ewm(v["adx"], dx, adx_alpha)
+        new["plus_di"], new["minus_di"] = plus_di, minus_di
+
+        # OBV
+        if prev is None:
+            new["obv"] = 0
+        elif close > prev["c"]:
+            new["obv"] = v["obv"] + volume
+        elif close < prev["c"]:
+            new["obv"] = v["obv"] - volume
+        else:
+            new["obv"] = v["obv"]
+        return new
+
+    # ✅ 확정 봉 반영 (시각이 마지막 확정 봉 이전/같으면 무시)
+    def update(self, bar: dict):
+        if self.last_t is not None and bar["t"] <= self.last_t:
+            return False
+        new = self._step(bar)
+        for field in EWM_FIELDS:
+            self.values[field] = new[field]
+        self.tail.append({k: bar[k] for k in ("t", "h", "l", "c", "v")})
+        self.count += 1
+        self.last_t = bar["t"]
+        return True
+
+    # ✅ 현재 지표 (latest_bar: 장중 임시 봉, 상태에는 반영하지 않음) -> merge_swing_data와 같은 키
+    def snapshot(self, latest_bar: dict = None):
+        p = self.params
+        bars = list(self.tail)
+        count = self.count
+        values = dict(self.values)
+        macd_values = values
+        plus_di = minus_di = None
+        if latest_bar is not None:
+            new = self._step(latest_bar)
+            # MACD는 기존 계산처럼 같은 시각의 봉이 중복이면 먼저 온 확정 봉만 사용
+            macd_values = values if latest_bar["t"] == self.last_t else new
+            values.update(new)
+            plus_di, minus_di = new["plus_di"], new["minus_di"]
+            bars.append(latest_bar)
+            count += 1
+        elif count:
+            plus_di = 100 * values["adx_plus_dm"] / (values["adx_tr"] + 1e-10)
+            minus_di = 100 * values["adx_minus_dm"] / (values["adx_tr"] + 1e-10)
+
+        close = np.array([b["c"] for b in bars], dtype=float)
+        high = np.array([b["h"] for b in bars], dtype=float)
+        low = np.array([b["l"] for b in bars], dtype=float)
+        volume = np.array([b["v"] for b in bars], dtype=float)
+
+        result = {
+            "current_price": close[-1] if count else None,
+            "previous_close": (close[-2] if len(close) >= 2 else close[-1]) if count else None,
+            "volume": volume[-1] if count else None,
+        }
+
+        rsi = None
+        if count >= p["rsi_period"] + 1:
+            rs = values["avg_gain"] / (values["avg_loss"] + 1e-10)
+            rsi = 100 - (100 / (1 + rs))
+        result["rsi"] = rsi
+
+        for period in p["ma_periods"]:
+            result[f"ma_{period}"] = close[-period:].mean() if count >= period else None
+
+        bb = {"bb_middle": None, "bb_upper": None, "bb_lower": None}
+        if count >= p["bb_period"]:
+            window = close[-p["bb_period"]:]
+            middle, std = window.mean(), window.std(ddof=1)
+            bb = {"bb_middle": middle, "bb_upper": middle + std * p["bb_num_std_dev"],
+                  "bb_lower": middle - std * p["bb_num_std_dev"]}
+        result.update(bb)
+
+        macd = {"macd_line": None, "macd_signal": None, "macd_histogram": None}
+        if count >= p["macd_long"] + p["macd_signal"] - 1:
+            line = macd_values["ema_short"] - macd_values["ema_long"]
+            macd = {"macd_line": line, "macd_signal": macd_values["macd_signal"],
+                    "macd_histogram": line - macd_values["macd_signal"]}
+        result.update(macd)
+
+        result["vma"] = volume[-p["vma_period"]:].mean() if count >= p["vma_period"] else None
+        result["obv"] = values["obv"] if count else None
+
+        stoch = {"stoch_k": None, "stoch_d": None}
+        k, d = p["stoch_k_period"], p["stoch_d_period"]
+        if count >= k + d - 1:
+            fast_k = [
+                100 * ((close[i] - low[i - k + 1:i + 1].min()) / (high[i - k + 1:i + 1].max() - low[i - k + 1:i + 1].min() + 1e-10))
+                for i in range(len(close) - d, len(close))
+            ]
+            stoch = {"stoch_k": fast_k[-1], "stoch_d": float(np.mean(fast_k))}
+        result.update(stoch)
+
+        result["atr"] = values["atr"] if count >= p["atr_period"] + 1 else None
+        adx = {"adx": None, "plus_di": None, "minus_di": None}
+        if count >= p["adx_period"] + 1:
+            adx = {"adx": values["adx"], "plus_di": plus_di, "minus_di": minus_di}
+        result.update(adx)
+        return result
+
+
+# ✅ 확정 봉 리스트로 상태 생성
+def seed_state(bars: list, params: dict = None):
+    state = SwingIndicatorState(params)
+    for bar in bars:
+        state.update(bar)
+    return state
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# 가격 구조 기반 지지/저항선 탐지 (넘파이 벡터 연산, 종목당 1년 봉 기준 수 ms)
+# 1) 스윙 피벗: 앞뒤 PIVOT_WINDOW개 봉 중 최고가/최저가인 봉 (슬라이딩 윈도우 argmax/argmin)
+# 2) 매물대: 대표가격(고/저/종 평균) 히스토그램에 거래량을 쌓아 주변보다 많은 구간 (volume-at-price)
+# 3) 두 후보를 가격순으로 정렬해 LEVEL_MERGE_PCT 이내끼리 묶고, 묶음의 강도 = 피벗 가중치(최근일수록 큼) + 매물대 비중
+# 현재가 아래 레벨은 지지선, 위 레벨은 저항선으로 강한 순 top N을 고른 뒤 가까운 순으로 반환합니다.
+
+LEVEL_LOOKBACK_BARS = 252     # 최근 1년 봉
+PIVOT_WINDOW = 5              # 피벗 판정 좌우 봉 수
+PIVOT_HALF_LIFE_BARS = 60     # 피벗 가중치 반감기 (오래된 피벗일수록 약함)
+VOLUME_BINS = 40              # 매물대 가격 구간 수
+VOLUME_NODE_MIN_RATIO = 1.2   # 평균 구간 거래량 대비 이 배수 이상인 봉우리만 매물대로 사용
+VOLUME_NODE_WEIGHT = 10.0     # 매물대 거래량 비중 10% = 최근 피벗 1개와 같은 강도
+LEVEL_MERGE_PCT = 1.0         # 이 비율(%) 이내 후보는 같은 레벨로 묶음
+MIN_LEVEL_STRENGTH = 0.5      # 이보다 약한 레벨은 제외
+
+LEVEL_COLUMNS = ["price", "strength", "touches", "volume_pct"]
+
+
+def _empty_levels():
+    return pd.DataFrame(columns=LEVEL_COLUMNS, dtype=float)
+
+
+# ✅ 스윙 피벗 위치 (고점 인덱스, 저점 인덱스)
+def find_pivots(high: np.ndarray, low: np.ndarray, window: int = PIVOT_WINDOW):
+    size = 2 * window + 1
+    if len(high) < size:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    pivot_highs = np.flatnonzero(sliding_window_view(high, size).argmax(axis=1) == window) + window
+    pivot_lows = np.flatnonzero(sliding_window_view(low, size).argmin(axis=1) == window) + window
+    return pivot_highs, pivot_lows
+
+
+# ✅ 매물대 봉우리 (가격, 전체 거래량 대비 비중)
+def volume_nodes(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray, bins: int = VOLUME_BINS):
+    typical = (high + low + close) / 3
+    if len(typical) == 0 or np.nansum(volume) <= 0:
+        return np.array([]), np.array([])
+    hist, edges = np.histogram(typical, bins=bins, weights=volume)
+    padded = np.concatenate([[-np.inf], hist, [-np.inf]])
+    is_peak = (hist >= padded[:-2]) & (hist > padded[2:]) & (hist >= hist.mean() * VOLUME_NODE_MIN_RATIO)
+    centers = (edges[:-1] + edges[1:]) / 2
+    return centers[is_peak], hist[is_peak] / hist.sum()
+
+
+# ✅ 피벗 + 매물대 후보를 가격대별로 묶은 레벨 테이블 (강도 내림차순)
+def level_table(bars: pd.DataFrame, lookback: int = LEVEL_LOOKBACK_BARS):
+    bars = bars.dropna(subset=["High", "Low", "Close"]).tail(lookback)
+    if bars.empty:
+        return _empty_levels()
+    high = bars["High"].to_numpy(float)
+    low = bars["Low"].to_numpy(float)
+    close = bars["Close"].to_numpy(float)
+    volume = bars["Volume"].fillna(0).to_numpy(float) if "Volume" in bars.columns else np.zeros(len(bars))
+
+    pivot_highs, pivot_lows = find_pivots(high, low)
+    pivot_index = np.concatenate([pivot_highs, pivot_lows])
+    pivot_prices = np.concatenate([high[pivot_highs], low[pivot_lows]])
+    pivot_weights = 0.5 ** ((len(bars) - 1 - pivot_index) / PIVOT_HALF_LIFE_BARS)
+    node_prices, node_shares = volume_nodes(high, low, close, volume)
+
+    prices = np.concatenate([pivot_prices, node_prices])
+    if len(prices) == 0:
+        return _empty_levels()
+    weights = np.concatenate([pivot_weights, node_shares * 100 / VOLUME_NODE_WEIGHT])
+    is_pivot = np.concatenate([np.ones(len(pivot_prices)), np.zeros(len(node_prices))])
+    shares = np.concatenate([np.zeros(len(pivot_prices)), node_shares])
+
+    # 가격순 정렬 후 인접 후보 간격이 LEVEL_MERGE_PCT를 넘으면 새 레벨
+    order = np.argsort(prices)
+    prices, weights, is_pivot, shares = prices[order], weights[order], is_pivot[order], shares[order]
+    new_level = np.concatenate([[True], np.diff(prices) / prices[:-1] * 100 > LEVEL_MERGE_PCT])
+    group = np.cumsum(new_level) - 1
+
+    strength = np.bincount(group, weights=weights)
+    levels = pd.DataFrame({
+        "price": np.bincount(group, weights=prices * weights) / strength,
+        "strength": strength,
+        "touches": np.bincount(group, weights=is_pivot),
+        "volume_pct": np.bincount(group, weights=shares) * 100,
+    })
+    levels = levels[levels["strength"] >= MIN_LEVEL_STRENGTH]
+    return levels.sort_values("strength", ascending=False).reset_index(drop=True).round(2)
+
+
+# ✅ 현재가 기준 지지/저항 레벨 (각각 강한 순 top_n -> 가까운 순 정렬, 딕셔너리 리스트)
+def detect_levels(bars: pd.DataFrame, current_price: float = None, top_n: int = 3):
+    levels = level_table(bars)
+    if current_price is None:
+        current_price = float(bars["Close"].dropna().iloc[-1]) if not bars.empty else None
+    if levels.empty or current_price is None:
+        return {"supports": [], "resistances": []}
+    supports = levels[levels["price"] < current_price].head(top_n).sort_values("price", ascending=False)
+    resistances = levels[levels["price"] > current_price].head(top_n).sort_values("price")
+    return {"supports": supports.to_dict("records"), "resistances": resistances.to_dict("records")}
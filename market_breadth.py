@@ -0,0 +1,237 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import bar_store
+from data_paths import data_path
+
+# 시장 폭(Market Breadth) 엔진
+# 봉 저장소(bar_store)의 일봉 전체를 (날짜 × 종목) 행렬로 놓고 날짜별로 한 번에 계산합니다.
+#   - 상승/하락/보합 종목 수, 누적 AD 라인
+#   - 20/50/200일 이동평균 위 종목 비율
+#   - 52주 신고가/신저가 종목 수
+#   - McClellan 오실레이터 / 서머네이션 지수 (비율 조정 순상승 종목 수의 19일/39일 EMA 차이)
+# 결과는 날짜별 시계열(Parquet)로 저장하고, 다음 갱신 때는 마지막 저장일부터만 다시 계산합니다.
+# (마지막 저장일은 장중 임시 봉이었을 수 있어 다시 계산, 누적 값은 저장된 직전 값에서 이어감)
+# 유니버스 종목이 새로 늘어난 경우 과거 날짜는 바뀌지 않으므로 force=True로 전체 재계산합니다.
+
+BREADTH_PATH = data_path("breadth", "breadth.parquet")
+MA_WINDOWS = (20, 50, 200)
+NEW_HIGH_WINDOW = 252           # 52주 (거래일 기준)
+LOOKBACK_CALENDAR_DAYS = 400    # 증분 계산 시 함께 읽는 과거 구간 (200일선/52주 계산용)
+MCCLELLAN_ALPHAS = {"ema19": 0.10, "ema39": 0.05}  # 전통적인 10% / 5% 추세
+
+BREADTH_COLUMNS = [
+    "issues", "advances", "declines", "unchanged", "ad_line",
+    "above_ma20_pct", "above_ma50_pct", "above_ma200_pct", "new_highs", "new_lows",
+    "rana", "ema19", "ema39", "mcclellan_osc", "mcclellan_sum",
+]
+
+_lock = threading.Lock()
+_bars_cache = {}  # symbol -> (봉 파일 mtime, 날짜 배열, 값 배열)
+
+
+def _empty_breadth():
+    return pd.DataFrame(columns=BREADTH_COLUMNS, dtype=float).rename_axis("Date")
+
+
+# ✅ 저장된 시장 폭 시계열 (없으면 빈 테이블)
+def load_breadth(start=None):
+    if not os.path.exists(BREADTH_PATH):
+        return _empty_breadth()
+    breadth = pd.read_parquet(BREADTH_PATH)
+    if start is not None:
+        breadth = breadth[breadth.index >= pd.Timestamp(start)]
+    return breadth
+
+
+def _save_breadth(breadth: pd.DataFrame):
+    tmp_path = f"{BREADTH_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    breadth.to_parquet(tmp_path)
+    os.replace(tmp_path, BREADTH_PATH)
+
+
+MATRIX_FIELDS = ("Close", "High", "Low")
+
+
+# ✅ 종목 봉 조회 -> (날짜 int64 배열, [종가, 고가, 저가] 배열) (봉 파일이 바뀐 종목만 다시 읽음)
+def _cached_bars(symbol: str):
+    try:
+        mtime = os.path.getmtime(bar_store.bar_path(symbol))
+    except OSError:
+        return None
+    cached = _bars_cache.get(symbol)
+    if cached is None or cached[0] != mtime:
+        bars = bar_store.load_bars(symbol)
+        cached = (mtime, bars.index.to_numpy("datetime64[ns]").astype("int64"),
+                  bars.reindex(columns=list(MATRIX_FIELDS)).to_numpy(float))
+        _bars_cache[symbol] = cached
+    return cached[1], cached[2]
+
+
+# ✅ 유니버스 봉 -> 필드별 (날짜 × 종목) 행렬 {"Close", "High", "Low"}
+# 종목 수천 개를 pandas로 정렬하면 느리므로 캐시한 넘파이 배열을 날짜 위치에 바로 채움
+def load_bar_matrices(symbols: list = None, start=None):
+    symbols = [s.upper() for s in symbols] if symbols is not None else bar_store.list_symbols()
+    start_value = None if start is None else pd.Timestamp(start).value
+    columns, arrays = [], []
+    for symbol in symbols:
+        cached = _cached_bars(symbol)
+        if cached is None or len(cached[0]) == 0:
+            continue
+        dates, values = cached
+        if start_value is not None:
+            first = np.searchsorted(dates, start_value)
+            dates, values = dates[first:], values[first:]
+        if len(dates):
+            columns.append(symbol)
+            arrays.append((dates, values))
+    if not arrays:
+        return {field: pd.DataFrame() for field in MATRIX_FIELDS}
+
+    index = np.unique(np.concatenate([dates for dates, _ in arrays]))
+    matrix = np.full((len(MATRIX_FIELDS), len(index), len(columns)), np.nan)
+    for column, (dates, values) in enumerate(arrays):
+        matrix[:, np.searchsorted(index, dates), column] = values.T
+    index = pd.DatetimeIndex(index.astype("datetime64[ns]"), name="Date")
+    return {field: pd.DataFrame(matrix[i], index=index, columns=columns) for i, field in enumerate(MATRIX_FIELDS)}
+
+
+# ✅ 이동 통계 (행 first_row부터만 계산, 윈도우 안에 빈 봉이 있으면 NaN - 상장 전/데이터 없는 구간 제외)
+def _rolling_mean(values: np.ndarray, window: int, first_row: int = 0):
+    filled = np.vstack([np.zeros((1, values.shape[1])), np.nan_to_num(values)]).cumsum(axis=0)
+    missing = np.vstack([np.zeros((1, values.shape[1])), np.isnan(values)]).cumsum(axis=0)
+    rows = np.arange(max(first_row, 0), len(values))
+    mean = np.full((len(rows), values.shape[1]), np.nan)
+    full = rows >= window - 1
+    end, begin = rows[full] + 1, rows[full] + 1 - window
+    sums = filled[end] - filled[begin]
+    mean[full] = np.where(missing[end] - missing[begin] == 0, sums / window, np.nan)
+    return mean
+
+
+def _rolling_extreme(values: np.ndarray, window: int, how: str, first_row: int = 0):
+    first_row = max(first_row, 0)
+    result = np.full((len(values) - first_row, values.shape[1]), np.nan)
+    begin = max(first_row - window + 1, 0)
+    if len(values) - begin >= window:
+        windows = sliding_window_view(values[begin:], window, axis=0)
+        extreme = getattr(np, how)(windows, axis=-1)  # NaN이 섞인 윈도우는 NaN
+        result[len(result) - len(extreme):] = extreme
+    return result
+
+
+# ✅ 날짜별 시장 폭 집계 (누적/EMA 값 제외, start 이후 날짜만 계산 - 앞 구간은 이동 통계용)
+def breadth_counts(close: pd.DataFrame, high: pd.DataFrame, low: pd.DataFrame, start=None):
+    first_row = 0 if start is None else int(close.index.searchsorted(pd.Timestamp(start)))
+    c_all = close.to_numpy(float)
+    c = c_all[first_row:]
+    prev = np.vstack([np.full((1, c_all.shape[1]), np.nan), c_all[:-1]])[first_row:]
+    traded = ~np.isnan(c) & ~np.isnan(prev)
+    with np.errstate(invalid="ignore"):
+        advances = (traded & (c > prev)).sum(axis=1)
+        declines = (traded & (c < prev)).sum(axis=1)
+        counts = pd.DataFrame({
+            "issues": traded.sum(axis=1),
+            "advances": advances,
+            "declines": declines,
+            "unchanged": traded.sum(axis=1) - advances - declines,
+        }, index=close.index[first_row:])
+
+        for window in MA_WINDOWS:
+            ma = _rolling_mean(c_all, window, first_row)
+            eligible = ~np.isnan(ma)
+            above = (eligible & (c > ma)).sum(axis=1)
+            total = eligible.sum(axis=1)
+            counts[f"above_ma{window}_pct"] = np.where(total > 0, above / np.maximum(total, 1) * 100, np.nan)
+
+        h, l = high.to_numpy(float), low.to_numpy(float)
+        counts["new_highs"] = (h[first_row:] >= _rolling_extreme(h, NEW_HIGH_WINDOW, "max", first_row)).sum(axis=1)
+        counts["new_lows"] = (l[first_row:] <= _rolling_extreme(l, NEW_HIGH_WINDOW, "min", first_row)).sum(axis=1)
+    return counts.astype(float)
+
+
+def _continue_ewm(values: pd.Series, alpha: float, seed=None):
+    # 직전 EMA 값(seed)에서 이어서 계산 (pandas ewm adjust=False와 같은 점화식)
+    if seed is None or pd.isna(seed):
+        return values.ewm(alpha=alpha, adjust=False).mean()
+    seeded = pd.concat([pd.Series([seed]), values.reset_index(drop=True)], ignore_index=True)
+    return pd.Series(seeded.ewm(alpha=alpha, adjust=False).mean().iloc[1:].to_numpy(), index=values.index)
+
+
+# ✅ 집계 + 누적 지표 (prior: 새 구간 직전까지의 저장 시계열)
+def add_cumulative(counts: pd.DataFrame, prior: pd.DataFrame = None):
+    last = prior.iloc[-1] if prior is not None and not prior.empty else None
+    breadth = counts.copy()
+    net = breadth["advances"] - breadth["declines"]
+    total = breadth["advances"] + breadth["declines"]
+    breadth["ad_line"] = (0.0 if last is None else last["ad_line"]) + net.cumsum()
+    breadth["rana"] = (net / total.where(total > 0) * 1000).fillna(0.0)  # 비율 조정 순상승 (Ratio-Adjusted Net Advances)
+    for column, alpha in MCCLELLAN_ALPHAS.items():
+        breadth[column] = _continue_ewm(breadth["rana"], alpha, None if last is None else last[column])
+    breadth["mcclellan_osc"] = breadth["ema19"] - breadth["ema39"]
+    breadth["mcclellan_sum"] = (0.0 if last is None else last["mcclellan_sum"]) + breadth["mcclellan_osc"].cumsum()
+    return breadth[BREADTH_COLUMNS]
+
+
+# ✅ 시장 폭 시계열 갱신 (저장된 마지막 날짜부터만 계산) -> 전체 시계열
+def update_breadth(symbols: list = None, force: bool = False):
+    with _lock:
+        history = _empty_breadth() if force else load_breadth()
+        last_date = history.index[-1] if not history.empty else None
+        start = None if last_date is None else last_date - pd.Timedelta(days=LOOKBACK_CALENDAR_DAYS)
+        matrices = load_bar_matrices(symbols, start)
+        if matrices["Close"].empty:
+            return history
+
+        counts = breadth_counts(matrices["Close"], matrices["High"], matrices["Low"], start=last_date)
+        prior = history if last_date is None else history[history.index < last_date]
+        counts = counts[counts["issues"] > 0]
+        if counts.empty:
+            return history
+
+        breadth = pd.concat([prior, add_cumulative(counts, prior)]) if not prior.empty \
+            else add_cumulative(counts)
+        breadth = breadth.rename_axis("Date")
+        _save_breadth(breadth)
+        return breadth
+
+
+# ✅ 최신 시장 폭 요약 (market_data / 🛰️ 탭용, 저장된 시계열만 읽음, 없으면 None)
+def breadth_snapshot():
+    breadth = load_breadth()
+    if breadth.empty:
+        return None
+    latest = breadth.iloc[-1]
+    above_ma50 = latest["above_ma50_pct"]
+    oscillator = latest["mcclellan_osc"]
+
+    if pd.isna(above_ma50):
+        status = "❓ 데이터 부족"
+    elif above_ma50 >= 60 and oscillator > 0:
+        status = "🟢 폭넓은 상승 참여"
+    elif above_ma50 <= 40 and oscillator < 0:
+        status = "🔴 상승 참여 저조 (약세 확산)"
+    else:
+        status = "⏸️ 중립 (혼조)"
+
+    def _round(value, digits=1):
+        return None if pd.isna(value) else round(float(value), digits)
+
+    return {
+        "date": breadth.index[-1].strftime("%Y-%m-%d"),
+        "issues": int(latest["issues"]),
+        "advances": int(latest["advances"]),
+        "declines": int(latest["declines"]),
+        "above_ma20_pct": _round(latest["above_ma20_pct"]),
+        "above_ma50_pct": _round(above_ma50),
+        "above_ma200_pct": _round(latest["above_ma200_pct"]),
+        "new_highs": int(latest["new_highs"]),
+        "new_lows": int(latest["new_lows"]),
+        "mcclellan_osc": _round(oscillator),
+        "mcclellan_sum": _round(latest["mcclellan_sum"]),
+        "status": status,
+    }
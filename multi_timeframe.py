@@ -0,0 +1,138 @@
+import pandas as pd
+from ta.momentum import RSIIndicator, StochasticOscillator
+from ta.trend import MACD
+from ta.volatility import BollingerBands
+
+import bar_store
+
+# 다중 시간대 분석 (15분 / 1시간 / 일 / 주봉)
+# 분·시간봉을 한 번만 받아 봉 저장소(bar_store)에 쌓고, 상위 시간대는 로컬에서 리샘플링합니다.
+# (시간대마다 따로 다운로드하지 않음)
+# 시간대마다 일봉 분석(swing_stock_data)과 같은 지표를 계산하고, 컬럼 이름 뒤에 시간대를 붙여
+# (예: RSI_14_1h, MACD_1W) 규칙 엔진 피처로 그대로 넘깁니다.
+
+# 기본 봉: 60분봉 (yfinance 제공 기간 최대 730일). 15분봉 시간대가 필요하면 "15m" (최대 60일)
+BASE_INTERVAL = "60m"
+BASE_PERIODS = {"15m": "60d", "30m": "60d", "60m": "730d"}
+INTERVAL_MINUTES = {"15m": 15, "30m": 30, "60m": 60}
+
+# 시간대 -> 리샘플 규칙 (분봉 시간대는 정규장 09:30 시작에 맞춰 offset)
+# 주봉은 일봉을 다시 묶어서 계산 (금요일 마감 기준)
+TIMEFRAMES = {
+    "15m": {"rule": "15min", "offset": "0min", "minutes": 15},
+    "1h": {"rule": "60min", "offset": "30min", "minutes": 60},
+    "1D": {"rule": "1D"},
+    "1W": {"rule": "W-FRI"},
+}
+DEFAULT_TIMEFRAMES = ["15m", "1h", "1D", "1W"]
+
+MIN_BARS = 35  # MACD(26) + 시그널(9)
+OHLCV_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+# 시간대별로 계산하는 지표 (swing_stock_data와 같은 파라미터)
+MTF_INDICATORS = [
+    "Close", "RSI_14", "Stoch_K", "Stoch_D", "MACD", "MACD_Signal", "BB_Upper", "BB_Middle", "BB_Lower",
+    "MA_5", "MA_20", "MA_60", "MA_120", "Disparity_20", "Volume_Rate",
+]
+
+
+# ✅ 기본 봉으로 만들 수 있는 시간대만 (기본 봉보다 짧은 시간대 제외)
+def available_timeframes(base_interval: str = BASE_INTERVAL, timeframes: list = None):
+    base_minutes = INTERVAL_MINUTES[base_interval]
+    timeframes = timeframes or DEFAULT_TIMEFRAMES
+    return [tf for tf in timeframes if TIMEFRAMES[tf].get("minutes", base_minutes) >= base_minutes]
+
+
+# ✅ 기본 봉 조회 (refresh=True면 마지막 저장 봉 이후만 받아서 저장소 갱신)
+def load_base_bars(symbol: str, base_interval: str = BASE_INTERVAL, refresh: bool = True):
+    if refresh:
+        bar_store.refresh_bars([symbol], period=BASE_PERIODS[base_interval], interval=base_interval)
+    return bar_store.load_bars(symbol, base_interval)
+
+
+# ✅ 기본 봉 -> 상위 시간대 봉 (빈 구간 제거)
+# 각 봉에 "Available_At"(구간의 마지막 기본 봉 시각)을 붙여 시간대 정렬에 사용
+def resample_bars(bars: pd.DataFrame, timeframe: str):
+    if timeframe == "1W":
+        daily = resample_bars(bars, "1D")
+        resampled = daily.resample(TIMEFRAMES["1W"]["rule"]).agg(dict(OHLCV_AGG, Available_At="max"))
+        return resampled.dropna(subset=["Close"])
+
+    spec = TIMEFRAMES[timeframe]
+    frame = bars.assign(Available_At=bars.index)
+    resampler = frame.resample(spec["rule"], offset=spec.get("offset"), label="left", closed="left")
+    resampled = resampler.agg(dict(OHLCV_AGG, Available_At="max"))
+    return resampled.dropna(subset=["Close"])
+
+
+# ✅ 봉별 지표 테이블 (봉이 모자란 지표는 NaN)
+def indicator_frame(bars: pd.DataFrame):
+    close, high, low, volume = bars["Close"], bars["High"], bars["Low"], bars["Volume"]
+    frame = pd.DataFrame(index=bars.index)
+    frame["Close"] = close
+    frame["RSI_14"] = RSIIndicator(close=close, window=14).rsi()
+    stoch = StochasticOscillator(high, low, close)
+    frame["Stoch_K"] = stoch.stoch()
+    frame["Stoch_D"] = stoch.stoch_signal()
+    macd = MACD(close=close)
+    frame["MACD"] = macd.macd()
+    frame["MACD_Signal"] = macd.macd_signal()
+    bb = BollingerBands(close=close, window=20, window_dev=2)
+    frame["BB_Upper"] = bb.bollinger_hband()
+    frame["BB_Middle"] = bb.bollinger_mavg()
+    frame["BB_Lower"] = bb.bollinger_lband()
+    for window in (5, 20, 60, 120):
+        frame[f"MA_{window}"] = close.rolling(window).mean()
+    frame["Disparity_20"] = close / frame["MA_20"] * 100
+    frame["Volume_Rate"] = volume / volume.shift(1).rolling(5).mean()  # 직전 5개 봉 평균 대비
+    return frame[MTF_INDICATORS]
+
+
+# ✅ 시간대별 지표를 기본 봉 시각에 맞춰 한 테이블로 정렬 (컬럼: 지표_시간대)
+# 각 행에는 그 시각까지 끝난 상위 시간대 봉만 반영 (미래 데이터 없음).
+# 마지막 행은 진행 중인 상위 시간대 봉(오늘 일봉, 이번 주 주봉)을 현재 값으로 사용합니다.
+def align_timeframes(bars: pd.DataFrame, base_interval: str = BASE_INTERVAL, timeframes: list = None):
+    bars = bars.dropna(subset=["Close"])
+    aligned = pd.DataFrame(index=bars.index)
+    for timeframe in available_timeframes(base_interval, timeframes):
+        resampled = resample_bars(bars, timeframe)
+        if len(resampled) < MIN_BARS:
+            continue
+        indicators = indicator_frame(resampled).add_suffix(f"_{timeframe}")
+        indicators["Available_At"] = resampled["Available_At"].to_numpy()
+        indicators = indicators.sort_values("Available_At").reset_index(drop=True)
+        merged = pd.merge_asof(
+            pd.DataFrame({"Available_At": bars.index}), indicators, on="Available_At", direction="backward"
+        )
+        merged.index = bars.index
+        aligned = aligned.join(merged.drop(columns="Available_At"))
+    return aligned
+
+
+# ✅ 시간대별 상승 추세 여부 (종가 > 20봉 이평 + MACD > 시그널) 요약
+def summarize_timeframes(row: pd.Series, timeframes: list):
+    counted = uptrend = 0
+    for timeframe in timeframes:
+        close, ma_20 = row.get(f"Close_{timeframe}"), row.get(f"MA_20_{timeframe}")
+        macd, signal = row.get(f"MACD_{timeframe}"), row.get(f"MACD_Signal_{timeframe}")
+        if any(pd.isna(v) for v in (close, ma_20, macd, signal)):
+            continue
+        counted += 1
+        if close > ma_20 and macd > signal:
+            uptrend += 1
+    return {"MTF_Timeframes": counted, "MTF_Uptrend_Count": uptrend}
+
+
+# ✅ 종목의 최신 다중 시간대 피처 (swing_stock_data / 규칙 엔진 입력, 데이터 없으면 빈 딕셔너리)
+def multi_timeframe_features(symbol: str, base_interval: str = BASE_INTERVAL, timeframes: list = None,
+                             refresh: bool = True):
+    bars = load_base_bars(symbol, base_interval, refresh)
+    if bars.empty:
+        return {}
+    aligned = align_timeframes(bars, base_interval, timeframes)
+    if aligned.empty or aligned.columns.empty:
+        return {}
+    latest = aligned.iloc[-1]
+    features = {name: (round(float(value), 2) if pd.notna(value) else None) for name, value in latest.items()}
+    features.update(summarize_timeframes(latest, available_timeframes(base_interval, timeframes)))
+    return features
@@ -0,0 +1,258 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from bs4 import BeautifulSoup
+
+from async_fetch import fetch_many, fetch_text, open_session, run_sync
+from data_paths import data_path
+
+# 뉴스 감성 파이프라인 (Finviz 헤드라인 + VADER)
+# 1) 여러 종목 헤드라인을 동시에 조회 (소스 교체 가능: Finviz / 로컬 HTML 고정 파일)
+# 2) 헤드라인을 정규화한 해시로 중복 제거 (같은 기사가 여러 종목에 걸려도 한 번만)
+# 3) 처음 보는 해시만 VADER로 점수화하고 해시 -> compound 점수를 파일에 캐시 (이미 점수화한 헤드라인은 다시 계산하지 않음)
+# 4) 종목별로 발행 시각 기준 지수 감쇠(NEWS_HALF_LIFE_HOURS) 가중 평균 -> 점수 규칙 피처 (News_Sentiment, News_Count, News_Buzz)
+# 5) 종목별 피처는 메모리에 캐시 -> 대량 스캔은 묶음마다 news_sentiment(종목 목록)을 한 번 호출해 두면
+#    swing_stock_data의 ticker_sentiment는 조회만 함 (점수화/캐시 파일 저장은 묶음당 한 번)
+# SentimentIntensityAnalyzer는 사전 로딩 비용이 있어 프로세스에서 하나만 만들어 재사용합니다.
+
+FINVIZ_URL = "https://finviz.com/quote.ashx"
+FINVIZ_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                                "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"}
+FINVIZ_TZ = ZoneInfo("America/New_York")  # Finviz 시각은 미국 동부 기준
+
+# 로컬 HTML 고정 파일 디렉토리 (<TICKER>.html, Finviz 페이지 형식) - 설정하면 네트워크 대신 사용
+NEWS_FIXTURE_DIR = os.environ.get("TTEOKSANG_NEWS_FIXTURES")
+SENTIMENT_CACHE_PATH = data_path("news", "sentiment_cache.json")
+
+NEWS_LOOKBACK_DAYS = 7        # 이보다 오래된 헤드라인은 집계에서 제외
+NEWS_HALF_LIFE_HOURS = 24     # 감쇠 반감기
+NEWS_TTL_SECONDS = 30 * 60    # 종목별 헤드라인 메모리 캐시 유효 시간 (조회 실패도 같은 시간 동안 재시도하지 않음)
+NEWS_FETCH_DEADLINE = 30      # 여러 종목 동시 조회 전체 제한 시간 (초)
+SENTIMENT_CACHE_MAX = 50_000  # 점수 캐시 최대 항목 수 (넘으면 오래 전에 넣은 것부터 삭제)
+
+_lock = threading.Lock()
+_news_cache = {}  # (소스 이름, ticker) -> (조회 시각, 헤드라인 리스트)
+_features_cache = {}  # (소스 이름, ticker) -> (헤드라인 조회 시각, 감성 피처)
+_scores = {"loaded": False, "values": {}}  # 헤드라인 해시 -> compound 점수
+_analyzer = {"instance": None}
+
+
+# --- 헤드라인 소스 ---
+
+# ✅ Finviz 종목 페이지 -> 헤드라인 리스트 [{"headline", "url", "source", "published"}]
+# 뉴스 테이블은 날짜가 바뀌는 첫 행에만 날짜가 있고 나머지 행은 시각만 있음 ("Today 09:30AM" 형식 포함)
+def parse_finviz_news(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find(id="news-table")
+    if table is None:
+        return []
+    headlines, current_date = [], None
+    for row in table.find_all("tr"):
+        link = row.find("a", class_="tab-link-news") or row.find("a")
+        cell = row.find("td")
+        if link is None or cell is None:
+            continue
+        stamp = cell.get_text(" ", strip=True).split()
+        if len(stamp) >= 2:
+            day = stamp[0]
+            if day == "Today":
+                current_date = datetime.now(FINVIZ_TZ).date()
+            else:
+                try:
+                    current_date = datetime.strptime(day, "%b-%d-%y").date()
+                except ValueError:
+                    continue
+        if current_date is None or not stamp:
+            continue
+        try:
+            clock = datetime.strptime(stamp[-1], "%I:%M%p").time()
+        except ValueError:
+            continue
+        source = row.find("span")
+        headlines.append({
+            "headline": link.get_text(strip=True),
+            "url": link.get("href"),
+            "source": source.get_text(strip=True).strip("()") if source else None,
+            "published": datetime.combine(current_date, clock, tzinfo=FINVIZ_TZ),
+        })
+    return headlines
+
+
+class FinvizNewsSource:
+    name = "finviz"
+
+    async def fetch_html(self, session, ticker: str):
+        return await fetch_text(session, FINVIZ_URL, params={"t": ticker.upper(), "p": "d"})
+
+
+class LocalHtmlSource:
+    name = "local"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    async def fetch_html(self, session, ticker: str):
+        path = os.path.join(self.directory, f"{ticker.upper()}.html")
+        return await asyncio.to_thread(_read_text, path)
+
+
+def _read_text(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+# ✅ 기본 소스 (고정 파일 디렉토리가 설정되어 있으면 로컬 HTML)
+def default_source():
+    return LocalHtmlSource(NEWS_FIXTURE_DIR) if NEWS_FIXTURE_DIR else FinvizNewsSource()
+
+
+# --- 헤드라인 조회 ---
+
+# ✅ 여러 종목 헤드라인 동시 조회 {ticker: [헤드라인]} (메모리 캐시 우선, 실패한 종목은 빈 리스트)
+def fetch_news(tickers: list, source=None, deadline: float = NEWS_FETCH_DEADLINE):
+    source = source or default_source()
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    now = time.time()
+    result, missing = {}, []
+    with _lock:
+        for ticker in tickers:
+            cached = _news_cache.get((source.name, ticker))
+            if cached is not None and now - cached[0] <= NEWS_TTL_SECONDS:
+                result[ticker] = cached[1]
+            else:
+                missing.append(ticker)
+    if not missing:
+        return result
+
+    async def run():
+        async with open_session(FINVIZ_HEADERS) as session:
+            return await fetch_many([source.fetch_html(session, t) for t in missing], deadline=deadline)
+
+    pages = run_sync(run())
+    fetched_at = time.time()
+    with _lock:
+        for ticker, page in zip(missing, pages):
+            if isinstance(page, BaseException):
+                print(f"⚠️ {ticker} 뉴스 조회 실패: {page}")
+                headlines = []
+            else:
+                headlines = parse_finviz_news(page)
+            _news_cache[(source.name, ticker)] = (fetched_at, headlines)
+            result[ticker] = headlines
+    return result
+
+
+# --- 감성 점수 (헤드라인 해시 단위 캐시) ---
+
+# ✅ 헤드라인 해시 (대소문자/공백 차이는 같은 헤드라인)
+def headline_hash(headline: str):
+    normalized = re.sub(r"\s+", " ", headline).strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _get_analyzer():
+    if _analyzer["instance"] is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        _analyzer["instance"] = SentimentIntensityAnalyzer()
+    return _analyzer["instance"]
+
+
+def _load_scores():
+    if _scores["loaded"]:
+        return _scores["values"]
+    try:
+        with open(SENTIMENT_CACHE_PATH, "r", encoding="utf-8") as f:
+            _scores["values"] = {str(k): float(v) for k, v in json.load(f).items()}
+    except (OSError, ValueError, AttributeError):
+        _scores["values"] = {}
+    _scores["loaded"] = True
+    return _scores["values"]
+
+
+def _save_scores(values: dict):
+    tmp_path = f"{SENTIMENT_CACHE_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(values, f)
+    os.replace(tmp_path, SENTIMENT_CACHE_PATH)
+
+
+# ✅ 헤드라인 목록 -> {해시: compound 점수} (캐시에 없는 해시만 VADER로 계산, 새 점수가 있을 때만 저장)
+def score_headlines(headlines: list):
+    unique = {}
+    for headline in headlines:
+        unique.setdefault(headline_hash(headline), headline)
+    with _lock:
+        values = _load_scores()
+        new_hashes = [h for h in unique if h not in values]
+        if new_hashes:
+            analyzer = _get_analyzer()
+            for h in new_hashes:
+                values[h] = round(analyzer.polarity_scores(unique[h])["compound"], 4)
+            for old in list(values)[:max(len(values) - SENTIMENT_CACHE_MAX, 0)]:
+                if old not in unique:
+                    del values[old]
+            _save_scores(values)
+        return {h: values[h] for h in unique}
+
+
+# --- 종목별 집계 ---
+
+# ✅ 헤드라인 + 점수 -> 시간 감쇠 감성 피처 (최근 NEWS_LOOKBACK_DAYS 헤드라인, 없으면 빈 딕셔너리)
+# News_Sentiment: 감쇠 가중 평균 compound (-1 ~ 1), News_Buzz: 감쇠 가중치 합 (최근 기사가 많을수록 큼)
+def aggregate_sentiment(headlines: list, scores: dict, now: datetime = None):
+    now = now or datetime.now(FINVIZ_TZ)
+    cutoff = now - timedelta(days=NEWS_LOOKBACK_DAYS)
+    seen, weighted, weights, recent = set(), 0.0, 0.0, []
+    for item in headlines:
+        h = headline_hash(item["headline"])
+        if h in seen or item["published"] < cutoff or h not in scores:
+            continue
+        seen.add(h)
+        age_hours = max((now - item["published"]).total_seconds() / 3600, 0.0)
+        weight = 0.5 ** (age_hours / NEWS_HALF_LIFE_HOURS)
+        weighted += weight * scores[h]
+        weights += weight
+        recent.append(item | {"compound": scores[h]})
+    if not seen:
+        return {}
+    recent.sort(key=lambda item: item["published"], reverse=True)
+    return {
+        "News_Sentiment": round(weighted / weights, 3) if weights > 0 else None,
+        "News_Count": len(seen),
+        "News_Buzz": round(weights, 2),
+        "News_Headlines": [{"headline": item["headline"], "compound": item["compound"],
+                            "published": item["published"].isoformat(timespec="minutes")} for item in recent[:3]],
+    }
+
+
+# ✅ 여러 종목 뉴스 감성 피처 {ticker: 피처} (조회는 동시에, 점수화는 전체 종목 중복 제거 후 한 번)
+# 대량 스캔의 미리 조회 경로에서 호출 (결과는 헤드라인과 같은 유효 시간 동안 메모리에 보관)
+def news_sentiment(tickers: list, source=None):
+    source = source or default_source()
+    news = fetch_news(tickers, source)
+    scores = score_headlines([item["headline"] for headlines in news.values() for item in headlines])
+    now = datetime.now(FINVIZ_TZ)
+    features = {ticker: aggregate_sentiment(headlines, scores, now) for ticker, headlines in news.items()}
+    with _lock:
+        for ticker, value in features.items():
+            fetched_at = _news_cache.get((source.name, ticker), (time.time(), None))[0]
+            _features_cache[(source.name, ticker)] = (fetched_at, value)
+    return features
+
+
+# ✅ 종목 1개 뉴스 감성 피처 (swing_stock_data용, 미리 계산된 종목은 메모리 조회만)
+def ticker_sentiment(ticker: str, source=None):
+    source = source or default_source()
+    ticker = ticker.upper()
+    with _lock:
+        cached = _features_cache.get((source.name, ticker))
+    if cached is not None and time.time() - cached[0] <= NEWS_TTL_SECONDS:
+        return cached[1]
+    return news_sentiment([ticker], source).get(ticker, {})
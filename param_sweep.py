@@ -0,0 +1,416 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import bar_store
+from data_paths import data_path
+from indicator_state import DEFAULT_PARAMS
+from rule_engine import TRADE_BUY_RULES, TRADE_SELL_RULES, TRADE_VOLUME_CONFIRM, evaluate_mask, evaluate_rules
+
+# 지표/점수 파라미터 스윕 (그리드 / 랜덤 탐색)
+# 봉 저장소의 일봉 이력을 (날짜 × 종목) 행렬로 놓고, 설정마다 Alpaca 지표(merge_swing_data 파라미터)와
+# 매수/매도 규칙(rule_engine.TRADE_*_RULES)을 모든 날짜·종목에 대해 한 번에 계산해 이후 수익률로 평가합니다.
+#   - 점수 = Σ 매수 규칙 가중치 - Σ 매도 규칙 가중치 (가중치 1이면 앱의 매수 사유 수 - 매도 사유 수와 같음)
+#   - 진입 = 점수 >= min_score 인 (날짜, 종목), 그날 종가 기준 5/10/20봉 후 수익률 / 같은 날 유니버스 평균 대비 초과 수익률
+#   - 앞 구간(in-sample)으로 순위를 매기고, 뒤 HOLDOUT_FRACTION 구간(out-of-sample) 성과를 함께 보여 과최적화를 확인
+# 같은 지표(예: RSI 14, EMA 12)는 설정이 달라도 워커 안에서 한 번만 계산하고(메모이즈), 설정은 지표 파라미터 순으로
+# 정렬해 같은 지표 조합이 같은 워커로 가도록 나눕니다. 가중치/min_score만 다른 설정은 규칙 마스크까지 재사용합니다.
+# yf swing_stock_data 점수는 옵션 체인/지지선 등 과거 시점으로 되돌릴 수 없는 피처가 많아 대상에서 제외했습니다.
+
+SWEEP_DIR = os.path.dirname(data_path("sweeps", "_"))
+HISTORY_PERIOD = "3y"        # --refresh 시 새 종목 다운로드 기간
+HISTORY_BARS = 756           # 평가에 사용하는 최근 봉 수 (약 3년)
+WARMUP_BARS = 100            # 종목별 첫 봉 이후 이 개수까지는 지표 예열 구간으로 제외
+FORWARD_HORIZONS = (5, 10, 20)
+HOLDOUT_FRACTION = 0.3       # 뒤쪽 날짜 비율 (out-of-sample)
+MIN_SIGNALS = 30             # in-sample 진입이 이보다 적은 설정은 순위에서 뒤로
+DEFAULT_RANK_METRIC = "is_excess_10d"
+MAX_CACHED_INDICATORS = 64   # 워커별 지표 메모 개수
+MAX_CACHED_MASKS = 8         # 워커별 규칙 마스크 메모 개수 (지표 조합 단위)
+
+INDICATOR_KEYS = ["rsi_period", "ma_periods", "bb_period", "bb_num_std_dev", "macd_short", "macd_long", "macd_signal",
+                  "vma_period", "stoch_k_period", "stoch_d_period", "atr_period", "adx_period"]
+
+# 기본 탐색 공간 (그리드 2,304개)
+DEFAULT_SPACE = {
+    "rsi_period": [9, 14, 21],
+    "ma_periods": [(5, 20, 50), (10, 20, 60), (5, 10, 30)],
+    "bb_period": [20],
+    "bb_num_std_dev": [2.0, 2.5],
+    "macd_short": [8, 12],
+    "macd_long": [21, 26],
+    "macd_signal": [5, 9],
+    "vma_period": [20],
+    "stoch_k_period": [9, 14],
+    "stoch_d_period": [3],
+    "atr_period": [14],
+    "adx_period": [14, 20],
+    "min_score": [1, 2, 3, 4],
+}
+WEIGHT_CHOICES = [0.0, 0.5, 1.0, 1.5, 2.0]
+
+RULE_WEIGHT_KEYS = ([f"buy.{rule['id']}" for rule in TRADE_BUY_RULES]
+                    + [f"sell.{rule['id']}" for rule in TRADE_SELL_RULES] + ["volume_confirm"])
+
+
+# ✅ 현재 앱 설정 (기준선 - 모든 스윕 결과에 포함)
+def baseline_config():
+    config = {key: DEFAULT_PARAMS[key] for key in INDICATOR_KEYS}
+    config["ma_periods"] = tuple(config["ma_periods"])
+    config["min_score"] = 1
+    return config
+
+
+# ✅ 규칙 가중치 탐색 공간 ({"buy.rsi_oversold": [0, 0.5, ...], ...})
+def weight_space(choices: list = None):
+    return {key: list(choices or WEIGHT_CHOICES) for key in RULE_WEIGHT_KEYS}
+
+
+def _is_valid(config: dict):
+    ma = config["ma_periods"]
+    return config["macd_short"] < config["macd_long"] and len(ma) == 3 and ma[0] < ma[1] < ma[2]
+
+
+def _normalize(config: dict):
+    config = dict(baseline_config(), **config)
+    config["ma_periods"] = tuple(config["ma_periods"])
+    return config
+
+
+def indicator_key(config: dict):
+    return tuple(config[key] for key in INDICATOR_KEYS)
+
+
+# ✅ 그리드 탐색 설정 목록 (잘못된 조합 제외, 기준선 포함)
+def grid_configs(space: dict = None):
+    space = space or DEFAULT_SPACE
+    keys = list(space)
+    configs = [baseline_config()]
+    for values in itertools.product(*(space[key] for key in keys)):
+        config = _normalize(dict(zip(keys, values)))
+        if _is_valid(config) and config not in configs[:1]:
+            configs.append(config)
+    return configs
+
+
+# ✅ 랜덤 탐색 설정 목록 (중복 없이 samples개, 기준선 포함)
+def random_configs(space: dict = None, samples: int = 1000, seed: int = 0):
+    space = space or DEFAULT_SPACE
+    rng = random.Random(seed)
+    configs, seen = [baseline_config()], {json.dumps(baseline_config(), sort_keys=True, default=list)}
+    attempts = 0
+    while len(configs) < samples + 1 and attempts < samples * 20:
+        attempts += 1
+        config = _normalize({key: rng.choice(values) for key, values in space.items()})
+        signature = json.dumps(config, sort_keys=True, default=list)
+        if _is_valid(config) and signature not in seen:
+            seen.add(signature)
+            configs.append(config)
+    return configs
+
+
+# ✅ 봉 저장소 -> 평가용 이력 {"dates", "symbols", "Close", "High", "Low", "Volume"} (최근 bars개 날짜)
+def load_history(symbols: list = None, bars: int = HISTORY_BARS):
+    symbols = [s.upper() for s in symbols] if symbols is not None else bar_store.list_symbols()
+    frames = {}
+    for symbol in symbols:
+        frame = bar_store.load_bars(symbol)
+        if len(frame) > WARMUP_BARS:
+            frames[symbol] = frame
+    if not frames:
+        return None
+    index = pd.DatetimeIndex(sorted(set().union(*(frame.index for frame in frames.values())))[-bars:])
+    history = {"dates": index, "symbols": list(frames)}
+    for field in ["Close", "High", "Low", "Volume"]:
+        history[field] = np.column_stack([frames[s][field].reindex(index).to_numpy(float) for s in frames])
+    return history
+
+
+class SweepEvaluator:
+    def __init__(self, history: dict, horizons: tuple = FORWARD_HORIZONS, holdout: float = HOLDOUT_FRACTION):
+        self.close = pd.DataFrame(history["Close"])
+        self.high = pd.DataFrame(history["High"])
+        self.low = pd.DataFrame(history["Low"])
+        self.volume = pd.DataFrame(history["Volume"])
+        self.horizons = horizons
+        self._indicators = OrderedDict()
+        self._masks = OrderedDict()
+
+        close = self.close.to_numpy()
+        listed = np.cumsum(~np.isnan(close), axis=0)
+        self.eligible = (listed > WARMUP_BARS) & ~np.isnan(close) & ~np.isnan(self.close.shift(1).to_numpy())
+        split = int(len(close) * (1 - holdout))
+        self.periods = {"is": np.arange(len(close)) < split, "oos": np.arange(len(close)) >= split}
+
+        # 이후 수익률 / 같은 날 유니버스 평균 대비 초과 수익률 (모든 설정 공통)
+        self.forward, self.excess = {}, {}
+        for h in horizons:
+            forward = (self.close.shift(-h) / self.close - 1).to_numpy() * 100
+            forward[~self.eligible] = np.nan
+            observed = (~np.isnan(forward)).sum(axis=1, keepdims=True)
+            self.forward[h] = forward
+            self.excess[h] = forward - np.nansum(forward, axis=1, keepdims=True) / np.where(observed > 0, observed, 1)
+
+    # ✅ 지표 메모 (같은 이름 + 파라미터는 워커 안에서 한 번만 계산)
+    def _memo(self, key: tuple, compute):
+        if key in self._indicators:
+            self._indicators.move_to_end(key)
+            return self._indicators[key]
+        value = compute()
+        self._indicators[key] = value
+        while len(self._indicators) > MAX_CACHED_INDICATORS:
+            self._indicators.popitem(last=False)
+        return value
+
+    def _sma(self, frame: str, period: int):
+        return self._memo(("sma", frame, period), lambda: getattr(self, frame).rolling(period).mean())
+
+    def _ema(self, span: int):
+        return self._memo(("ema", span), lambda: self.close.ewm(span=span, adjust=False).mean())
+
+    def _true_range(self):
+        def compute():
+            prev_close = self.close.shift(1)
+            return np.fmax(self.high - self.low,
+                           np.fmax((self.high - prev_close).abs(), (self.low - prev_close).abs()))
+        return self._memo(("tr",), compute)
+
+    def _rsi(self, period: int):
+        def compute():
+            change = self.close.diff()
+            avg_gain = change.clip(lower=0).fillna(0).ewm(com=period - 1, adjust=False).mean()
+            avg_loss = (-change).clip(lower=0).fillna(0).ewm(com=period - 1, adjust=False).mean()
+            return 100 - 100 / (1 + avg_gain / (avg_loss + 1e-10))
+        return self._memo(("rsi", period), compute)
+
+    def _bollinger(self, period: int, num_std_dev: float):
+        def compute():
+            std = self._memo(("std", period), lambda: self.close.rolling(period).std())
+            middle = self._sma("close", period)
+            return middle + std * num_std_dev, middle - std * num_std_dev
+        return self._memo(("bb", period, num_std_dev), compute)
+
+    def _macd(self, short: int, long: int, signal: int):
+        def compute():
+            line = self._ema(short) - self._ema(long)
+            return line, line.ewm(span=signal, adjust=False).mean()
+        return self._memo(("macd", short, long, signal), compute)
+
+    def _stochastic(self, k_period: int, d_period: int):
+        def compute():
+            lowest = self._memo(("low_min", k_period), lambda: self.low.rolling(k_period).min())
+            highest = self._memo(("high_max", k_period), lambda: self.high.rolling(k_period).max())
+            fast_k = 100 * (self.close - lowest) / (highest - lowest + 1e-10)
+            return fast_k, fast_k.rolling(d_period).mean()
+        return self._memo(("stoch", k_period, d_period), compute)
+
+    def _atr(self, period: int):
+        return self._memo(("atr", period), lambda: self._true_range().ewm(span=period, adjust=False).mean())
+
+    def _adx(self, period: int):
+        def compute():
+            atr = self._atr(period)
+            plus_dm = self.high.diff().clip(lower=0).fillna(0)
+            minus_dm = (-self.low.diff()).clip(lower=0).fillna(0)
+            plus_di = 100 * plus_dm.ewm(span=period, adjust=False).mean() / (atr + 1e-10)
+            minus_di = 100 * minus_dm.ewm(span=period, adjust=False).mean() / (atr + 1e-10)
+            dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di + 1e-10)
+            return dx.ewm(span=period, adjust=False).mean(), plus_di, minus_di
+        return self._memo(("adx", period), compute)
+
+    # ✅ 지표 조합 -> 규칙 입력 피처 (TRADE_NUMERIC_FEATURES 이름, ma_periods는 순서대로 ma_5/ma_20/ma_50 자리)
+    def features(self, config: dict):
+        short, mid, long = config["ma_periods"]
+        bb_upper, bb_lower = self._bollinger(config["bb_period"], config["bb_num_std_dev"])
+        macd_line, macd_signal = self._macd(config["macd_short"], config["macd_long"], config["macd_signal"])
+        stoch_k, stoch_d = self._stochastic(config["stoch_k_period"], config["stoch_d_period"])
+        adx, plus_di, minus_di = self._adx(config["adx_period"])
+        columns = {
+            "current_price": self.close, "previous_close": self.close.shift(1), "volume": self.volume,
+            "rsi": self._rsi(config["rsi_period"]), "ma_5": self._sma("close", short),
+            "ma_20": self._sma("close", mid), "ma_50": self._sma("close", long),
+            "bb_upper": bb_upper, "bb_lower": bb_lower, "macd_line": macd_line, "macd_signal": macd_signal,
+            "stoch_k": stoch_k, "stoch_d": stoch_d, "atr": self._atr(config["atr_period"]),
+            "adx": adx, "plus_di": plus_di, "minus_di": minus_di,
+            "vma": self._sma("volume", config["vma_period"]),
+        }
+        return pd.DataFrame({name: frame.to_numpy().ravel() for name, frame in columns.items()})
+
+    # ✅ 규칙 마스크 메모 (가중치 / min_score만 다른 설정은 그대로 재사용)
+    def masks(self, config: dict):
+        key = indicator_key(config)
+        if key in self._masks:
+            self._masks.move_to_end(key)
+            return self._masks[key]
+        frame = self.features(config)
+        shape = self.close.shape
+        buy = evaluate_rules(frame, TRADE_BUY_RULES)
+        sell = evaluate_rules(frame, TRADE_SELL_RULES)
+        masks = {
+            "buy": {rule_id: buy[rule_id].to_numpy().reshape(shape) for rule_id in buy.columns},
+            "sell": {rule_id: sell[rule_id].to_numpy().reshape(shape) for rule_id in sell.columns},
+            "volume_confirm": evaluate_mask(frame, TRADE_VOLUME_CONFIRM).to_numpy().reshape(shape),
+        }
+        self._masks[key] = masks
+        while len(self._masks) > MAX_CACHED_MASKS:
+            self._masks.popitem(last=False)
+        return masks
+
+    # ✅ 설정별 점수 행렬 (날짜 × 종목)
+    def score(self, config: dict):
+        masks = self.masks(config)
+        buy = np.zeros(self.close.shape)
+        sell = np.zeros(self.close.shape)
+        for rule_id, mask in masks["buy"].items():
+            buy += mask * config.get(f"buy.{rule_id}", 1.0)
+        for rule_id, mask in masks["sell"].items():
+            sell += mask * config.get(f"sell.{rule_id}", 1.0)
+        # 거래량 확인: 기존 매수/매도 사유가 있는 쪽에만 덧붙음 (evaluate_trade_frame과 같은 방식)
+        has_buy = np.any(list(masks["buy"].values()), axis=0)
+        has_sell = np.any(list(masks["sell"].values()), axis=0)
+        volume = masks["volume_confirm"] * config.get("volume_confirm", 1.0)
+        return buy + volume * has_buy - sell - volume * has_sell
+
+    # ✅ 설정 1개 평가 -> 설정 + 구간별 성과 딕셔너리
+    def evaluate(self, config: dict):
+        entries = (self.score(config) >= config["min_score"]) & self.eligible
+        result = dict(config)
+        result["ma_periods"] = "/".join(str(p) for p in config["ma_periods"])
+        for period, rows in self.periods.items():
+            selected = entries & rows[:, None]
+            result[f"{period}_signals"] = int(selected.sum())
+            for h in self.horizons:
+                forward = self.forward[h][selected]
+                excess = self.excess[h][selected]
+                valid = ~np.isnan(forward)
+                count = int(valid.sum())
+                result[f"{period}_return_{h}d"] = round(float(forward[valid].mean()), 3) if count else None
+                result[f"{period}_excess_{h}d"] = round(float(excess[valid].mean()), 3) if count else None
+                result[f"{period}_hit_{h}d"] = round(float((forward[valid] > 0).mean() * 100), 1) if count else None
+                if count > 1:
+                    std = excess[valid].std(ddof=1)
+                    result[f"{period}_tstat_{h}d"] = round(float(excess[valid].mean() / std * np.sqrt(count)), 2) \
+                        if std > 0 else None
+                else:
+                    result[f"{period}_tstat_{h}d"] = None
+        return result
+
+
+# --- 프로세스 풀 워커 (fork 시 이력 배열은 복사 없이 공유) ---
+_worker = {"evaluator": None}
+
+
+def _init_worker(history: dict):
+    _worker["evaluator"] = SweepEvaluator(history)
+
+
+def _evaluate_chunk(configs: list):
+    return [_worker["evaluator"].evaluate(config) for config in configs]
+
+
+# ✅ 지표 조합 순으로 정렬해 같은 조합은 같은 청크로 (청크 수 ≈ workers × 4)
+def _chunk_configs(configs: list, workers: int):
+    groups = OrderedDict()
+    for config in sorted(configs, key=lambda c: tuple(map(str, indicator_key(c)))):
+        groups.setdefault(indicator_key(config), []).append(config)
+    target = max(1, len(configs) // (workers * 4))
+    chunks, current = [], []
+    for group in groups.values():
+        current.extend(group)
+        if len(current) >= target:
+            chunks.append(current)
+            current = []
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# ✅ 스윕 실행 -> 성과 테이블 (rank_by 내림차순, in-sample 진입이 MIN_SIGNALS 미만이면 뒤로)
+# progress(완료 설정 수, 전체 설정 수) 콜백 선택
+def run_sweep(configs: list, symbols: list = None, workers: int = None, rank_by: str = DEFAULT_RANK_METRIC,
+              history: dict = None, progress=None):
+    history = history if history is not None else load_history(symbols)
+    if history is None or not configs:
+        return pd.DataFrame()
+    configs = [_normalize(config) for config in configs]
+    workers = workers or os.cpu_count() or 1
+
+    results = []
+    if workers <= 1:
+        evaluator = SweepEvaluator(history)
+        for chunk in _chunk_configs(configs, 1):
+            results.extend(evaluator.evaluate(config) for config in chunk)
+            if progress:
+                progress(len(results), len(configs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(history,)) as executor:
+            futures = [executor.submit(_evaluate_chunk, chunk) for chunk in _chunk_configs(configs, workers)]
+            for future in as_completed(futures):
+                results.extend(future.result())
+                if progress:
+                    progress(len(results), len(configs))
+
+    table = pd.DataFrame(results)
+    enough = table["is_signals"] >= MIN_SIGNALS
+    table["_rank"] = table[rank_by].where(enough)
+    return table.sort_values("_rank", ascending=False, na_position="last").drop(columns="_rank") \
+        .reset_index(drop=True)
+
+
+# ✅ 결과 저장 (data/sweeps/<name>.parquet + 1위 설정 JSON) -> parquet 경로
+def save_sweep(results: pd.DataFrame, name: str = None):
+    name = name or datetime.now().strftime("sweep_%Y%m%d_%H%M%S")
+    path = os.path.join(SWEEP_DIR, f"{name}.parquet")
+    results.to_parquet(path)
+    if not results.empty:
+        best = {key: value for key, value in results.iloc[0].items() if pd.notna(value)}
+        with open(os.path.join(SWEEP_DIR, f"{name}.best.json"), "w", encoding="utf-8") as f:
+            json.dump(best, f, ensure_ascii=False, indent=2, default=str)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="지표/점수 파라미터 스윕")
+    parser.add_argument("--mode", choices=["grid", "random"], default="random", help="탐색 방식")
+    parser.add_argument("--samples", type=int, default=1000, help="랜덤 탐색 설정 수")
+    parser.add_argument("--weights", action="store_true", help="규칙 가중치도 탐색 (랜덤 탐색 권장)")
+    parser.add_argument("--symbols", nargs="*", help="평가 종목 (기본: 봉 저장소 전체)")
+    parser.add_argument("--refresh", action="store_true", help="평가 전에 봉 저장소 갱신 (새 종목은 3년치)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--rank-by", default=DEFAULT_RANK_METRIC, help="순위 기준 컬럼")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=10, help="출력할 상위 설정 수")
+    args = parser.parse_args()
+
+    if args.refresh:
+        bar_store.refresh_bars(args.symbols or bar_store.list_symbols(), period=HISTORY_PERIOD)
+    space = dict(DEFAULT_SPACE, **(weight_space() if args.weights else {}))
+    configs = grid_configs(space) if args.mode == "grid" else random_configs(space, args.samples, args.seed)
+
+    started = time.perf_counter()
+
+    def report(done, total):
+        print(f"\r{done}/{total} 설정 완료 ({time.perf_counter() - started:.0f}초)", end="", flush=True)
+
+    results = run_sweep(configs, symbols=args.symbols, workers=args.workers, rank_by=args.rank_by, progress=report)
+    print()
+    if results.empty:
+        print("평가할 봉 이력이 없습니다. --refresh 또는 봉 저장소를 먼저 채워주세요.")
+        return
+    print(f"결과 저장: {save_sweep(results)}")
+    columns = [c for c in results.columns if c in INDICATOR_KEYS or c == "min_score"] + \
+              ["is_signals", args.rank_by, args.rank_by.replace("is_", "oos_", 1)]
+    print(results[list(dict.fromkeys(columns))].head(args.top).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# ATR 기반 포지션 크기 / 리스크 예산 계산 (Alpaca 관심 종목 결과용)
+# 매수 신호가 켜진 종목 전체를 한 테이블로 놓고 한 번에 계산합니다 (200종목도 수 ms).
+#   - 손절가 = 진입가(현재가) - ATR × atr_multiple
+#   - 수량 = min(계좌 × 거래당 리스크% / 주당 리스크, 계좌 × 종목당 최대 비중% / 진입가) (정수 주)
+#   - R 배수 = (매도 적정가 - 진입가) / 주당 리스크
+#   - 포트폴리오 열(heat) = 전체 손절 시 손실 합계 / 계좌 (%) -> 한도를 넘으면 모든 수량을 같은 비율로 줄임
+
+DEFAULT_ACCOUNT_EQUITY = 100_000   # 계좌 평가금액 ($)
+DEFAULT_RISK_PCT = 1.0             # 거래당 리스크 (계좌 대비 %)
+DEFAULT_ATR_MULTIPLE = 2.0         # 손절 폭 (ATR 배수)
+DEFAULT_MAX_POSITION_PCT = 20.0    # 종목당 최대 투자 비중 (%)
+DEFAULT_MAX_HEAT_PCT = 6.0         # 포트폴리오 전체 리스크 한도 (%)
+
+PLAN_COLUMNS = ["ticker", "entry", "stop", "target", "risk_per_share", "shares", "position_value",
+                "position_pct", "dollar_risk", "risk_pct", "r_multiple"]
+
+
+# ✅ 매수 신호 종목 포지션 계획 -> (종목별 테이블, 요약 딕셔너리)
+def plan_positions(items: list, equity: float = DEFAULT_ACCOUNT_EQUITY, risk_pct: float = DEFAULT_RISK_PCT,
+                   atr_multiple: float = DEFAULT_ATR_MULTIPLE, max_position_pct: float = DEFAULT_MAX_POSITION_PCT,
+                   max_heat_pct: float = DEFAULT_MAX_HEAT_PCT):
+    frame = pd.DataFrame(list(items), columns=["ticker", "current_price", "atr", "sell_target_price", "buy_signal"])
+    for column in ["current_price", "atr", "sell_target_price"]:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").astype(float)
+    eligible = (frame["buy_signal"].fillna(False).astype(bool) & (frame["current_price"] > 0) & (frame["atr"] > 0))
+    frame = frame[eligible & (equity > 0)]  # 계좌 금액이 없으면 빈 계획
+
+    entry = frame["current_price"].to_numpy()
+    risk_per_share = frame["atr"].to_numpy() * atr_multiple
+    with np.errstate(invalid="ignore", divide="ignore"):
+        by_risk = equity * risk_pct / 100 / risk_per_share
+        by_weight = equity * max_position_pct / 100 / entry
+        shares = np.floor(np.fmin(by_risk, by_weight))
+
+        # 포트폴리오 열 한도 초과 시 전체 수량을 같은 비율로 축소
+        heat_before = (shares * risk_per_share).sum() / equity * 100 if equity > 0 else np.nan
+        capped = bool(heat_before > max_heat_pct)
+        if capped:
+            shares = np.floor(shares * max_heat_pct / heat_before)
+
+        # 총 투자금이 계좌를 넘으면 같은 방식으로 축소
+        invested_before = (shares * entry).sum()
+        if invested_before > equity > 0:
+            shares = np.floor(shares * equity / invested_before)
+            capped = True
+
+        target = frame["sell_target_price"].to_numpy()
+        plan = pd.DataFrame({
+            "ticker": frame["ticker"].to_numpy(),
+            "entry": entry,
+            "stop": entry - risk_per_share,
+            "target": target,
+            "risk_per_share": risk_per_share,
+            "shares": shares.astype(int),
+            "position_value": shares * entry,
+            "position_pct": shares * entry / equity * 100,
+            "dollar_risk": shares * risk_per_share,
+            "risk_pct": shares * risk_per_share / equity * 100,
+            "r_multiple": (target - entry) / risk_per_share,
+        }, columns=PLAN_COLUMNS).round({"stop": 2, "risk_per_share": 2, "position_value": 2, "position_pct": 2,
+                                         "dollar_risk": 2, "risk_pct": 2, "r_multiple": 2})
+
+    invested = float(plan["position_value"].sum())
+    total_risk = float(plan["dollar_risk"].sum())
+    summary = {
+        "positions": int((plan["shares"] > 0).sum()),
+        "invested": round(invested, 2),
+        "cash": round(equity - invested, 2),
+        "total_risk": round(total_risk, 2),
+        "heat_pct": round(total_risk / equity * 100, 2) if equity > 0 else None,
+        "heat_before_cap_pct": None if pd.isna(heat_before) else round(float(heat_before), 2),
+        "max_heat_pct": max_heat_pct,
+        "capped": capped,
+    }
+    return plan, summary
@@ -0,0 +1,140 @@
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+import bar_store
+from data_paths import data_path
+
+# 종목별 52주 범위 통계 인덱스 (Parquet 1개, 종목당 1행)
+# 봉 저장소(bar_store)의 최근 1년 봉으로 계산하며, 봉 파일이 바뀐 종목만 다시 계산합니다.
+# 전체 종목을 한 번에 조회할 수 있어 보석 발굴의 '덜 오른 종목' 조건을 무거운 분석 전에 거를 수 있습니다.
+
+RANGE_INDEX_PATH = data_path("range_index.parquet")
+WINDOW_BARS = 252   # 52주 (거래일 기준)
+ATR_PERIOD = 14
+
+# 보석 발굴 사전 필터 여유 (장중 가격 변동 고려, %p)
+RANGE_PREFILTER_SLACK_PCT = 2.0
+
+RANGE_COLUMNS = [
+    "high_52w", "low_52w", "high_date", "low_date", "last_close", "last_date", "bars",
+    "atr_14", "atr_pct", "range_atr", "high_gap_pct", "low_gap_pct", "high_gap_atr", "low_gap_atr",
+    "bars_mtime", "updated_at",
+]
+
+_lock = threading.Lock()
+_cache = {"mtime": None, "index": None}
+
+
+def _empty_index():
+    return pd.DataFrame(columns=RANGE_COLUMNS).rename_axis("symbol")
+
+
+# ✅ 인덱스 로드 (파일 변경 시에만 다시 읽음)
+def load_range_index():
+    with _lock:
+        try:
+            mtime = os.path.getmtime(RANGE_INDEX_PATH)
+        except OSError:
+            return _empty_index()
+        if _cache["mtime"] != mtime or _cache["index"] is None:
+            _cache["mtime"], _cache["index"] = mtime, pd.read_parquet(RANGE_INDEX_PATH)
+        return _cache["index"]
+
+
+def _save_range_index(index: pd.DataFrame):
+    tmp_path = f"{RANGE_INDEX_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    index.to_parquet(tmp_path)
+    with _lock:
+        os.replace(tmp_path, RANGE_INDEX_PATH)
+        _cache["mtime"], _cache["index"] = os.path.getmtime(RANGE_INDEX_PATH), index
+
+
+# ✅ 봉 테이블 -> 52주 범위 통계 (최근 WINDOW_BARS개 봉 기준)
+def compute_range_stats(bars: pd.DataFrame):
+    window = bars.dropna(subset=["High", "Low", "Close"]).tail(WINDOW_BARS + 1)
+    if len(window) < 2:
+        return None
+    prev_close = window["Close"].shift(1)
+    true_range = pd.concat([
+        window["High"] - window["Low"],
+        (window["High"] - prev_close).abs(),
+        (window["Low"] - prev_close).abs(),
+    ], axis=1).max(axis=1)
+    atr = true_range.iloc[1:].ewm(alpha=1 / ATR_PERIOD, adjust=False).mean().iloc[-1]  # Wilder ATR
+
+    window = window.tail(WINDOW_BARS)
+    high_52w = window["High"].max()
+    low_52w = window["Low"].min()
+    last_close = window["Close"].iloc[-1]
+    return {
+        "high_52w": round(high_52w, 2),
+        "low_52w": round(low_52w, 2),
+        "high_date": window["High"].idxmax(),
+        "low_date": window["Low"].idxmin(),
+        "last_close": round(last_close, 2),
+        "last_date": window.index[-1],
+        "bars": len(window),
+        "atr_14": round(atr, 4),
+        "atr_pct": round(atr / last_close * 100, 2) if last_close else None,
+        "range_atr": round((high_52w - low_52w) / atr, 2) if atr else None,
+        # swing_stock_data의 High_Proximity_Pct / Low_Proximity_Pct와 같은 정의 (현재가 대신 최근 종가)
+        "high_gap_pct": round((high_52w - last_close) / high_52w * 100, 2) if high_52w else None,
+        "low_gap_pct": round((last_close - low_52w) / low_52w * 100, 2) if low_52w else None,
+        "high_gap_atr": round((high_52w - last_close) / atr, 2) if atr else None,
+        "low_gap_atr": round((last_close - low_52w) / atr, 2) if atr else None,
+    }
+
+
+# ✅ 봉 파일이 바뀐 종목만 다시 계산해 인덱스 갱신 (symbols 없으면 봉 저장소 전체) -> 갱신 종목 수
+def update_range_index(symbols: list = None, force: bool = False):
+    symbols = [s.upper() for s in symbols] if symbols is not None else bar_store.list_symbols()
+    index = load_range_index()
+    rows = {}
+    for symbol in symbols:
+        try:
+            bars_mtime = os.path.getmtime(bar_store.bar_path(symbol))
+        except OSError:
+            continue
+        if not force and symbol in index.index and index.at[symbol, "bars_mtime"] == bars_mtime:
+            continue
+        stats = compute_range_stats(bar_store.load_bars(symbol))
+        if stats is None:
+            continue
+        stats["bars_mtime"] = bars_mtime
+        stats["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        rows[symbol] = stats
+    if rows:
+        updated = pd.DataFrame.from_dict(rows, orient="index")[RANGE_COLUMNS].rename_axis("symbol")
+        index = pd.concat([index.drop(index.index.intersection(updated.index)), updated]) if not index.empty else updated
+        _save_range_index(index.sort_index())
+    return len(rows)
+
+
+# ✅ 조건 조회 (전체 종목 대상, None인 조건은 무시)
+def query_range_index(symbols: list = None, min_high_gap_pct: float = None, max_high_gap_pct: float = None,
+                      min_low_gap_pct: float = None, max_atr_pct: float = None):
+    index = load_range_index()
+    if symbols is not None:
+        index = index[index.index.isin([s.upper() for s in symbols])]
+    mask = pd.Series(True, index=index.index)
+    if min_high_gap_pct is not None:
+        mask &= index["high_gap_pct"] >= min_high_gap_pct
+    if max_high_gap_pct is not None:
+        mask &= index["high_gap_pct"] <= max_high_gap_pct
+    if min_low_gap_pct is not None:
+        mask &= index["low_gap_pct"] >= min_low_gap_pct
+    if max_atr_pct is not None:
+        mask &= index["atr_pct"] <= max_atr_pct
+    return index[mask]
+
+
+# ✅ 보석 발굴 사전 필터: 봉 갱신 -> 인덱스 갱신 -> 52주 고점 대비 하락률 조건 통과 종목만 (인덱스에 없는 종목은 통과)
+def prefilter_high_gap(symbols: list, min_high_gap_pct: float, slack: float = RANGE_PREFILTER_SLACK_PCT):
+    bar_store.refresh_bars(symbols)
+    update_range_index(symbols)
+    index = load_range_index()
+    passed = set(query_range_index(symbols, min_high_gap_pct=min_high_gap_pct - slack).index)
+    return [s for s in symbols if s.upper() in passed or s.upper() not in index.index]
@@ -0,0 +1,602 @@
+import ast
+import json
+import os
+from string import Formatter
+
+import numpy as np
+import pandas as pd
+
+# 점수/추천 규칙 엔진
+# 규칙은 "피처 컬럼에 대한 조건식 + 가중치 + 사유"로 선언되고,
+# (종목 × 피처) 테이블 전체에 대해 불리언 마스크로 한 번에 평가됩니다.
+# 같은 group 안의 규칙은 위에서부터 처음 맞는 하나만 적용됩니다 (if/elif 체인과 동일).
+# 조건식은 DataFrame.eval 문법(and/or/not, 연쇄 비교)으로 쓰고, 처음 쓰일 때 numpy 배열 연산 코드로 한 번만 컴파일합니다
+# (기본 규칙은 임포트 시 컴파일). 평가 비용이 호출마다 고정으로 들지 않으므로 종목 1개 평가도 빠릅니다.
+
+# 가중치 튜닝 파일 경로 (예: {"rsi_oversold": 1.2, "volume_surge": 1.0})
+RULE_WEIGHTS_PATH = os.environ.get(
+    "TTEOKSANG_RULE_WEIGHTS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "rule_weights.json")
+)
+
+# ✅ yf 스윙 점수 규칙 (swing_stock_data)
+SWING_SCORE_RULES = [
+    # 1. 단기 추세 (MA_5 vs MA_20)
+    {"id": "ma_short_up", "group": "ma_short", "when": "MA_5 > MA_20", "weight": 1.5,
+     "reason": "단기 상승 추세 (MA5 > MA20)"},
+    {"id": "ma_dead_cross", "group": "ma_short", "when": "MA_5 < MA_20 and Prev_MA_5 >= Prev_MA_20", "weight": -1.5,
+     "reason": "데드크로스 발생"},
+    {"id": "golden_cross", "group": "ma_short_bonus", "when": "MA_5 > MA_20 and Trend == '골든크로스 발생'",
+     "weight": 1.5, "reason": "골든크로스 발생"},
+    {"id": "uptrend_5d", "group": "ma_short_bonus", "when": "MA_5 > MA_20 and Sustained_Days >= 5", "weight": 0.5,
+     "reason": "상승 추세 5일 이상 지속"},
+    {"id": "uptrend_3d", "group": "ma_short_bonus", "when": "MA_5 > MA_20 and Sustained_Days >= 3", "weight": 0.3,
+     "reason": "상승 추세 3일 이상 지속"},
+
+    # 장기 추세 (MA_60, MA_120)
+    {"id": "ma_long_up", "group": "ma_long", "when": "MA_60 > MA_120", "weight": 1.0,
+     "reason": "중장기 상승 추세 (MA60 > MA120)"},
+    {"id": "ma_long_down", "group": "ma_long", "when": "MA_60 <= MA_120", "weight": -0.5,
+     "reason": "중장기 하락 추세 (MA60 <= MA120)"},
+    {"id": "above_ma_120", "group": "ma_position", "when": "current_price > MA_120", "weight": 0.7,
+     "reason": "장기 추세선(MA120) 위"},
+    {"id": "above_ma_60", "group": "ma_position", "when": "current_price > MA_60", "weight": 0.5,
+     "reason": "중기 추세선(MA60) 위"},
+
+    # 2. RSI
+    {"id": "rsi_oversold", "group": "rsi", "when": "RSI_14 < 30", "weight": 1.0, "reason": "RSI 과매도 (< 30)"},
+    {"id": "rsi_near_oversold", "group": "rsi", "when": "30 <= RSI_14 < 40", "weight": 0.7,
+     "reason": "RSI 과매도 진입 직전 (30~40)"},
+    {"id": "rsi_momentum", "group": "rsi", "when": "40 <= RSI_14 < 70", "weight": 1.2,
+     "reason": "RSI 긍정적 모멘텀 (40~70)"},
+    {"id": "rsi_overbought", "group": "rsi", "when": "RSI_14 >= 70", "weight": -1.0, "reason": "RSI 과매수 (>= 70)"},
+
+    # 3. 이격도 (MA_20 기준)
+    {"id": "disparity_ideal", "group": "disparity", "when": "disp_min <= Disparity_20 <= disp_max", "weight": 0.5,
+     "reason": "이격도 적정 범위"},
+    {"id": "disparity_overheated", "group": "disparity", "when": "Disparity_20 > disp_max + 2", "weight": -0.7,
+     "reason": "이격 과대 (과열)"},
+    {"id": "disparity_oversold", "group": "disparity", "when": "Disparity_20 < disp_min - 2", "weight": 0.3,
+     "reason": "이격 과소 (과매도)"},
+
+    # 4. 볼린저 밴드 위치
+    {"id": "bb_breakout", "group": "bb", "when": "Price_Position == '상단 돌파'", "weight": 0.5,
+     "reason": "볼린저 상단 돌파"},
+    {"id": "bb_upper_half", "group": "bb", "when": "Price_Position == '중간 이상'", "weight": 0.7,
+     "reason": "볼린저 중간 이상"},
+    {"id": "bb_lower_touch", "group": "bb", "when": "Price_Position == '하단 근접'", "weight": 0.4,
+     "reason": "볼린저 하단 근접 (반등 가능성)"},
+
+    # 5. 갭 상승률
+    {"id": "gap_up_large", "group": "gap", "when": "Gap_Up_Pct >= 2.0", "weight": -0.5,
+     "reason": "2% 이상 갭 상승 (단기 고점 위험)"},
+    {"id": "gap_up_mild", "group": "gap", "when": "Gap_Up_Pct >= 0.5", "weight": 0.3, "reason": "완만한 갭 상승"},
+    {"id": "gap_down", "group": "gap", "when": "Gap_Up_Pct < -0.5", "weight": -1.0, "reason": "갭 하락"},
+
+    # 6. MACD
+    {"id": "macd_turn_up", "group": "macd", "when": "MACD_Trend == '양전환'", "weight": 1.2, "reason": "MACD 양전환"},
+    {"id": "macd_uptrend", "group": "macd", "when": "MACD_Trend == '상승 지속' and MACD > 0", "weight": 0.8,
+     "reason": "MACD 0선 위 상승 지속"},
+    {"id": "macd_turn_down", "group": "macd", "when": "MACD_Trend == '음전환'", "weight": -0.8, "reason": "MACD 음전환"},
+    {"id": "macd_downtrend", "group": "macd", "when": "MACD < 0 and MACD < MACD_Signal", "weight": -0.5,
+     "reason": "MACD 0선 아래 하락 지속"},
+
+    # 7. 거래량 비율
+    {"id": "volume_explosion", "group": "volume", "when": "Volume_Rate >= 3.0", "weight": 1.5,
+     "reason": "거래량 3배 이상 폭증"},
+    {"id": "volume_surge", "group": "volume", "when": "Volume_Rate >= 2.0", "weight": 1.2, "reason": "거래량 2배 이상 증가"},
+    {"id": "volume_steady", "group": "volume", "when": "Volume_Rate >= volume_rate_min", "weight": 1.0,
+     "reason": "섹터 기준 이상 거래량"},
+    {"id": "volume_dry", "group": "volume", "when": "Volume_Rate < 0.5", "weight": -1.0, "reason": "거래량 급감"},
+
+    # 8. Stochastic
+    {"id": "stoch_oversold_cross", "group": "stoch", "when": "Stoch_K < 20 and Stoch_K > Stoch_D", "weight": 1.0,
+     "reason": "스토캐스틱 과매도 골든크로스"},
+    {"id": "stoch_rising", "group": "stoch", "when": "20 <= Stoch_K <= 80 and Stoch_K > Stoch_D", "weight": 0.5,
+     "reason": "스토캐스틱 상승 지속"},
+    {"id": "stoch_neutral", "group": "stoch", "when": "20 <= Stoch_K <= 80", "weight": 0.2,
+     "reason": "스토캐스틱 일반 범위"},
+    {"id": "stoch_overbought_cross", "group": "stoch", "when": "Stoch_K > 80 and Stoch_K < Stoch_D", "weight": -0.5,
+     "reason": "스토캐스틱 과매수 데드크로스"},
+
+    # 9. 52주 고가/저가 비율
+    {"id": "high_low_ratio", "group": "high_low", "when": "High_Low_Ratio < high_low_max", "weight": 0.3,
+     "reason": "52주 고저 비율 적정"},
+
+    # 10. 고가 근접도
+    {"id": "near_52w_high", "group": "high_gap", "when": "High_Proximity_Pct <= 1.0", "weight": 0.7,
+     "reason": "52주 고가 1% 이내 (신고가 돌파 임박)"},
+    {"id": "close_to_52w_high", "group": "high_gap", "when": "High_Proximity_Pct <= 5.0", "weight": 0.3,
+     "reason": "52주 고가 5% 이내"},
+
+    # 11. 거래대금
+    {"id": "turnover_high", "group": "turnover", "when": "Volume_Turnover_Million >= 50", "weight": 0.8,
+     "reason": "거래대금 5천만 달러 이상"},
+    {"id": "turnover_mid", "group": "turnover", "when": "Volume_Turnover_Million >= 10", "weight": 0.4,
+     "reason": "거래대금 천만 달러 이상"},
+    {"id": "turnover_low", "group": "turnover", "when": "Volume_Turnover_Million < 1", "weight": -2.0,
+     "reason": "거래대금 1백만 달러 미만 (유동성 부족)"},
+
+    # 12. 옵션 정보
+    {"id": "call_dominant", "group": "call_put", "when": "Call_Put_Ratio > 2.0", "weight": 1.5,
+     "reason": "콜 거래량 압도적"},
+    {"id": "call_leading", "group": "call_put", "when": "Call_Put_Ratio > 1.2", "weight": 0.8, "reason": "콜 거래량 우세"},
+    {"id": "put_dominant", "group": "call_put", "when": "Call_Put_Ratio < 0.5", "weight": -0.8,
+     "reason": "풋 거래량 압도적"},
+    {"id": "call_strike_2pct", "group": "call_strike", "when": "Call_Strike_Gap_Pct <= 2.0", "weight": 1.5,
+     "reason": "대량 콜 스트라이크 2% 이내"},
+    {"id": "call_strike_5pct", "group": "call_strike", "when": "Call_Strike_Gap_Pct <= 5.0", "weight": 0.8,
+     "reason": "대량 콜 스트라이크 5% 이내"},
+    {"id": "put_strike_2pct", "group": "put_strike", "when": "Put_Strike_Gap_Pct <= 2.0", "weight": 0.7,
+     "reason": "대량 풋 스트라이크 2% 이내 (지지 기대)"},
+    {"id": "put_strike_5pct", "group": "put_strike", "when": "Put_Strike_Gap_Pct <= 5.0", "weight": 0.3,
+     "reason": "대량 풋 스트라이크 5% 이내"},
+
+    # 3일 연속 마감
+    {"id": "three_up_closes", "group": "consecutive", "when": "Consecutive_Closes == '3일 연속 양봉'", "weight": 1.0,
+     "reason": "3일 연속 양봉"},
+    {"id": "three_down_closes", "group": "consecutive", "when": "Consecutive_Closes == '3일 연속 음봉'", "weight": 1.5,
+     "reason": "3일 연속 음봉 (매수 기회)"},
+    {"id": "three_down_oversold", "group": "consecutive_rsi",
+     "when": "Consecutive_Closes == '3일 연속 음봉' and RSI_14 <= 30", "weight": 1.0,
+     "reason": "3일 연속 음봉 + RSI 과매도"},
+
+    # 다중 시간대 (multi_timeframe=True로 분석한 경우에만 피처가 있음, 없으면 NaN이라 미적용)
+    {"id": "mtf_aligned_up", "group": "mtf_trend",
+     "when": "MTF_Timeframes >= 3 and MTF_Uptrend_Count == MTF_Timeframes", "weight": 1.0,
+     "reason": "모든 시간대 상승 추세 일치"},
+    {"id": "mtf_aligned_down", "group": "mtf_trend",
+     "when": "MTF_Timeframes >= 3 and MTF_Uptrend_Count == 0", "weight": -1.0,
+     "reason": "모든 시간대 하락 추세"},
+    {"id": "mtf_intraday_pullback", "group": "mtf_entry",
+     "when": "MACD_1W > MACD_Signal_1W and RSI_14_1h <= 35 and Stoch_K_1h > Stoch_D_1h", "weight": 0.5,
+     "reason": "주봉 상승 중 1시간봉 과매도 반등"},
+    {"id": "mtf_intraday_overheat", "group": "mtf_entry", "when": "RSI_14_1h >= 75 and RSI_14_1D >= 70",
+     "weight": -0.5, "reason": "1시간봉/일봉 동시 과매수"},
+
+    # 섹터 순풍/역풍 (sector_rotation 매트릭스, RS-Ratio/Momentum 100 기준 RRG 국면, 섹터 ETF 봉이 없으면 NaN이라 미적용)
+    {"id": "sector_leading", "group": "sector_rotation",
+     "when": "Sector_RS_Rank <= 3 and Sector_RS_Ratio >= 100 and Sector_RS_Momentum >= 100", "weight": 0.7,
+     "reason": "섹터 상대강도 상위 + 선도 국면 (순풍)"},
+    {"id": "sector_improving", "group": "sector_rotation",
+     "when": "Sector_RS_Ratio < 100 and Sector_RS_Momentum >= 100 and Sector_RS_Rank_Change >= 2", "weight": 0.3,
+     "reason": "섹터 상대강도 개선 중"},
+    {"id": "sector_lagging", "group": "sector_rotation",
+     "when": "Sector_RS_Rank >= 9 and Sector_RS_Ratio < 100 and Sector_RS_Momentum < 100", "weight": -0.5,
+     "reason": "섹터 상대강도 하위 + 부진 국면 (역풍)"},
+
+    # 뉴스 감성 (news_sentiment, 최근 헤드라인 시간 감쇠 평균)
+    {"id": "news_positive", "group": "news", "when": "News_Sentiment >= 0.25 and News_Count >= 3", "weight": 0.5,
+     "reason": "최근 뉴스 감성 긍정적"},
+    {"id": "news_negative", "group": "news", "when": "News_Sentiment <= -0.25 and News_Count >= 3", "weight": -0.7,
+     "reason": "최근 뉴스 감성 부정적"},
+]
+
+# ✅ yf 추천 신호 규칙 (같은 signal 안의 규칙은 OR)
+SWING_SIGNAL_RULES = [
+    # --- 매수 신호 ---
+    {"signal": "strong_buy",
+     "when": "Consecutive_Closes == '3일 연속 음봉' and RSI_14 <= 40 and Score >= 6.0 and Volume_Rate >= volume_rate_min",
+     "reason": "3일 연속 음봉 + RSI 과매도 + 충분한 거래량"},
+    {"signal": "buy_consider",
+     "when": "Consecutive_Closes == '3일 연속 음봉' and RSI_14 <= 40 and Score >= 5.0 and Volume_Rate >= 0.8",
+     "reason": "3일 연속 음봉 + RSI 과매도"},
+    {"signal": "buy_consider",
+     "when": "current_price > MA_120 and Prev_MA_20 > MA_60 and 35 <= RSI_14 < 70"
+             " and Score >= 7.0 and MACD > MACD_Signal and Volume_Rate >= volume_rate_min",
+     "reason": "상승 추세 눌림목 (MACD 상승 + 거래량)"},
+    {"signal": "buy_consider",
+     "when": "current_price > MA_120 and Prev_MA_20 > MA_60 and 35 <= RSI_14 < 70"
+             " and Score >= 6.0 and Volume_Rate >= 0.8",
+     "reason": "상승 추세 눌림목"},
+    {"signal": "buy_consider",
+     "when": "Support_1st_Gap_Pct <= 1.0 and RSI_14 <= 60 and Score >= 5.5 and Volume_Rate >= 0.8",
+     "reason": "1차 지지선 근접"},
+    {"signal": "buy_consider",
+     "when": "~(Support_1st_Gap_Pct <= 1.0) and Support_2nd_Gap_Pct <= 1.0"
+             " and RSI_14 <= 55 and Score >= 5.0 and Volume_Rate >= 0.8",
+     "reason": "2차 지지선 근접"},
+    {"signal": "buy_consider",
+     "when": "~(Support_1st_Gap_Pct <= 1.0) and ~(Support_2nd_Gap_Pct <= 1.0) and Support_3rd_Gap_Pct <= 1.0"
+             " and RSI_14 <= 50 and Score >= 4.5 and Volume_Rate >= 0.7",
+     "reason": "3차 지지선 근접"},
+
+    # --- 매도 신호 ---
+    {"signal": "strong_sell",
+     "when": "RSI_14 >= 70 and Stoch_K > 80 and Stoch_K < Stoch_D and MACD < MACD_Signal and Score <= 5.0",
+     "reason": "과매수 + 모멘텀 약화"},
+    {"signal": "strong_sell",
+     "when": "Trend == '데드크로스 발생' and Score <= 4.0 and current_price < MA_60",
+     "reason": "60일선 아래 데드크로스"},
+    {"signal": "sell_consider", "when": "RSI_14 >= 65", "reason": "RSI 과매수권"},
+    {"signal": "sell_consider", "when": "Stoch_K > Stoch_D and Stoch_K > 70", "reason": "스토캐스틱 과매수권 유지"},
+    {"signal": "sell_consider", "when": "MACD < MACD_Signal", "reason": "MACD 음전환"},
+    {"signal": "sell_consider", "when": "Resistance_1st_Gap_Pct <= 1.0 and RSI_14 >= 65 and Volume_Rate < 1.0",
+     "reason": "1차 저항선 근접 + 상승 둔화"},
+    {"signal": "sell_consider", "when": "High_Proximity_Pct <= 1.0 and RSI_14 >= 70", "reason": "52주 고가 근접 + 과열"},
+
+    # --- 보조 신호 ---
+    {"signal": "uptrend_buy",
+     "when": "Score >= 7.0 and MACD > MACD_Signal and Volume_Rate >= volume_rate_min and current_price > MA_120",
+     "reason": "점수 양호 + 장기 추세 양호"},
+    {"signal": "watch", "when": "Score >= 5.0", "reason": "점수 5점 이상"},
+]
+
+# ✅ 최종 추천 우선순위 (위에서부터 처음 켜진 신호)
+SWING_RECOMMENDATIONS = [
+    ("strong_buy", "🔥 강력 매수 (과매도 반등)"),
+    ("strong_sell", "📉 강력 매도 (추세 이탈/과매수)"),
+    ("buy_consider", "✅ 매수 고려 (지지선 근접/모멘텀 전환)"),
+    ("sell_consider", "❌ 매도 고려 (과매수/저항)"),
+    ("uptrend_buy", "📈 상승 추세 매수"),
+    ("watch", "👀 관망 (추가 관찰)"),
+]
+SWING_DEFAULT_RECOMMENDATION = "⚠️ 관망 (혼조세)"
+
+# swing 규칙에서 숫자로 다루는 피처 컬럼
+SWING_NUMERIC_FEATURES = [
+    "current_price", "MA_5", "MA_20", "Prev_MA_5", "Prev_MA_20", "MA_60", "MA_120", "RSI_14", "Disparity_20",
+    "Gap_Up_Pct", "MACD", "MACD_Signal", "Volume_Rate", "Volume_Turnover_Million", "Stoch_K", "Stoch_D",
+    "High_Low_Ratio", "High_Proximity_Pct", "Sustained_Days", "Call_Put_Ratio", "Call_Strike_Gap_Pct",
+    "Put_Strike_Gap_Pct", "Support_1st", "Support_2nd", "Support_3rd", "Resistance_1st",
+    "volume_rate_min", "disp_min", "disp_max", "high_low_max",
+    # 다중 시간대 피처 (multi_timeframe)
+    "MTF_Timeframes", "MTF_Uptrend_Count", "RSI_14_1h", "Stoch_K_1h", "Stoch_D_1h", "RSI_14_1D",
+    "MACD_1W", "MACD_Signal_1W",
+    # 섹터 로테이션 피처 (sector_rotation)
+    "Sector_RS_Score", "Sector_RS_Rank", "Sector_RS_Rank_Change", "Sector_RS_3m", "Sector_RS_Ratio",
+    "Sector_RS_Momentum",
+    # 뉴스 감성 피처 (news_sentiment)
+    "News_Sentiment", "News_Count", "News_Buzz",
+]
+
+# ✅ Alpaca 매수/매도 신호 규칙 (determine_trade_signals)
+# "x == x"는 NaN이 아님(값 존재)을 뜻합니다 - 기존 None 체크 조건 유지용
+TRADE_BUY_RULES = [
+    {"id": "rsi_oversold", "when": "rsi <= 30", "reason": "RSI 과매도 (<= 30)"},
+    {"id": "ma_aligned", "group": "ma", "when": "ma_5 > ma_20 and ma_20 > ma_50 and current_price > ma_50",
+     "reason": "이동평균선 정배열 및 주가 MA50 상회"},
+    {"id": "ma_short_up", "group": "ma", "when": "ma_5 > ma_20 and current_price > ma_5 and ma_50 == ma_50",
+     "reason": "MA5가 MA20 상회하며 주가 상승 추세"},
+    {"id": "above_all_ma", "when": "current_price > ma_5 and current_price > ma_20 and current_price > ma_50",
+     "reason": "현재가가 모든 주요 이동평균선 위에 위치"},
+    {"id": "bb_lower", "when": "current_price < bb_lower * 1.01 and bb_upper == bb_upper", "reason": "볼린저 밴드 하단 근접"},
+    {"id": "macd_golden", "when": "macd_line > macd_signal", "reason": "MACD 골든크로스 (MACD > Signal)"},
+    {"id": "stoch_oversold_turn", "when": "stoch_k <= 20 and stoch_k > stoch_d",
+     "reason": "스토캐스틱 과매도 구간에서 상승 전환 (K > D, K<=20)"},
+    {"id": "atr_breakout_up", "when": "current_price > previous_close + atr",
+     "reason": "ATR 상향 돌파 (전일 종가 + {atr:.2f} 이상)"},
+    {"id": "adx_uptrend", "when": "adx > 25 and plus_di > minus_di", "reason": "강한 상승 추세 (ADX > 25, +DI > -DI)"},
+]
+TRADE_SELL_RULES = [
+    {"id": "rsi_overbought", "when": "rsi >= 70", "reason": "RSI 과매수 (>= 70)"},
+    {"id": "ma_inverse", "group": "ma", "when": "ma_5 < ma_20 and ma_20 < ma_50 and current_price < ma_50",
+     "reason": "이동평균선 역배열 및 주가 MA50 하회"},
+    {"id": "ma_short_down", "group": "ma", "when": "ma_5 < ma_20 and current_price < ma_5 and ma_50 == ma_50",
+     "reason": "MA5가 MA20 하회하며 주가 하락 추세"},
+    {"id": "bb_upper", "when": "current_price > bb_upper * 0.99", "reason": "볼린저 밴드 상단 근접"},
+    {"id": "macd_dead", "when": "macd_line < macd_signal", "reason": "MACD 데드크로스 (MACD < Signal)"},
+    {"id": "stoch_overbought_turn", "when": "stoch_k >= 80 and stoch_k < stoch_d",
+     "reason": "스토캐스틱 과매수 구간에서 하락 전환 (K < D, K>=80)"},
+    {"id": "atr_breakout_down", "when": "current_price < previous_close - atr",
+     "reason": "ATR 하향 돌파 (전일 종가 - {atr:.2f} 이하)"},
+    {"id": "adx_downtrend", "when": "adx > 25 and minus_di > plus_di", "reason": "강한 하락 추세 (ADX > 25, -DI > +DI)"},
+]
+# 기존 신호가 하나 이상 있을 때만 덧붙는 거래량 확인 규칙
+TRADE_VOLUME_CONFIRM = "volume > vma * 1.5"
+TRADE_BUY_VOLUME_REASON = "높은 거래량 동반 매수 신호 (Volume > 1.5 * VMA)"
+TRADE_SELL_VOLUME_REASON = "높은 거래량 동반 매도 신호 (Volume > 1.5 * VMA)"
+
+TRADE_NUMERIC_FEATURES = [
+    "current_price", "previous_close", "volume", "rsi", "ma_5", "ma_20", "ma_50", "bb_upper", "bb_lower",
+    "macd_line", "macd_signal", "stoch_k", "stoch_d", "atr", "adx", "plus_di", "minus_di", "vma",
+]
+
+
+# ✅ 가중치 덮어쓰기 (코드 수정 없이 튜닝)
+def load_rule_weights(path: str = None):
+    path = path or RULE_WEIGHTS_PATH
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            weights = json.load(f)
+        return {str(k): float(v) for k, v in weights.items()}
+    except (OSError, ValueError, TypeError):
+        return {}
+
+
+def apply_rule_weights(rules: list, weights: dict):
+    if not weights:
+        return rules
+    return [dict(rule, weight=weights.get(rule["id"], rule["weight"])) for rule in rules]
+
+
+# ✅ 피처 테이블 정규화 (None -> NaN, 숫자 컬럼 float 변환, 누락 컬럼 NaN 추가)
+def to_feature_frame(rows, numeric_columns: list):
+    frame = rows.copy() if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+    updates = {}
+    for column in numeric_columns:
+        if column not in frame.columns:
+            updates[column] = np.full(len(frame), np.nan)
+        elif frame[column].dtype != np.float64:
+            updates[column] = pd.to_numeric(frame[column], errors="coerce").astype(float).to_numpy()
+    if updates:
+        # 컬럼을 하나씩 넣으면 종목 수와 무관하게 호출마다 비용이 커지므로 한 번에 교체/추가
+        frame[list(updates)] = pd.DataFrame(updates, index=frame.index)
+    return frame
+
+
+class _MaskTransformer(ast.NodeTransformer):
+    # DataFrame.eval 문법 -> 배열 연산: and/or/not -> &/|/~, a < b < c -> (a < b) & (b < c), 이름 -> 컬럼 배열
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        result = node.values[0]
+        for value in node.values[1:]:
+            result = ast.BinOp(left=result, op=op, right=value)
+        return result
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=node.operand)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        left, result = node.left, None
+        for op, right in zip(node.ops, node.comparators):
+            part = ast.Compare(left=left, ops=[op], comparators=[right])
+            result = part if result is None else ast.BinOp(left=result, op=ast.BitAnd(), right=part)
+            left = right
+        return result
+
+    def visit_Name(self, node):
+        return ast.Subscript(value=ast.Name(id="_columns", ctx=ast.Load()), slice=ast.Constant(node.id),
+                             ctx=ast.Load())
+
+
+_compiled = {}  # 조건식 -> 코드 객체
+
+
+# ✅ 조건식 컴파일 (조건식마다 한 번)
+def compile_expression(expression: str):
+    code = _compiled.get(expression)
+    if code is None:
+        tree = _MaskTransformer().visit(ast.parse(expression.strip(), mode="eval"))
+        code = compile(ast.fix_missing_locations(tree), f"<rule: {expression}>", "eval")
+        _compiled[expression] = code
+    return code
+
+
+class _FrameColumns(dict):
+    # 조건식에서 쓰는 컬럼만 numpy 배열로 꺼냄 (같은 평가 안에서는 재사용)
+    def __init__(self, frame: pd.DataFrame):
+        super().__init__()
+        self.frame = frame
+
+    def __missing__(self, name):
+        if name not in self.frame.columns:
+            raise NameError(f"규칙 조건식의 컬럼이 없습니다: {name}")
+        values = self.frame[name].to_numpy()
+        self[name] = values
+        return values
+
+
+def _mask_array(columns: _FrameColumns, expression: str):
+    with np.errstate(invalid="ignore"):
+        mask = eval(compile_expression(expression), {"__builtins__": {}}, {"_columns": columns})
+    if np.ndim(mask) == 0:
+        return np.full(len(columns.frame), bool(mask))
+    mask = np.asarray(mask)
+    if mask.dtype != bool:
+        mask = pd.Series(mask).fillna(False).astype(bool).to_numpy()
+    return mask
+
+
+# ✅ 조건식 -> 불리언 마스크 (NaN 비교는 False)
+def evaluate_mask(frame: pd.DataFrame, expression: str):
+    return pd.Series(_mask_array(_FrameColumns(frame), expression), index=frame.index)
+
+
+# ✅ 규칙 목록 평가: 그룹별 first-match, 마스크 행렬 반환
+def evaluate_rules(frame: pd.DataFrame, rules: list):
+    masks = {}
+    claimed = {}
+    columns = _FrameColumns(frame)
+    for rule in rules:
+        mask = _mask_array(columns, rule["when"])
+        group = rule.get("group")
+        if group is not None:
+            taken = claimed.get(group)
+            if taken is not None:
+                mask = mask & ~taken
+                claimed[group] = taken | mask
+            else:
+                claimed[group] = mask
+        masks[rule["id"]] = mask
+    return pd.DataFrame(masks, index=frame.index)
+
+
+# ✅ 매칭된 규칙 사유를 행별 리스트로 수집 (포맷 필드는 해당 행 값으로 채움)
+def collect_reasons(frame: pd.DataFrame, rules: list, masks: pd.DataFrame):
+    reasons = [[] for _ in range(len(frame))]
+    for rule in rules:
+        hit_positions = np.flatnonzero(masks[rule["id"]].to_numpy())
+        if len(hit_positions) == 0:
+            continue
+        template = rule["reason"]
+        fields = [name for _, name, _, _ in Formatter().parse(template) if name]
+        columns = {name: frame[name].to_numpy() for name in fields}
+        for pos in hit_positions:
+            if fields:
+                reasons[pos].append(template.format(**{name: values[pos] for name, values in columns.items()}))
+            else:
+                reasons[pos].append(template)
+    return pd.Series(reasons, index=frame.index, dtype=object)
+
+
+# ✅ 가중치 점수 계산 (규칙 순서대로 누적, 최소 점수 floor)
+def score_frame(frame: pd.DataFrame, rules: list = None, floor: float = 0.0):
+    rules = rules if rules is not None else SWING_SCORE_RULES
+    masks = evaluate_rules(frame, rules)
+    score = np.zeros(len(frame))
+    for rule in rules:
+        score = score + masks[rule["id"]].to_numpy() * rule["weight"]
+    if floor is not None:
+        score = np.where(score >= floor, score, floor)
+    score = pd.Series(score, index=frame.index)
+
+    reason_rules = [dict(rule, reason=f"{rule['reason']} ({rule['weight']:+.1f})") for rule in rules]
+    return score, collect_reasons(frame, reason_rules, masks)
+
+
+# ✅ 신호 플래그 -> 우선순위 추천
+def recommend_frame(frame: pd.DataFrame, signal_rules: list = None, priorities: list = None,
+                    default: str = SWING_DEFAULT_RECOMMENDATION):
+    signal_rules = signal_rules if signal_rules is not None else SWING_SIGNAL_RULES
+    priorities = priorities if priorities is not None else SWING_RECOMMENDATIONS
+
+    flags = {}
+    columns = _FrameColumns(frame)
+    for rule in signal_rules:
+        mask = _mask_array(columns, rule["when"])
+        flags[rule["signal"]] = flags[rule["signal"]] | mask if rule["signal"] in flags else mask
+
+    conditions = [flags.get(signal, np.zeros(len(frame), dtype=bool)) for signal, _ in priorities]
+    labels = [label for _, label in priorities]
+    recommendation = np.select(conditions, labels, default=default) if conditions else np.full(len(frame), default)
+    return pd.Series(recommendation, index=frame.index, dtype=object)
+
+
+# ✅ 섹터 프로파일 값을 피처 컬럼으로 펼치기
+def attach_profile_columns(frame: pd.DataFrame, profiles: dict, sector_column: str = "sector"):
+    frame = frame.copy()
+    default = profiles["Default"]
+    sectors = frame[sector_column] if sector_column in frame.columns else pd.Series("Default", index=frame.index)
+    picked = [profiles.get(s, default) for s in sectors]
+    frame["volume_rate_min"] = [p["volume_rate_min"] for p in picked]
+    frame["disp_min"] = [p["disparity_range"][0] for p in picked]
+    frame["disp_max"] = [p["disparity_range"][1] for p in picked]
+    frame["high_low_max"] = [p["high_low_max"] for p in picked]
+    return frame
+
+
+# ✅ 파생 피처 (지지/저항 근접도) - 결과 딕셔너리만으로 계산 가능한 값
+def add_derived_swing_features(frame: pd.DataFrame):
+    frame = frame.copy()
+    price = frame["current_price"]
+    for column in ["Support_1st", "Support_2nd", "Support_3rd", "Resistance_1st"]:
+        level = frame[column]
+        frame[f"{column}_Gap_Pct"] = ((price - level) / level * 100).abs()
+    return frame
+
+
+# ✅ (종목 × 피처) 테이블 전체 점수/추천 계산
+def evaluate_swing_frame(rows, profiles: dict = None, score_rules: list = None, signal_rules: list = None):
+    frame = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+    if profiles is not None and "volume_rate_min" not in frame.columns:
+        frame = attach_profile_columns(frame, profiles)
+    frame = to_feature_frame(frame, SWING_NUMERIC_FEATURES)
+    frame = add_derived_swing_features(frame)
+
+    if score_rules is None:
+        score_rules = apply_rule_weights(SWING_SCORE_RULES, load_rule_weights())
+    score, reasons = score_frame(frame, score_rules)
+    frame["Score"] = score
+    frame["Recommendation"] = recommend_frame(frame, signal_rules)
+    frame["Score_Reasons"] = reasons
+    return frame
+
+
+# ✅ Alpaca 신호 테이블 계산 (determine_trade_signals의 벡터화 버전)
+def evaluate_trade_frame(rows):
+    frame = to_feature_frame(rows, TRADE_NUMERIC_FEATURES)
+    valid = (frame["current_price"].notna() & frame["previous_close"].notna()).to_numpy()
+
+    buy_masks = evaluate_rules(frame, TRADE_BUY_RULES)
+    sell_masks = evaluate_rules(frame, TRADE_SELL_RULES)
+    buy_reasons = collect_reasons(frame, TRADE_BUY_RULES, buy_masks)
+    sell_reasons = collect_reasons(frame, TRADE_SELL_RULES, sell_masks)
+
+    volume_confirm = evaluate_mask(frame, TRADE_VOLUME_CONFIRM).to_numpy()
+    for pos in np.flatnonzero(volume_confirm & valid):
+        if buy_reasons.iat[pos]:
+            buy_reasons.iat[pos].append(TRADE_BUY_VOLUME_REASON)
+        if sell_reasons.iat[pos]:
+            sell_reasons.iat[pos].append(TRADE_SELL_VOLUME_REASON)
+
+    n_buy = buy_reasons.map(len).to_numpy()
+    n_sell = sell_reasons.map(len).to_numpy()
+    has_buy = (n_buy > 0) & valid
+    has_sell = (n_sell > 0) & valid
+    rsi = frame["rsi"].to_numpy()
+    mixed = has_buy & has_sell
+
+    # 혼조 시 사유 목록에 해당 문구 자체가 있는지로 판단 (기존 로직 유지)
+    buy_strong = buy_reasons.map(lambda r: "ATR 상향 돌파" in r or "강한 상승 추세" in r).to_numpy()
+    sell_strong = sell_reasons.map(lambda r: "ATR 하향 돌파" in r or "강한 하락 추세" in r).to_numpy()
+    with np.errstate(invalid="ignore"):
+        buy_lean = (n_buy > n_sell) & (rsi <= 35)
+        sell_lean = (n_sell > n_buy) & (rsi >= 65)
+
+    trade_opinion = np.select(
+        [~valid,
+         mixed & buy_strong, mixed & sell_strong, mixed & buy_lean, mixed & sell_lean, mixed,
+         has_buy, has_sell],
+        ["데이터 부족",
+         "강력 매수 (ATR 또는 ADX 기반 혼조)", "강력 매도 (ATR 또는 ADX 기반 혼조)",
+         "매수 고려 (혼조세 속 매수 우위)", "매도 고려 (혼조세 속 매도 우위)", "혼조 (매수/매도 신호 충돌)",
+         "매수", "매도"],
+        default="관망"
+    )
+
+    buy_target = frame["bb_lower"].fillna(frame["ma_20"])
+    sell_target = frame["bb_upper"].fillna(frame["ma_20"])
+
+    result = pd.DataFrame(index=frame.index)
+    result["buy_signal"] = has_buy
+    result["buy_reasons"] = [r if ok else [] for r, ok in zip(buy_reasons, valid)]
+    result["buy_target_price"] = pd.Series(
+        [v if ok and pd.notna(v) else None for v, ok in zip(buy_target, valid)], index=frame.index, dtype=object)
+    result["sell_signal"] = has_sell
+    result["sell_reasons"] = [r if ok else [] for r, ok in zip(sell_reasons, valid)]
+    result["sell_target_price"] = pd.Series(
+        [v if ok and pd.notna(v) else None for v, ok in zip(sell_target, valid)], index=frame.index, dtype=object)
+    result["trade_opinion"] = trade_opinion
+    return result
+
+
+# 기본 규칙 조건식은 임포트 시 미리 컴파일
+for _rule in SWING_SCORE_RULES + SWING_SIGNAL_RULES + TRADE_BUY_RULES + TRADE_SELL_RULES:
+    compile_expression(_rule["when"])
+compile_expression(TRADE_VOLUME_CONFIRM)
+
+
+# 컴파일된 조건식이 DataFrame.eval과 같은 마스크를 내는지 확인 (결측값/문자열 피처가 섞인 무작위 400종목)
+# 사용 예: python rule_engine.py
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    n = 400
+    frame = pd.DataFrame({column: rng.normal(50, 30, n) for column in
+                          sorted(set(SWING_NUMERIC_FEATURES + TRADE_NUMERIC_FEATURES))})
+    frame = frame.mask(rng.random(frame.shape) < 0.05)
+    frame["Score"] = rng.uniform(0, 12, n)
+    for column in ["Support_1st", "Support_2nd", "Support_3rd", "Resistance_1st"]:
+        frame[f"{column}_Gap_Pct"] = rng.uniform(0, 3, n)
+    frame["Trend"] = rng.choice(["골든크로스 발생", "데드크로스 발생", "상승 추세", None], n)
+    frame["Price_Position"] = rng.choice(["상단 돌파", "중간 이상", "하단 근접", None], n)
+    frame["MACD_Trend"] = rng.choice(["양전환", "상승 지속", "음전환", None], n)
+    frame["Consecutive_Closes"] = rng.choice(["3일 연속 양봉", "3일 연속 음봉", "혼조", None], n)
+
+    expressions = [rule["when"] for rule in SWING_SCORE_RULES + SWING_SIGNAL_RULES + TRADE_BUY_RULES + TRADE_SELL_RULES]
+    expressions.append(TRADE_VOLUME_CONFIRM)
+    mismatches = 0
+    for expression in expressions:
+        expected = frame.eval(expression, engine="python").fillna(False).astype(bool)
+        actual = evaluate_mask(frame, expression)
+        if not actual.equals(expected):
+            mismatches += 1
+            print(f"❌ 불일치 ({int((actual != expected).sum())}행): {expression}")
+    print(f"✅ 조건식 {len(expressions)}개 × {n}행 확인, 불일치 {mismatches}개")
@@ -0,0 +1,393 @@
+import argparse
+import csv
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# 명령줄 배치 스캐너 (Streamlit 없이 전체 유니버스 스캔)
+# - 유니버스: 파일 또는 표준 입력 (줄/쉼표/공백 구분, # 주석, 첫 줄 ticker/symbol 헤더 허용)
+# - 분석: yf(swing_stock_data, 종목별 작업자 스레드) / ap(merge_swing_data, 묶음 단위)
+# - 출력: 결과가 나오는 대로 CHUNK_SIZE개씩 Parquet(행 그룹) / CSV / JSONL로 저장 (컬럼은 모든 묶음의 합집합)
+# - 진행 상황과 단계별 소요 시간(다운로드, 지표, 옵션, 뉴스 등)을 표준 에러로 출력
+#
+# 사용 예 (cron 등):
+#   python scan_cli.py universe.txt -o scans/today.parquet --workers 16
+#   cat tickers.txt | python scan_cli.py - -o out.jsonl
+#   python scan_cli.py universe.csv -o out.csv --source ap --record
+
+DEFAULT_WORKERS = 8
+CHUNK_SIZE = 200          # 출력 파일에 한 번에 쓰는 결과 수 (Parquet 행 그룹 크기)
+PROGRESS_EVERY = 25       # 진행 상황 출력 간격 (종목 수)
+AP_BATCH_SIZE = 100       # ap 분석 1회당 종목 수
+OUTPUT_FORMATS = ("parquet", "csv", "jsonl")
+HEADER_TOKENS = {"TICKER", "TICKERS", "SYMBOL", "SYMBOLS"}
+
+# 분석 경로별로 출력 파일에 항상 들어가는 컬럼 (모든 종목이 실패해도 유지, yf는 묶음 점수화 컬럼 포함)
+KNOWN_COLUMNS = {
+    "yf": {"ticker": pa.string(), "sector": pa.string(), "current_price": pa.float64(),
+           "Score": pa.float64(), "Score_Reasons": pa.string(), "Recommendation": pa.string()},
+    "ap": {"ticker": pa.string(), "current_price": pa.float64(), "trade_opinion": pa.string()},
+}
+
+
+# ✅ 유니버스 읽기 (중복 제거, 대문자, 입력 순서 유지)
+def read_universe(lines):
+    tickers = []
+    for line in lines:
+        line = line.split("#", 1)[0]
+        tickers.extend(token.upper() for token in re.split(r"[\s,;]+", line) if token)
+    if tickers and tickers[0] in HEADER_TOKENS:
+        tickers = tickers[1:]
+    return list(dict.fromkeys(tickers))
+
+
+def load_universe(path: str):
+    if path == "-":
+        return read_universe(sys.stdin)
+    with open(path, "r", encoding="utf-8") as f:
+        return read_universe(f)
+
+
+# --- 출력 (결과 묶음 단위로 이어 쓰기) ---
+
+def _json_default(value):
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+# ✅ 리스트/딕셔너리 값 -> 문자열 (값 리스트는 " | "로 합치고, 딕셔너리가 들어 있으면 JSON)
+def _flatten(value):
+    if isinstance(value, dict) or (isinstance(value, (list, tuple)) and any(isinstance(v, dict) for v in value)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    if isinstance(value, (list, tuple)):
+        return " | ".join(map(str, value))
+    return value
+
+
+# ✅ 결과 묶음 -> 열 형식 테이블 (숫자 컬럼은 float, 나머지는 문자열)
+def _results_to_frame(results: list):
+    frame = pd.DataFrame(list(results))
+    for column in frame.columns:
+        if frame[column].dtype == bool:
+            frame[column] = frame[column].astype(float)
+        if pd.api.types.is_numeric_dtype(frame[column]):
+            continue
+        frame[column] = frame[column].map(_flatten)
+        if pd.api.types.infer_dtype(frame[column], skipna=True) in ("integer", "floating", "mixed-integer-float"):
+            frame[column] = pd.to_numeric(frame[column], errors="coerce")
+        else:
+            frame[column] = frame[column].map(lambda v: None if v is None or (isinstance(v, float) and pd.isna(v)) else str(v))
+    return frame
+
+
+# ✅ 결과 묶음 -> Arrow 테이블 (숫자 컬럼은 float64, 값이 모두 비어 있으면 null 타입, 나머지는 문자열)
+def _results_to_table(results: list):
+    frame = _results_to_frame(results)
+    fields = []
+    for column in frame.columns:
+        if pd.api.types.is_numeric_dtype(frame[column]):
+            fields.append((column, pa.float64()))
+        elif frame[column].isna().all():
+            frame[column] = None
+            fields.append((column, pa.null()))
+        else:
+            fields.append((column, pa.string()))
+    return pa.Table.from_pandas(frame, schema=pa.schema(fields), preserve_index=False)
+
+
+# ✅ 묶음별 스키마 합치기 (컬럼은 처음 나온 순서, 문자열이 한 번이라도 나오면 문자열, 끝까지 비어 있으면 float64)
+def _unify_schemas(schemas: list):
+    rank = {"null": 0, "double": 1, "string": 2}
+    types = {}
+    for schema in schemas:
+        for field in schema:
+            previous = types.get(field.name)
+            if previous is None or rank[str(field.type)] > rank[str(previous)]:
+                types[field.name] = field.type
+    return pa.schema([(name, pa.float64() if pa.types.is_null(kind) else kind) for name, kind in types.items()])
+
+
+# ✅ 테이블을 합친 스키마에 맞춤 (없는 컬럼은 빈 값, 타입이 넓어진 컬럼은 변환)
+def _conform(table: pa.Table, schema: pa.Schema):
+    columns = []
+    for field in schema:
+        if field.name in table.column_names:
+            column = table[field.name]
+            columns.append(column if column.type == field.type else column.cast(field.type))
+        else:
+            columns.append(pa.nulls(table.num_rows, field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+class ResultWriter:
+    # 결과를 묶음 단위로 파일에 이어 씀 (형식: parquet / csv / jsonl)
+    # parquet/csv: 묶음마다 임시 디렉토리에 Parquet 파일 1개로 쓰고, close 때 모든 묶음(+ columns로 받은 기본 컬럼)의
+    #   스키마를 합쳐 최종 파일로 옮김 -> 뒤 묶음에만 있는 컬럼이나 넓어진 타입도 버리지 않음 (옮길 때도 한 묶음씩만 읽음)
+    # jsonl: 결과 딕셔너리를 그대로 이어 씀
+    def __init__(self, path: str, fmt: str = None, columns: dict = None):
+        self.path = path
+        self.format = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+        if self.format not in OUTPUT_FORMATS:
+            raise ValueError(f"지원하지 않는 출력 형식: {self.format} ({', '.join(OUTPUT_FORMATS)})")
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self.parts_dir = f"{path}.{os.getpid()}.parts"
+        self.columns = columns or {}
+        self.parts = []  # (묶음 파일 경로, 스키마)
+        self.rows = 0
+        self._file = None
+
+    def write(self, results: list):
+        if not results:
+            return
+        if self.format == "jsonl":
+            if self._file is None:
+                self._file = open(self.tmp_path, "w", encoding="utf-8")
+            for result in results:
+                self._file.write(json.dumps(result, ensure_ascii=False, default=_json_default) + "\n")
+            self._file.flush()
+            self.rows += len(results)
+            return
+
+        table = _results_to_table(results)
+        os.makedirs(self.parts_dir, exist_ok=True)
+        part_path = os.path.join(self.parts_dir, f"part-{len(self.parts):05d}.parquet")
+        pq.write_table(table, part_path)
+        self.parts.append((part_path, table.schema))
+        self.rows += table.num_rows
+
+    # 묶음 파일들 -> 최종 임시 파일 (합친 스키마, 묶음 1개 = Parquet 행 그룹 1개)
+    def _merge_parts(self):
+        schema = _unify_schemas([pa.schema(list(self.columns.items()))] + [schema for _, schema in self.parts])
+        if self.format == "parquet":
+            with pq.ParquetWriter(self.tmp_path, schema) as writer:
+                for part_path, _ in self.parts:
+                    writer.write_table(_conform(pq.read_table(part_path), schema))
+            return
+        with open(self.tmp_path, "w", encoding="utf-8", newline="") as f:
+            for n, (part_path, _) in enumerate(self.parts):
+                frame = _conform(pq.read_table(part_path), schema).to_pandas()
+                frame.to_csv(f, header=n == 0, index=False, quoting=csv.QUOTE_MINIMAL)
+
+    # ✅ 완료: 임시 파일을 최종 경로로 교체 (결과가 없으면 파일을 만들지 않음)
+    def close(self):
+        try:
+            if self._file is not None:
+                self._file.close()
+            if self.parts:
+                self._merge_parts()
+            if os.path.exists(self.tmp_path):
+                os.replace(self.tmp_path, self.path)
+        finally:
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
+
+
+# --- 분석 ---
+
+def _analyze_yf(ticker: str, multi_timeframe: bool):
+    from yf_swing_stock_data import swing_stock_data
+    timings = {}
+    started = time.perf_counter()
+    result = swing_stock_data(ticker, multi_timeframe=multi_timeframe, timings=timings, evaluate=False)
+    timings["total"] = time.perf_counter() - started
+    return result, timings
+
+
+# ✅ yf 분석 (작업자 스레드, 완료 순서대로 반환) -> (결과, 단계별 시간) 반복
+# 점수는 여기서 계산하지 않음 (run_scan이 묶음 단위로 score_swing_results 실행)
+def iter_yf_results(tickers: list, workers: int = DEFAULT_WORKERS, multi_timeframe: bool = False,
+                    prefetch_news: bool = True):
+    # 뉴스는 묶음마다 한 번에 미리 조회/점수화 (종목별 분석에서는 메모리 캐시 사용)
+    from news_sentiment import news_sentiment
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for i in range(0, len(tickers), CHUNK_SIZE):
+            chunk = tickers[i:i + CHUNK_SIZE]
+            news_seconds = 0.0
+            if prefetch_news:
+                started = time.perf_counter()
+                try:
+                    news_sentiment(chunk)
+                except Exception as e:
+                    print(f"⚠️ 뉴스 일괄 조회 실패: {e}", file=sys.stderr)
+                news_seconds = time.perf_counter() - started
+            futures = {executor.submit(_analyze_yf, t, multi_timeframe): t for t in chunk}
+            for n, future in enumerate(as_completed(futures)):
+                try:
+                    result, timings = future.result()
+                except Exception as e:
+                    result, timings = {"ticker": futures[future], "Recommendation": f"❌ 분석 실패: {e}"}, {}
+                if n == 0 and news_seconds:
+                    timings["news_prefetch"] = news_seconds
+                yield result, timings
+
+
+# ✅ ap 분석 (AP_BATCH_SIZE개씩 merge_swing_data) -> (결과, 단계별 시간) 반복
+def iter_ap_results(tickers: list):
+    from ap_swing_stock_data import merge_swing_data
+    for i in range(0, len(tickers), AP_BATCH_SIZE):
+        chunk = tickers[i:i + AP_BATCH_SIZE]
+        started = time.perf_counter()
+        try:
+            results = merge_swing_data(chunk)
+        except Exception as e:
+            print(f"❌ ap 분석 실패 ({len(chunk)}개 종목): {e}", file=sys.stderr)
+            results = [{"ticker": t, "trade_opinion": f"❌ 분석 실패: {e}"} for t in chunk]
+        elapsed = time.perf_counter() - started
+        returned = {result["ticker"] for result in results}
+        results += [{"ticker": t, "trade_opinion": "❌ 데이터 없음"} for t in chunk if t not in returned]
+        for n, result in enumerate(results):
+            yield result, ({"batch": elapsed} if n == 0 else {})
+
+
+# 분석 실패/데이터 부족 결과에는 현재가가 없음
+def _is_success(result: dict):
+    return "current_price" in result
+
+
+# ✅ yf 묶음 점수화 (evaluate=False 결과에 Score/Score_Reasons/Recommendation 채움)
+def _score_chunk(results: list):
+    from yf_swing_stock_data import score_swing_results
+    pending = [r for r in results if _is_success(r) and "Recommendation" not in r]
+    if not pending:
+        return
+    scored = score_swing_results(pending)
+    for result, score, reasons, recommendation in zip(pending, scored["Score"], scored["Score_Reasons"],
+                                                      scored["Recommendation"]):
+        result.update({"Score": float(score), "Score_Reasons": reasons, "Recommendation": recommendation})
+
+
+# ✅ 진행 상황 + 단계별 시간 집계
+class ScanProgress:
+    def __init__(self, total: int, stream=None):
+        self.total = total
+        self.stream = stream or sys.stderr
+        self.started = time.perf_counter()
+        self.done = 0
+        self.failed = 0
+        self.stages = {}    # 단계 -> 누적 초
+        self.counts = {}    # 단계 -> 기록된 종목 수
+
+    def update(self, success: bool, timings: dict):
+        self.done += 1
+        self.failed += 0 if success else 1
+        for stage, seconds in timings.items():
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+            self.counts[stage] = self.counts.get(stage, 0) + 1
+        if self.done % PROGRESS_EVERY == 0 or self.done == self.total:
+            elapsed = time.perf_counter() - self.started
+            rate = self.done / elapsed if elapsed > 0 else 0.0
+            eta = (self.total - self.done) / rate if rate > 0 else 0.0
+            print(f"  [{self.done}/{self.total}] 실패 {self.failed} · {rate:.1f}종목/s · 남은 시간 약 {eta:.0f}s",
+                  file=self.stream)
+
+    def add_stage(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    # ✅ 요약 딕셔너리 (단계별 누적 초 / 기록 1회당 평균 ms - 종목 단위 단계는 종목당, 묶음 단위 단계는 묶음당)
+    def summary(self):
+        return {
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "wall_seconds": round(time.perf_counter() - self.started, 2),
+            "stages": {stage: {"seconds": round(seconds, 2),
+                               "avg_ms": round(seconds / self.counts[stage] * 1000, 1)}
+                       for stage, seconds in sorted(self.stages.items(), key=lambda item: -item[1])},
+        }
+
+
+# ✅ 스캔 실행: 분석 -> 묶음 단위 저장 -> 요약 반환
+def run_scan(tickers: list, output: str, source: str = "yf", workers: int = DEFAULT_WORKERS, fmt: str = None,
+             multi_timeframe: bool = False, prefetch_news: bool = True, record: bool = False, stream=None):
+    writer = ResultWriter(output, fmt, KNOWN_COLUMNS[source])
+    progress = ScanProgress(len(tickers), stream)
+    if source == "ap":
+        results = iter_ap_results(tickers)
+    else:
+        results = iter_yf_results(tickers, workers, multi_timeframe, prefetch_news)
+
+    def flush(buffer):
+        if not buffer:
+            return
+        if source == "yf":
+            started = time.perf_counter()
+            _score_chunk(buffer)
+            progress.add_stage("scoring", time.perf_counter() - started)
+        started = time.perf_counter()
+        writer.write(buffer)
+        progress.add_stage("write", time.perf_counter() - started)
+        if record:
+            recorded.extend(r for r in buffer if _is_success(r))
+
+    buffer, recorded = [], []
+    try:
+        for result, timings in results:
+            progress.update(_is_success(result), timings)
+            buffer.append(result)
+            if len(buffer) >= CHUNK_SIZE:
+                flush(buffer)
+                buffer = []
+        flush(buffer)
+    finally:
+        started = time.perf_counter()
+        writer.close()
+        progress.add_stage("merge", time.perf_counter() - started)
+
+    if record and recorded:
+        from scan_history import record_scan, SOURCE_AP_SWING, SOURCE_YF_SWING
+        record_scan(recorded, SOURCE_AP_SWING if source == "ap" else SOURCE_YF_SWING)
+
+    summary = progress.summary()
+    summary.update({"output": output, "rows": writer.rows})
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="떡상 명령줄 배치 스캐너")
+    parser.add_argument("universe", nargs="?", default="-", help="종목 목록 파일 (- 또는 생략: 표준 입력)")
+    parser.add_argument("-o", "--output", required=True, help="결과 파일 (.parquet / .csv / .jsonl)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="출력 형식 (기본: 확장자로 판단)")
+    parser.add_argument("--source", choices=["yf", "ap"], default="yf", help="분석 경로")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="yf 분석 작업자 수")
+    parser.add_argument("--limit", type=int, default=0, help="앞에서부터 N개 종목만 (0이면 전체)")
+    parser.add_argument("--multi-timeframe", action="store_true", help="다중 시간대 피처 포함 (yf)")
+    parser.add_argument("--no-news-prefetch", action="store_true", help="뉴스 일괄 조회 생략 (yf)")
+    parser.add_argument("--record", action="store_true", help="성공 결과를 스캔 이력에 기록 (알림 포함)")
+    parser.add_argument("--timings-json", help="단계별 시간 요약을 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    tickers = load_universe(args.universe)
+    if args.limit > 0:
+        tickers = tickers[:args.limit]
+    if not tickers:
+        parser.error("유니버스에 종목이 없습니다")
+
+    print(f"--- {len(tickers)}개 종목 스캔 시작 ({args.source}, 작업자 {args.workers}) -> {args.output} ---",
+          file=sys.stderr)
+    summary = run_scan(tickers, args.output, args.source, max(args.workers, 1), args.format,
+                       multi_timeframe=args.multi_timeframe, prefetch_news=not args.no_news_prefetch,
+                       record=args.record)
+
+    print(f"✅ 완료: {summary['rows']}행 저장, 실패 {summary['failed']}개, {summary['wall_seconds']}s", file=sys.stderr)
+    for stage, stats in summary["stages"].items():
+        print(f"  - {stage:<16} {stats['seconds']:>9.2f}s  (평균 {stats['avg_ms']:.1f}ms)", file=sys.stderr)
+    if args.timings_json:
+        with open(args.timings_json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
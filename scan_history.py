@@ -0,0 +1,225 @@
+import os
+import uuid
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_paths import data_path
+
+# 스캔 결과 이력 저장소 (날짜별 파티션 Parquet)
+# 경로: data/scan_history/source=<source>/scan_date=YYYY-MM-DD/part-*.parquet
+# - 스캔 1회 = 파일 1개 (append 전용), compact_partition으로 하루치 파일 병합 (배치 실행기가 지난 날짜를 compact_history로 병합)
+# - 조회 시 날짜 디렉토리로 파티션을 먼저 거르고 필요한 컬럼만 읽어 이력을 다시 계산하지 않음
+
+SCAN_HISTORY_DIR = os.path.dirname(data_path("scan_history", "_"))
+
+# 소스 이름 (분석 경로별로 파티션 분리 - 컬럼 구성이 다름)
+SOURCE_YF_SWING = "yf_swing"      # swing_stock_data
+SOURCE_AP_SWING = "ap_swing"      # merge_swing_data
+SOURCE_YF_GEM = "yf_gem"          # get_gem_candidates
+SOURCE_CRYPTO_SWING = "crypto_swing"  # crypto_scanner.scan_crypto
+
+# 모든 소스 공통 컬럼
+BASE_COLUMNS = ["scanned_at", "ticker", "score", "recommendation"]
+
+
+def _partition_dir(source: str, scan_date):
+    return os.path.join(SCAN_HISTORY_DIR, f"source={source}", f"scan_date={scan_date.isoformat()}")
+
+
+def _to_date(value):
+    if value is None:
+        return date.today()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+# ✅ 결과 리스트 -> 저장용 테이블 (공통 컬럼 + 전체 지표 컬럼)
+def _results_to_frame(results: list, scanned_at: datetime):
+    frame = pd.DataFrame(list(results))
+    if frame.empty or "ticker" not in frame.columns:
+        return pd.DataFrame()
+
+    frame.insert(0, "scanned_at", pd.Timestamp(scanned_at))
+    score = frame["Score"] if "Score" in frame.columns else pd.Series(None, index=frame.index, dtype=float)
+    if "Recommendation" in frame.columns:
+        recommendation = frame["Recommendation"]
+    elif "trade_opinion" in frame.columns:
+        recommendation = frame["trade_opinion"]
+    else:
+        recommendation = pd.Series(None, index=frame.index, dtype=object)
+    frame.insert(2, "score", pd.to_numeric(score, errors="coerce"))
+    frame.insert(3, "recommendation", recommendation.astype(object))
+
+    for column in frame.columns:
+        if frame[column].dtype != object:
+            continue
+        values = frame[column]
+        if values.isna().all():
+            # 값이 하나도 없는 컬럼은 타입 충돌 방지를 위해 저장하지 않음 (조회 시 NaN)
+            frame = frame.drop(columns=column)
+        elif values.map(lambda v: isinstance(v, (list, tuple))).any():
+            frame[column] = values.map(lambda v: " | ".join(map(str, v)) if isinstance(v, (list, tuple)) else v)
+        else:
+            frame[column] = values.map(lambda v: None if v is None or (isinstance(v, float) and pd.isna(v)) else str(v))
+    return frame
+
+
+# ✅ 스캔 결과 1회분 추가 저장 (저장된 파일 경로 반환)
+def append_scan(results: list, source: str, scanned_at: datetime = None):
+    scanned_at = scanned_at or datetime.now()
+    frame = _results_to_frame(results, scanned_at)
+    if frame.empty:
+        return None
+
+    partition = _partition_dir(source, scanned_at.date())
+    os.makedirs(partition, exist_ok=True)
+    path = os.path.join(partition, f"part-{scanned_at:%H%M%S%f}-{uuid.uuid4().hex[:8]}.parquet")
+    pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), path)
+    return path
+
+
+# ✅ 저장 실패가 분석 흐름을 막지 않도록 감싼 버전 (앱/배치 경로용)
+# 저장과 함께 직전 스냅샷 대비 변화 알림도 확인 (alerts.check_alerts)
+def record_scan(results: list, source: str, scanned_at: datetime = None):
+    from alerts import check_alerts
+    check_alerts(results, source, scanned_at)
+    try:
+        return append_scan(results, source, scanned_at)
+    except Exception as e:
+        print(f"❌ 스캔 이력 저장 실패 ({source}): {e}")
+        return None
+
+
+def _partition_dates(source: str, start: date, end: date):
+    source_dir = os.path.join(SCAN_HISTORY_DIR, f"source={source}")
+    if not os.path.isdir(source_dir):
+        return []
+    dates = []
+    for name in os.listdir(source_dir):
+        if not name.startswith("scan_date="):
+            continue
+        try:
+            partition_date = date.fromisoformat(name.split("=", 1)[1])
+        except ValueError:
+            continue
+        if start <= partition_date <= end:
+            dates.append(partition_date)
+    return sorted(dates)
+
+
+def _partition_parts(partition: str):
+    return sorted(n for n in os.listdir(partition) if n.endswith(".parquet"))
+
+
+# names: 읽을 파일 이름 (기본: 파티션의 모든 파일)
+def _read_partition(source: str, scan_date: date, columns: list = None, tickers: list = None, names: list = None):
+    partition = _partition_dir(source, scan_date)
+    frames = []
+    for name in (names if names is not None else _partition_parts(partition)):
+        path = os.path.join(partition, name)
+        file_columns = None
+        if columns is not None:
+            schema_names = set(pq.read_schema(path).names)
+            file_columns = [c for c in columns if c in schema_names]
+        filters = [("ticker", "in", list(tickers))] if tickers else None
+        frames.append(pq.read_table(path, columns=file_columns, filters=filters).to_pandas())
+    if not frames:
+        return pd.DataFrame(columns=columns or BASE_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+# ✅ 기간 이력 조회 (날짜 파티션 + 컬럼 + 종목 필터)
+def load_history(source: str = SOURCE_YF_SWING, start=None, end=None, columns: list = None, tickers: list = None):
+    end_date = _to_date(end)
+    start_date = _to_date(start) if start is not None else end_date
+    tickers = [t.upper() for t in tickers] if tickers else None
+    frames = [_read_partition(source, d, columns, tickers) for d in _partition_dates(source, start_date, end_date)]
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=columns or BASE_COLUMNS)
+    history = pd.concat(frames, ignore_index=True)
+    if columns is not None:
+        history = history.reindex(columns=columns)
+    return history.sort_values("scanned_at", kind="stable").reset_index(drop=True)
+
+
+# ✅ 종목 점수 추이 (예: 최근 60일)
+def score_trajectory(ticker: str, days: int = 60, source: str = SOURCE_YF_SWING, end=None):
+    end_date = _to_date(end)
+    return load_history(source, end_date - timedelta(days=days), end_date,
+                        columns=BASE_COLUMNS, tickers=[ticker])
+
+
+# ✅ 종목별 최신 스냅샷 (하루 여러 번 스캔 시 마지막 결과)
+def latest_snapshot(source: str = SOURCE_YF_SWING, on_date=None, lookback_days: int = 0, columns: list = None):
+    end_date = _to_date(on_date)
+    columns = columns or BASE_COLUMNS
+    history = load_history(source, end_date - timedelta(days=lookback_days), end_date, columns=columns)
+    if history.empty:
+        return history
+    return history.drop_duplicates(subset="ticker", keep="last").set_index("ticker")
+
+
+# ✅ 오늘(on_date) 추천이 바뀐 종목
+# 비교 기준: on_date 이전 최대 lookback_days일 중 가장 최근 스냅샷
+def recommendation_changes(source: str = SOURCE_YF_SWING, on_date=None, lookback_days: int = 7):
+    today = _to_date(on_date)
+    current = latest_snapshot(source, today, 0)
+    if current.empty:
+        return pd.DataFrame(columns=["ticker", "previous", "current", "previous_score", "current_score"])
+    previous = latest_snapshot(source, today - timedelta(days=1), lookback_days - 1)
+
+    joined = current[["recommendation", "score"]].join(
+        previous[["recommendation", "score"]], how="inner", lsuffix="_current", rsuffix="_previous"
+    )
+    changed = joined[joined["recommendation_current"] != joined["recommendation_previous"]]
+    return pd.DataFrame({
+        "ticker": changed.index,
+        "previous": changed["recommendation_previous"].to_numpy(),
+        "current": changed["recommendation_current"].to_numpy(),
+        "previous_score": changed["score_previous"].to_numpy(),
+        "current_score": changed["score_current"].to_numpy(),
+    })
+
+
+# ✅ 하루치 파티션 파일 병합 (작은 파일이 많아지면 조회가 느려지므로 주기적으로 실행)
+def compact_partition(source: str, scan_date=None):
+    scan_date = _to_date(scan_date)
+    partition = _partition_dir(source, scan_date)
+    if not os.path.isdir(partition):
+        return None
+    parts = _partition_parts(partition)
+    if len(parts) <= 1:
+        return None
+
+    # 목록을 만든 뒤 새로 저장된 파일은 읽지도 지우지도 않음 (다음 병합 때 포함)
+    merged = _read_partition(source, scan_date, names=parts).sort_values("scanned_at", kind="stable")
+    path = os.path.join(partition, f"part-compact-{uuid.uuid4().hex[:8]}.parquet")
+    tmp_path = f"{path}.tmp"
+    pq.write_table(pa.Table.from_pandas(merged, preserve_index=False), tmp_path)
+    os.replace(tmp_path, path)
+    for name in parts:
+        os.remove(os.path.join(partition, name))
+    return path
+
+
+# ✅ 지난 날짜 파티션 일괄 병합 (before 이전 날짜만, 이미 파일 1개인 파티션은 건너뜀) -> 병합한 파티션 수
+# 배치 실행기가 실행할 때마다 호출 (오늘 파티션은 계속 기록 중이므로 제외)
+def compact_history(before=None, sources: list = None):
+    before = _to_date(before)
+    if sources is None:
+        if not os.path.isdir(SCAN_HISTORY_DIR):
+            return 0
+        sources = [n.split("=", 1)[1] for n in os.listdir(SCAN_HISTORY_DIR) if n.startswith("source=")]
+    compacted = 0
+    for source in sources:
+        for scan_date in _partition_dates(source, date.min, before - timedelta(days=1)):
+            if compact_partition(source, scan_date) is not None:
+                compacted += 1
+    return compacted
@@ -0,0 +1,235 @@
+import argparse
+import glob
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import bar_store
+from data_paths import data_path
+from sector_index import load_sector_index
+
+# 섹터 프로파일 자동 보정 (yf_swing_stock_data.SECTOR_PROFILES 대체)
+# 봉 저장소의 최근 CALIBRATION_MONTHS개월 일봉을 섹터 인덱스로 묶어, 섹터별 경험적 분포의 분위수로 기준값을 정합니다.
+#   - rsi_range: RSI(14) 분포의 RSI_QUANTILES 구간
+#   - volume_rate_min: 거래량 비율(당일 / 직전 5일 평균) 분포의 VOLUME_RATE_QUANTILE 분위수
+#   - disparity_range: 이격도(종가 / 20일선 × 100) 분포의 DISPARITY_QUANTILES 구간
+#   - high_low_max: 52주 고가 / 저가 비율 분포의 HIGH_LOW_QUANTILE 분위수
+# 지표는 (날짜 × 종목) 행렬로 한 번에 계산하고, 섹터별로 열만 골라 분위수를 구합니다.
+# 결과는 버전 파일(data/calibration/sector_profiles_<버전>.json)로 남기고 현재 파일(sector_profiles.json)을 교체하며,
+# swing_stock_data는 파일이 바뀔 때만 다시 읽습니다 (요청마다 추가 비용 없음).
+# 종목 수가 MIN_SECTOR_SYMBOLS보다 적은 섹터는 기존 수동 프로파일을 그대로 사용합니다.
+
+CALIBRATION_DIR = os.path.dirname(data_path("calibration", "_"))
+CALIBRATION_PATH = os.path.join(CALIBRATION_DIR, "sector_profiles.json")
+CALIBRATION_SCHEMA = 1
+CALIBRATION_MONTHS = 6
+CALIBRATION_KEEP_VERSIONS = 30    # 보관하는 과거 버전 파일 수
+MIN_SECTOR_SYMBOLS = 5
+
+RSI_WINDOW = 14
+RSI_QUANTILES = (0.15, 0.85)
+VOLUME_RATE_WINDOW = 5
+VOLUME_RATE_QUANTILE = 0.6
+DISPARITY_WINDOW = 20
+DISPARITY_QUANTILES = (0.2, 0.8)
+HIGH_LOW_WINDOW = 252
+HIGH_LOW_QUANTILE = 0.75
+WARMUP_CALENDAR_DAYS = 400        # 52주 고가/저가 계산용으로 함께 읽는 과거 구간
+
+_lock = threading.Lock()
+_cache = {"mtime": None, "artifact": None}
+
+
+# ✅ 저장소 봉 -> 필드별 (날짜 × 종목) 테이블 {"Close", "High", "Low", "Volume"}
+def _load_fields(symbols: list, start):
+    frames = {}
+    for symbol in symbols:
+        bars = bar_store.load_bars(symbol, start=start)
+        if not bars.empty:
+            frames[symbol] = bars
+    if not frames:
+        return None
+    return {field: pd.DataFrame({s: bars[field] for s, bars in frames.items()}).sort_index()
+            for field in ["Close", "High", "Low", "Volume"]}
+
+
+# ✅ 보정용 지표 행렬 (swing_stock_data와 같은 정의, 전 종목 한 번에)
+def calibration_indicators(fields: dict):
+    close, high, low, volume = fields["Close"], fields["High"], fields["Low"], fields["Volume"]
+    change = close.diff()
+    alpha = 1 / RSI_WINDOW  # ta RSIIndicator와 같은 Wilder 평활
+    avg_gain = change.clip(lower=0).ewm(alpha=alpha, min_periods=RSI_WINDOW, adjust=False).mean()
+    avg_loss = (-change).clip(lower=0).ewm(alpha=alpha, min_periods=RSI_WINDOW, adjust=False).mean()
+    rsi = 100 - 100 / (1 + avg_gain / avg_loss.where(avg_loss > 0))
+    rsi = rsi.where(avg_loss > 0, 100.0).where(avg_gain.notna())
+
+    previous_volume = volume.shift(1).rolling(VOLUME_RATE_WINDOW).mean()
+    return {
+        "rsi": rsi,
+        "volume_rate": volume / previous_volume.where(previous_volume > 0),
+        "disparity": close / close.rolling(DISPARITY_WINDOW).mean() * 100,
+        "high_low": high.rolling(HIGH_LOW_WINDOW).max() / low.rolling(HIGH_LOW_WINDOW).min(),
+    }
+
+
+def _quantiles(frame: pd.DataFrame, quantiles):
+    values = frame.to_numpy(float).ravel()
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return None
+    return np.quantile(values, quantiles)
+
+
+# ✅ 지표 행렬의 종목 묶음 -> 프로파일 (관측값이 없으면 None)
+def profile_from_indicators(indicators: dict, symbols: list):
+    rsi = _quantiles(indicators["rsi"][symbols], RSI_QUANTILES)
+    volume_rate = _quantiles(indicators["volume_rate"][symbols], VOLUME_RATE_QUANTILE)
+    disparity = _quantiles(indicators["disparity"][symbols], DISPARITY_QUANTILES)
+    high_low = _quantiles(indicators["high_low"][symbols], HIGH_LOW_QUANTILE)
+    if any(value is None for value in [rsi, volume_rate, disparity, high_low]):
+        return None
+    return {
+        "rsi_range": (round(float(rsi[0])), round(float(rsi[1]))),
+        "volume_rate_min": round(float(volume_rate), 2),
+        "disparity_range": (round(float(disparity[0]), 1), round(float(disparity[1]), 1)),
+        "high_low_max": round(float(high_low), 1),
+        "symbols": len(symbols),
+        "samples": int(indicators["rsi"][symbols].notna().to_numpy().sum()),
+    }
+
+
+# ✅ 섹터별 프로파일 보정 -> 아티팩트 딕셔너리 (저장은 save_calibration)
+# Default는 섹터 인덱스에 있는 전체 종목 분포로 계산
+def calibrate_sector_profiles(months: int = CALIBRATION_MONTHS, symbols: list = None):
+    index = load_sector_index()["symbols"]
+    stored = set(bar_store.list_symbols())
+    sectors = {}
+    for symbol, entry in index.items():
+        if entry.get("sector") and symbol in stored and (symbols is None or symbol in symbols):
+            sectors.setdefault(entry["sector"], []).append(symbol)
+
+    window_start = pd.Timestamp.now().normalize() - pd.DateOffset(months=months)
+    members = sorted(s for group in sectors.values() for s in group)
+    fields = _load_fields(members, window_start - pd.Timedelta(days=WARMUP_CALENDAR_DAYS)) if members else None
+
+    profiles, skipped = {}, {}
+    if fields is not None:
+        indicators = {name: frame[frame.index >= window_start]
+                      for name, frame in calibration_indicators(fields).items()}
+        loaded = set(fields["Close"].columns)
+        groups = {sector: [s for s in group if s in loaded] for sector, group in sectors.items()}
+        groups["Default"] = sorted(loaded)
+        for sector, group in sorted(groups.items()):
+            profile = profile_from_indicators(indicators, group) if len(group) >= MIN_SECTOR_SYMBOLS else None
+            if profile is None:
+                skipped[sector] = len(group)
+            else:
+                profiles[sector] = profile
+
+    now = datetime.now()
+    return {
+        "schema": CALIBRATION_SCHEMA,
+        "version": now.strftime("%Y%m%d-%H%M%S"),
+        "computed_at": now.isoformat(timespec="seconds"),
+        "window_start": window_start.strftime("%Y-%m-%d"),
+        "months": months,
+        "quantiles": {"rsi": RSI_QUANTILES, "volume_rate": VOLUME_RATE_QUANTILE,
+                      "disparity": DISPARITY_QUANTILES, "high_low": HIGH_LOW_QUANTILE},
+        "profiles": profiles,
+        "skipped": skipped,  # 종목 수 부족 섹터 -> 종목 수
+    }
+
+
+# ✅ 아티팩트 저장: 버전 파일 기록 + 현재 파일 교체 + 오래된 버전 정리 -> 버전 파일 경로
+def save_calibration(artifact: dict):
+    version_path = os.path.join(CALIBRATION_DIR, f"sector_profiles_{artifact['version']}.json")
+    with _lock:
+        for path in [version_path, CALIBRATION_PATH]:
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(artifact, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, path)
+        versions = sorted(glob.glob(os.path.join(CALIBRATION_DIR, "sector_profiles_*.json")))
+        for old_path in versions[:-CALIBRATION_KEEP_VERSIONS]:
+            os.remove(old_path)
+    return version_path
+
+
+# ✅ 현재 보정 아티팩트 (파일이 바뀐 경우에만 다시 읽음, 없거나 스키마가 다르면 None)
+def load_calibration():
+    with _lock:
+        try:
+            mtime = os.path.getmtime(CALIBRATION_PATH)
+        except OSError:
+            return None
+        if _cache["mtime"] == mtime:
+            return _cache["artifact"]
+        try:
+            with open(CALIBRATION_PATH, "r", encoding="utf-8") as f:
+                artifact = json.load(f)
+        except (OSError, ValueError):
+            artifact = None
+        if artifact is not None and artifact.get("schema") != CALIBRATION_SCHEMA:
+            artifact = None
+        _cache["mtime"], _cache["artifact"] = mtime, artifact
+        return artifact
+
+
+# ✅ 사용할 섹터 프로파일 (보정값이 있는 섹터는 보정값, 나머지는 fallback 수동 프로파일)
+def sector_profiles(fallback: dict):
+    artifact = load_calibration()
+    if not artifact:
+        return fallback
+    cached = _cache.get("merged")
+    if cached is not None and cached[0] == artifact["version"] and cached[1] is fallback:
+        return cached[2]
+    merged = dict(fallback)
+    for sector, profile in artifact["profiles"].items():
+        merged[sector] = {
+            "rsi_range": tuple(profile["rsi_range"]),
+            "volume_rate_min": profile["volume_rate_min"],
+            "disparity_range": tuple(profile["disparity_range"]),
+            "high_low_max": profile["high_low_max"],
+        }
+    _cache["merged"] = (artifact["version"], fallback, merged)
+    return merged
+
+
+# ✅ 보정 실행 + 저장 (배치 실행기 / cron용) -> 요약 딕셔너리
+def run_calibration(months: int = CALIBRATION_MONTHS, refresh: bool = False):
+    if refresh:
+        symbols = list(load_sector_index()["symbols"])
+        if symbols:
+            bar_store.refresh_bars(symbols)
+    artifact = calibrate_sector_profiles(months)
+    if not artifact["profiles"]:
+        return {"version": None, "sectors": [], "skipped": artifact["skipped"]}
+    path = save_calibration(artifact)
+    return {"version": artifact["version"], "path": path, "sectors": sorted(artifact["profiles"]),
+            "skipped": artifact["skipped"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="섹터 프로파일 자동 보정")
+    parser.add_argument("--months", type=int, default=CALIBRATION_MONTHS, help="분포 계산 기간(개월)")
+    parser.add_argument("--refresh", action="store_true", help="보정 전에 섹터 인덱스 종목의 봉 갱신")
+    args = parser.parse_args()
+
+    summary = run_calibration(args.months, refresh=args.refresh)
+    if summary["version"] is None:
+        print("보정할 데이터가 부족합니다 (섹터 인덱스 / 봉 저장소 확인).")
+        return
+    print(f"✅ 섹터 프로파일 보정 완료: 버전 {summary['version']}")
+    for sector, profile in load_calibration()["profiles"].items():
+        print(f"  - {sector}: RSI {profile['rsi_range']}, 거래량 >= {profile['volume_rate_min']}, "
+              f"이격도 {profile['disparity_range']}, 고저비 < {profile['high_low_max']} ({profile['symbols']}종목)")
+    if summary["skipped"]:
+        print(f"  (종목 수 부족으로 수동 프로파일 유지: {', '.join(summary['skipped'])})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+from data_paths import data_path
+
+# 종목 → 섹터/산업 로컬 인덱스
+# 섹터는 거의 바뀌지 않으므로 한 번 기록해 두고, 분석 시에는 네트워크 호출 없이 읽습니다.
+# 파일 형식: {"updated_at": "...", "symbols": {"AAPL": {"sector": "Technology", "industry": ..., "updated_at": ...}}}
+
+SECTOR_INDEX_PATH = data_path("sector_index.json")
+
+_lock = threading.RLock()  # 읽기-수정-저장 전체를 감싸므로 재진입 허용
+_cache = {"mtime": None, "index": None}
+
+
+def _empty_index():
+    return {"updated_at": None, "symbols": {}}
+
+
+# ✅ 인덱스 로드 (파일 변경 시에만 다시 읽음)
+def load_sector_index(path: str = None):
+    path = path or SECTOR_INDEX_PATH
+    with _lock:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return _empty_index()
+        if path == SECTOR_INDEX_PATH and _cache["mtime"] == mtime and _cache["index"] is not None:
+            return _cache["index"]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = _empty_index()
+        index.setdefault("symbols", {})
+        if path == SECTOR_INDEX_PATH:
+            _cache["mtime"], _cache["index"] = mtime, index
+        return index
+
+
+# ✅ 인덱스 저장 (임시 파일에 쓴 뒤 교체)
+def save_sector_index(index: dict, path: str = None):
+    path = path or SECTOR_INDEX_PATH
+    index["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with _lock:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+        if path == SECTOR_INDEX_PATH:
+            _cache["mtime"], _cache["index"] = os.path.getmtime(path), index
+
+
+# ✅ 종목 섹터 조회 (네트워크 호출 없음, 없으면 default)
+def get_sector(symbol: str, default=None):
+    entry = load_sector_index()["symbols"].get(symbol.upper())
+    return entry.get("sector") if entry and entry.get("sector") else default
+
+
+def get_industry(symbol: str, default=None):
+    entry = load_sector_index()["symbols"].get(symbol.upper())
+    return entry.get("industry") if entry and entry.get("industry") else default
+
+
+# ✅ 여러 종목 섹터/산업 일괄 기록
+# entries: {"AAPL": {"sector": "Technology", "industry": "Consumer Electronics"}, ...}
+def update_sectors(entries: dict):
+    if not entries:
+        return 0
+    now = datetime.now().isoformat(timespec="seconds")
+    # 로드 → 수정 → 저장을 한 잠금 안에서 실행 (동시 기록 시 서로 덮어쓰지 않도록)
+    with _lock:
+        index = load_sector_index()
+        symbols = dict(index["symbols"])
+        changed = 0
+        for symbol, entry in entries.items():
+            sector = entry.get("sector")
+            if not symbol or not sector:
+                continue
+            symbol = symbol.upper()
+            previous = symbols.get(symbol, {})
+            industry = entry.get("industry") or previous.get("industry")
+            if previous.get("sector") == sector and previous.get("industry") == industry:
+                continue
+            symbols[symbol] = {"sector": sector, "industry": industry, "updated_at": now}
+            changed += 1
+        if changed:
+            save_sector_index({"updated_at": index.get("updated_at"), "symbols": symbols})
+    return changed
+
+
+# ✅ yfinance info 딕셔너리에서 섹터 기록 (info를 이미 받아온 경우 재사용)
+def remember_sector(symbol: str, info: dict):
+    if info and info.get("sector"):
+        update_sectors({symbol: {"sector": info.get("sector"), "industry": info.get("industry")}})
+
+
+# ✅ Yahoo 섹터 스크리너로 인덱스 일괄 갱신
+def refresh_sector_index(search_limit: int = 250):
+    # gem_discovery가 사용하는 섹터 스크리너를 그대로 사용 (순환 임포트 방지를 위해 지연 임포트, 전체 섹터 동시 조회)
+    from yf_gem_discovery import fetch_sector_screeners
+
+    entries = {}
+    for sector, quotes in fetch_sector_screeners(search_limit).items():
+        try:
+            if isinstance(quotes, Exception):
+                raise quotes
+            for quote in quotes:
+                if "symbol" in quote:
+                    entries[quote["symbol"]] = {"sector": sector, "industry": quote.get("industry")}
+            print(f"✅ {sector} 섹터 인덱스 수집 완료")
+        except Exception as e:
+            print(f"❌ {sector} 섹터 인덱스 수집 실패: {e}")
+    changed = update_sectors(entries)
+    print(f"📦 섹터 인덱스 갱신: {len(entries)}개 수집, {changed}개 변경")
+    return changed
+
+
+# ✅ 분석 결과를 섹터별로 묶기 (결과에 sector가 없으면 인덱스 사용)
+def group_by_sector(results: list, default: str = "Default"):
+    groups = {}
+    for result in results:
+        sector = result.get("sector") or get_sector(result.get("ticker", ""), default)
+        groups.setdefault(sector, []).append(result)
+    return groups
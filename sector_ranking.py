@@ -0,0 +1,59 @@
+import pandas as pd
+
+from sector_index import get_sector
+
+# 배치 스캔 이후 섹터 내 상대 순위(백분위) 계산
+# 절대 점수만으로는 같은 섹터 종목들이 실제로 어떻게 움직이는지 알 수 없으므로,
+# 스캔 결과 전체를 (종목 × 지표) 테이블로 만들어 섹터별 groupby-rank 한 번으로 계산합니다.
+
+# 원본 컬럼 -> 백분위 컬럼
+SECTOR_RANK_FIELDS = {
+    "RSI_14": "RSI_Sector_Pct",
+    "Volume_Rate": "Volume_Rate_Sector_Pct",
+    "Disparity_20": "Disparity_Sector_Pct",
+    "High_Proximity_Pct": "High_Gap_Sector_Pct",
+    "Score": "Score_Sector_Pct",
+}
+
+
+# ✅ 섹터 내 백분위 테이블 (0~100, 클수록 섹터 내 상위)
+def rank_within_sector(results, fields: dict = None, sector_column: str = "sector", default_sector: str = "Default"):
+    fields = fields or SECTOR_RANK_FIELDS
+    frame = results.copy() if isinstance(results, pd.DataFrame) else pd.DataFrame(list(results))
+    if frame.empty:
+        return frame
+
+    if sector_column not in frame.columns:
+        frame[sector_column] = None
+    missing_sector = frame[sector_column].isna()
+    if missing_sector.any() and "ticker" in frame.columns:
+        frame.loc[missing_sector, sector_column] = [
+            get_sector(str(t), default_sector) for t in frame.loc[missing_sector, "ticker"]
+        ]
+
+    value_columns = [c for c in fields if c in frame.columns]
+    values = frame[value_columns].apply(pd.to_numeric, errors="coerce")
+    groups = values.groupby(frame[sector_column].fillna(default_sector), sort=False)
+    ranks = groups.rank(method="average", pct=True) * 100
+
+    for column in value_columns:
+        frame[fields[column]] = ranks[column].round(1)
+    frame["Sector_Peers"] = groups[value_columns[0]].transform("size") if value_columns else 0
+    return frame
+
+
+# ✅ 결과 딕셔너리 리스트에 백분위 필드를 붙여 반환 (원본 순서 유지)
+def attach_sector_ranks(results: list, fields: dict = None):
+    if not results:
+        return results
+    fields = fields or SECTOR_RANK_FIELDS
+    ranked = rank_within_sector(results, fields)
+    rank_columns = [c for c in list(fields.values()) + ["Sector_Peers"] if c in ranked.columns]
+    enriched = []
+    for result, (_, row) in zip(results, ranked[rank_columns].iterrows()):
+        item = dict(result)
+        for column in rank_columns:
+            value = row[column]
+            item[column] = None if pd.isna(value) else (int(value) if column == "Sector_Peers" else float(value))
+        enriched.append(item)
+    return enriched
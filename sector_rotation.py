@@ -0,0 +1,164 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import bar_store
+
+# 섹터 로테이션 / 상대강도(RS) 매트릭스
+# SPDR 섹터 ETF 11개 + SPY의 1년 일봉을 봉 저장소(bar_store)에 쌓아 두고 (이후에는 새 봉만 받음),
+# (날짜 × 섹터) 상대가격(ETF / SPY) 테이블 하나로 아래 값을 한 번에 계산합니다.
+#   - 기간별 상대강도: 1주/1개월/3개월/6개월 동안 SPY 대비 초과 수익률(%)
+#   - RS 점수 / 순위 / 순위 변화 (RANK_CHANGE_BARS 전 대비, 양수 = 순위 상승)
+#   - RRG(Relative Rotation Graph) 방식 RS-Ratio / RS-Momentum과 국면 (선도/약화/부진/개선)
+# 매트릭스는 ETF 봉 파일이 바뀔 때만 다시 계산하므로, swing_stock_data는 종목마다 추가 다운로드 없이
+# 섹터 순풍/역풍 피처(sector_tailwind)를 붙일 수 있습니다.
+
+BENCHMARK = "SPY"
+SECTOR_ETFS = {
+    "Technology": {"korean_name": "기술주", "ticker": "XLK"},
+    "Healthcare": {"korean_name": "헬스케어", "ticker": "XLV"},
+    "Financials": {"korean_name": "금융주", "ticker": "XLF"},
+    "Consumer Discretionary": {"korean_name": "경기소비재", "ticker": "XLY"},
+    "Communication Services": {"korean_name": "통신서비스", "ticker": "XLC"},
+    "Industrials": {"korean_name": "산업재", "ticker": "XLI"},
+    "Consumer Staples": {"korean_name": "필수소비재", "ticker": "XLP"},
+    "Energy": {"korean_name": "에너지", "ticker": "XLE"},
+    "Utilities": {"korean_name": "유틸리티", "ticker": "XLU"},
+    "Real Estate": {"korean_name": "부동산", "ticker": "XLRE"},
+    "Materials": {"korean_name": "소재", "ticker": "XLB"},
+}
+
+# yfinance 종목 섹터명 -> 섹터 ETF 키 (같은 이름은 생략)
+STOCK_SECTOR_ALIASES = {
+    "Financial Services": "Financials",
+    "Consumer Cyclical": "Consumer Discretionary",
+    "Consumer Defensive": "Consumer Staples",
+    "Basic Materials": "Materials",
+}
+
+RS_HORIZONS = {"1w": 5, "1m": 21, "3m": 63, "6m": 126}           # 기간 -> 거래일 수
+RS_SCORE_WEIGHTS = {"1w": 0.1, "1m": 0.3, "3m": 0.3, "6m": 0.3}  # RS 점수 가중치
+RANK_CHANGE_BARS = 5
+RRG_RATIO_WINDOW = 50     # RS-Ratio: 상대가격 / 50일 평균 상대가격
+RRG_MOMENTUM_BARS = 10    # RS-Momentum: RS-Ratio / 10일 전 RS-Ratio
+
+ROTATION_COLUMNS = [
+    "korean_name", "ticker", "RS_1w", "RS_1m", "RS_3m", "RS_6m", "RS_Score", "Rank", "Rank_Change",
+    "RS_Ratio", "RS_Momentum", "Quadrant",
+]
+
+_lock = threading.Lock()
+_cache = {"key": None, "matrix": None}
+
+
+def _empty_matrix():
+    return pd.DataFrame(columns=ROTATION_COLUMNS).rename_axis("sector")
+
+
+def rotation_tickers():
+    return [info["ticker"] for info in SECTOR_ETFS.values()] + [BENCHMARK]
+
+
+# ✅ 섹터 ETF + SPY 봉 갱신 (처음 1년치, 이후 새 봉만)
+def refresh_sector_bars():
+    return bar_store.refresh_bars(rotation_tickers(), period="1y")
+
+
+def _quadrant(rs_ratio, rs_momentum):
+    if pd.isna(rs_ratio) or pd.isna(rs_momentum):
+        return None
+    if rs_ratio >= 100:
+        return "선도" if rs_momentum >= 100 else "약화"
+    return "개선" if rs_momentum >= 100 else "부진"
+
+
+# ✅ 종가 테이블(날짜 × 티커, SPY 포함) -> 섹터별 로테이션 매트릭스 (RS 점수 내림차순)
+def compute_rotation_matrix(closes: pd.DataFrame):
+    tickers = {name: info["ticker"] for name, info in SECTOR_ETFS.items() if info["ticker"] in closes.columns}
+    if BENCHMARK not in closes.columns or not tickers:
+        return _empty_matrix()
+    closes = closes.sort_index().ffill()
+    relative = closes[list(tickers.values())].div(closes[BENCHMARK], axis=0)
+    relative.columns = list(tickers)
+
+    # 기간별 상대강도 / RS 점수 / 순위는 날짜 전체에 대해 한 번에 계산 (순위 변화용)
+    horizons = {label: (relative / relative.shift(bars) - 1) * 100 for label, bars in RS_HORIZONS.items()}
+    weighted = sum(horizons[label].fillna(0) * weight for label, weight in RS_SCORE_WEIGHTS.items())
+    weight_sum = sum(horizons[label].notna() * weight for label, weight in RS_SCORE_WEIGHTS.items())
+    score = weighted / weight_sum.where(weight_sum > 0)
+    rank = score.rank(axis=1, ascending=False, method="min")
+
+    rs_ratio = 100 * relative / relative.rolling(RRG_RATIO_WINDOW).mean()
+    rs_momentum = 100 * rs_ratio / rs_ratio.shift(RRG_MOMENTUM_BARS)
+
+    matrix = pd.DataFrame({
+        "korean_name": [SECTOR_ETFS[name]["korean_name"] for name in tickers],
+        "ticker": list(tickers.values()),
+        **{f"RS_{label}": frame.iloc[-1].round(2) for label, frame in horizons.items()},
+        "RS_Score": score.iloc[-1].round(2),
+        "Rank": rank.iloc[-1],
+        "Rank_Change": (rank.shift(RANK_CHANGE_BARS) - rank).iloc[-1],
+        "RS_Ratio": rs_ratio.iloc[-1].round(2),
+        "RS_Momentum": rs_momentum.iloc[-1].round(2),
+    }, index=pd.Index(list(tickers), name="sector"))
+    matrix["Quadrant"] = [_quadrant(r, m) for r, m in zip(matrix["RS_Ratio"], matrix["RS_Momentum"])]
+    return matrix[ROTATION_COLUMNS].sort_values("RS_Score", ascending=False, na_position="last")
+
+
+# ✅ 저장된 봉으로 만든 로테이션 매트릭스 (ETF 봉 파일이 바뀐 경우에만 다시 계산)
+def load_rotation_matrix():
+    tickers = rotation_tickers()
+    mtimes = []
+    for ticker in tickers:
+        try:
+            mtimes.append(os.path.getmtime(bar_store.bar_path(ticker)))
+        except OSError:
+            mtimes.append(None)
+    key = tuple(mtimes)
+    with _lock:
+        if _cache["key"] == key and _cache["matrix"] is not None:
+            return _cache["matrix"]
+    closes = bar_store.bar_matrix(tickers, "Close")
+    matrix = compute_rotation_matrix(closes) if not closes.empty else _empty_matrix()
+    with _lock:
+        _cache["key"], _cache["matrix"] = key, matrix
+    return matrix
+
+
+# ✅ 매트릭스 -> 화면/아티팩트용 딕셔너리 리스트 (NaN -> None)
+def rotation_records(matrix: pd.DataFrame = None):
+    matrix = load_rotation_matrix() if matrix is None else matrix
+    records = []
+    for sector, row in matrix.iterrows():
+        record = {"sector": sector}
+        for column, value in row.items():
+            record[column] = None if pd.isna(value) else (value.item() if isinstance(value, np.generic) else value)
+        records.append(record)
+    return records
+
+
+# ✅ 종목 섹터의 순풍/역풍 피처 (swing_stock_data / 규칙 엔진 입력, 추가 다운로드 없음, 데이터 없으면 빈 딕셔너리)
+def sector_tailwind(sector: str):
+    if not sector:
+        return {}
+    sector = STOCK_SECTOR_ALIASES.get(sector, sector)
+    matrix = load_rotation_matrix()
+    if sector not in matrix.index:
+        return {}
+    row = matrix.loc[sector]
+
+    def _value(column):
+        value = row[column]
+        return None if pd.isna(value) else float(value)
+
+    return {
+        "Sector_RS_Score": _value("RS_Score"),
+        "Sector_RS_Rank": _value("Rank"),
+        "Sector_RS_Rank_Change": _value("Rank_Change"),
+        "Sector_RS_3m": _value("RS_3m"),
+        "Sector_RS_Ratio": _value("RS_Ratio"),
+        "Sector_RS_Momentum": _value("RS_Momentum"),
+        "Sector_Quadrant": row["Quadrant"],
+    }
@@ -0,0 +1,89 @@
+import threading
+import time
+
+# 중복 요청 합치기 (single flight)
+# 같은 키(엔드포인트, 종목, 파라미터)로 동시에 들어온 호출은 먼저 시작한 호출 1건의 결과(또는 예외)를 함께 받습니다.
+# ttl(초)을 주면 완료 후 그 시간 동안은 결과를 재사용합니다 (거의 동시에 들어온 요청용, 예외는 재사용하지 않음).
+# Streamlit 세션/배치 스레드가 같은 프로세스에서 돌기 때문에 스레드 기준으로 동작합니다.
+
+MAX_ENTRIES = 2048  # 완료 결과 보관 개수 (넘으면 만료된 항목부터 정리)
+
+_lock = threading.Lock()
+_calls = {}
+_stats = {"calls": 0, "shared": 0}
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "ttl", "done_at")
+
+    def __init__(self, ttl):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.ttl = ttl
+        self.done_at = None
+
+    def reusable(self, now):
+        # 진행 중이거나, 성공 후 ttl 이내
+        if self.done_at is None:
+            return True
+        return self.error is None and now - self.done_at <= self.ttl
+
+
+def _prune(now):
+    expired = [key for key, call in _calls.items() if call.done_at is not None and not call.reusable(now)]
+    for key in expired:
+        del _calls[key]
+
+
+# ✅ key가 같은 진행 중(또는 ttl 이내) 호출이 있으면 그 결과를 공유, 없으면 fn 실행
+def do(key, fn, *args, ttl: float = 0.0, **kwargs):
+    now = time.monotonic()
+    with _lock:
+        _stats["calls"] += 1
+        call = _calls.get(key)
+        if call is not None and call.reusable(now):
+            _stats["shared"] += 1
+            leader = False
+        else:
+            if len(_calls) >= MAX_ENTRIES:
+                _prune(now)
+            call = _Call(ttl)
+            _calls[key] = call
+            leader = True
+
+    if not leader:
+        call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = fn(*args, **kwargs)
+    except BaseException as e:
+        call.error = e
+    finally:
+        with _lock:
+            call.done_at = time.monotonic()
+            if (call.error is not None or call.ttl <= 0) and _calls.get(key) is call:
+                del _calls[key]
+        call.event.set()
+
+    if call.error is not None:
+        raise call.error
+    return call.result
+
+
+# ✅ 보관 중인 결과 삭제 (key 없으면 전체)
+def forget(key=None):
+    with _lock:
+        if key is None:
+            _calls.clear()
+        else:
+            _calls.pop(key, None)
+
+
+# ✅ 호출/공유 횟수 (공유 = 네트워크 호출을 아낀 횟수)
+def stats():
+    with _lock:
+        return dict(_stats, entries=len(_calls))
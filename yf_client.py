@@ -0,0 +1,62 @@
+import threading
+import time
+
+import yfinance as yf
+
+import single_flight
+
+# yfinance 호출 공용 창구
+# - 같은 종목/파라미터로 동시에 들어온 요청은 single_flight로 합쳐 네트워크 호출 1건만 보냄
+# - yf.Ticker 객체는 종목당 하나를 잠시 재사용 (info/options를 객체 내부 캐시로 공유)
+# 반환값은 여러 호출자가 공유하므로 수정하지 말고, DataFrame은 복사본을 돌려줍니다.
+
+TICKER_TTL_SECONDS = 60     # yf.Ticker 객체 재사용 시간
+INFO_TTL_SECONDS = 30       # info/옵션 결과 재사용 시간
+DOWNLOAD_TTL_SECONDS = 30   # 가격 다운로드 결과 재사용 시간
+MAX_TICKERS = 512
+
+_lock = threading.Lock()
+_tickers = {}  # symbol -> (created_at, yf.Ticker)
+
+
+# ✅ 종목별 yf.Ticker 객체 (TICKER_TTL_SECONDS 동안 같은 객체 반환)
+def get_ticker(symbol: str):
+    symbol = symbol.upper()
+    now = time.monotonic()
+    with _lock:
+        entry = _tickers.get(symbol)
+        if entry is not None and now - entry[0] <= TICKER_TTL_SECONDS:
+            return entry[1]
+        if len(_tickers) >= MAX_TICKERS:
+            for key in [k for k, (created, _) in _tickers.items() if now - created > TICKER_TTL_SECONDS]:
+                del _tickers[key]
+        ticker = yf.Ticker(symbol)
+        _tickers[symbol] = (now, ticker)
+        return ticker
+
+
+# ✅ 종목 info (동시 요청 합치기)
+def get_ticker_info(symbol: str):
+    symbol = symbol.upper()
+    return single_flight.do(("info", symbol), lambda: get_ticker(symbol).info or {}, ttl=INFO_TTL_SECONDS)
+
+
+# ✅ 옵션 만기일 목록
+def get_options(symbol: str):
+    symbol = symbol.upper()
+    return single_flight.do(("options", symbol), lambda: tuple(get_ticker(symbol).options), ttl=INFO_TTL_SECONDS)
+
+
+# ✅ 옵션 체인 (만기일별)
+def get_option_chain(symbol: str, expiry: str):
+    symbol = symbol.upper()
+    return single_flight.do(("option_chain", symbol, expiry), lambda: get_ticker(symbol).option_chain(expiry),
+                            ttl=INFO_TTL_SECONDS)
+
+
+# ✅ 가격 다운로드 (yf.download와 같은 인자, 결과는 복사본)
+def download(tickers, **kwargs):
+    key_tickers = tuple(tickers) if isinstance(tickers, (list, tuple)) else tickers
+    key = ("download", key_tickers, tuple(sorted(kwargs.items())))
+    frame = single_flight.do(key, lambda: yf.download(tickers, **kwargs), ttl=DOWNLOAD_TTL_SECONDS)
+    return frame.copy()
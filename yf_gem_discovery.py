@@ -1,17 +1,73 @@
-import yfinance as yf
+import heapq
 import pandas as pd
 import random
 import time
-import requests
-from bs4 import BeautifulSoup # pandas.read_html이 내부적으로 사용할 수 있음
 from io import StringIO # pandas.read_html에서 문자열을 파일처럼 읽기 위해 필요
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer # 사용자 제공 코드에 포함되어 유지
-from datetime import datetime # 사용자 제공 코드에 포함되어 유지
-import urllib.request # 사용자 제공 코드에 포함되어 유지
 
 # swing_stock_data 함수는 별도의 yf_swing_stock_data.py 파일에 있다고 가정합니다.
 # 실제 실행 시 이 파일이 같은 디렉토리에 있어야 합니다.
 from yf_swing_stock_data import swing_stock_data
+from sector_index import update_sectors, remember_sector
+from yf_client import get_ticker_info
+from range_index import prefilter_high_gap
+from async_fetch import open_session, fetch_json, fetch_text, fetch_many, run_sync
+from sector_ranking import SECTOR_RANK_FIELDS, rank_within_sector
+from scan_history import record_scan, SOURCE_YF_SWING, SOURCE_YF_GEM
+from correlation import concentration_report, diversify_top_k
+from news_sentiment import news_sentiment
+
+# 보석 발굴 중 분석 결과를 스캔 이력에 저장하는 단위
+HISTORY_FLUSH_SIZE = 50
+
+# 분산 선택용 후보 보관 배수 (target_num_gems × 배수)
+GEM_DIVERSIFY_POOL_FACTOR = 2
+
+YAHOO_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/555.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/555.36"
+}
+
+# ✅ 섹터별 스크리너 ID (Yahoo predefined screener)
+SECTOR_SCREENER_IDS = {
+    "Technology": "ms_technology",
+    "Energy": "ms_energy",
+    "Consumer Cyclical": "ms_consumer_cyclical",
+    "Financial Services": "ms_financial_services",
+    "Healthcare": "ms_healthcare",
+    "Industrials": "ms_industrials",
+    "Communication Services": "ms_communication_services",
+    "Consumer Defensive": "ms_consumer_defensive",
+    "Utilities": "ms_utilities",
+    "Real Estate": "ms_real_estate",
+    "Basic Materials": "ms_basic_materials"
+}
+
+
+SCREENER_URL = "https://query1.finance.yahoo.com/v1/finance/screener/predefined/saved"
+MOST_ACTIVE_URL = "https://finance.yahoo.com/most-active/?count=50"  # count=50으로 설정하여 한 페이지에서 50개 가져오기 시도
+
+
+# ✅ 섹터 스크리너 JSON 조회 (quote 딕셔너리 리스트 반환)
+async def fetch_sector_screener_async(session, scr_id, count):
+    data = await fetch_json(session, SCREENER_URL, params={"scrIds": scr_id, "count": count}, timeout=5)
+    return data.get("finance", {}).get("result", [{}])[0].get("quotes", [])
+
+
+# ✅ 전체 섹터 스크리너 동시 조회 ({섹터: quote 리스트 또는 예외 객체})
+def fetch_sector_screeners(count):
+    async def run():
+        async with open_session(YAHOO_HEADERS) as session:
+            return await fetch_many([fetch_sector_screener_async(session, scr_id, count) for scr_id in SECTOR_SCREENER_IDS.values()])
+    return dict(zip(SECTOR_SCREENER_IDS, run_sync(run())))
+
+
+# ✅ Most Active 페이지 + 섹터 스크리너를 한 번에 동시 조회 (이벤트 루프 1개, 호스트별 동시 요청 수 제한)
+async def fetch_discovery_sources(search_limit):
+    async with open_session(YAHOO_HEADERS) as session:
+        results = await fetch_many(
+            [fetch_text(session, MOST_ACTIVE_URL)]
+            + [fetch_sector_screener_async(session, scr_id, search_limit) for scr_id in SECTOR_SCREENER_IDS.values()]
+        )
+    return results[0], dict(zip(SECTOR_SCREENER_IDS, results[1:]))
 
 
 def gem_discovery(limit_yahoo=50, search_limit=20):
@@ -27,21 +83,20 @@ def gem_discovery(limit_yahoo=50, search_limit=20):
         list: 수집된 중복 없는 종목 티커 리스트 (알파벳 순으로 정렬).
     """
     tickers = set()
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/555.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/555.36"
-    }
+
+    # Most Active 페이지와 섹터 스크리너 요청은 동시에 보내고 (요청 간격은 호스트별 동시 요청 수로 제한), 결과만 순서대로 처리
+    most_active_html, screener_results = run_sync(fetch_discovery_sources(search_limit))
 
     # ✅ 1. Yahoo Most Active 페이지 크롤링
     # 참고: pandas.read_html은 'lxml' 또는 'html5lib' 라이브러리가 필요합니다.
     # 만약 'Missing optional dependency' 오류가 발생하면 'pip install lxml' 또는 'pip install html5lib'을 실행하세요.
     try:
-        url = "https://finance.yahoo.com/most-active/?count=50"  # count=50으로 설정하여 한 페이지에서 50개 가져오기 시도
-        res = requests.get(url, headers=headers, timeout=10)
-        res.raise_for_status()
+        if isinstance(most_active_html, Exception):
+            raise most_active_html
 
         # pandas.read_html은 HTML 테이블을 직접 파싱합니다.
-        # StringIO를 사용하여 requests.text를 파일처럼 전달합니다.
-        tables = pd.read_html(StringIO(res.text))
+        # StringIO를 사용하여 응답 문자열을 파일처럼 전달합니다.
+        tables = pd.read_html(StringIO(most_active_html))
 
         yahoo_active_tickers = []
         for table in tables:
@@ -55,36 +110,22 @@ def gem_discovery(limit_yahoo=50, search_limit=20):
             print("❌ Yahoo Most Active 테이블에서 Symbol 컬럼을 찾을 수 없습니다.")
     except Exception as e:
         print(f"❌ Yahoo Most Active 티커 수집 실패: {e}")
-    time.sleep(1)  # 요청 간격
 
     # ✅ 2. 섹터별 스크리너 (JSON 기반)
-    screener_ids = {
-        "Technology": "ms_technology",
-        "Energy": "ms_energy",
-        "Consumer Cyclical": "ms_consumer_cyclical",
-        "Financial Services": "ms_financial_services",
-        "Healthcare": "ms_healthcare",
-        "Industrials": "ms_industrials",
-        "Communication Services": "ms_communication_services",
-        "Consumer Defensive": "ms_consumer_defensive",
-        "Utilities": "ms_utilities",
-        "Real Estate": "ms_real_estate",
-        "Basic Materials": "ms_basic_materials"
-    }
-
-    for sector, scr_id in screener_ids.items():
+    sector_entries = {}  # 스크리너 결과로 섹터 인덱스도 함께 갱신
+    for sector, quotes in screener_results.items():
         try:
-            json_url = f"https://query1.finance.yahoo.com/v1/finance/screener/predefined/saved?scrIds={scr_id}&count={search_limit}"
-            res = requests.get(json_url, headers=headers, timeout=5)
-            res.raise_for_status()
-            data = res.json()
-            quotes = data.get("finance", {}).get("result", [{}])[0].get("quotes", [])
+            if isinstance(quotes, Exception):
+                raise quotes
             sector_tickers = [q["symbol"] for q in quotes if "symbol" in q]
             tickers.update(sector_tickers)
+            for q in quotes:
+                if "symbol" in q:
+                    sector_entries[q["symbol"]] = {"sector": sector, "industry": q.get("industry")}
             print(f"✅ {sector} 스크리너 수집 완료: {len(sector_tickers)}개")
         except Exception as e:
             print(f"❌ {sector} 스크리너 수집 실패: {e}")
-        time.sleep(0.5)  # 요청 간격
+    update_sectors(sector_entries)
 
     # ✅ 결과 반환 (유효성 검사 및 정렬)
     result = sorted([t for t in tickers if isinstance(t, str) and t.strip()])  # 빈 문자열 제거
@@ -92,6 +133,178 @@ def gem_discovery(limit_yahoo=50, search_limit=20):
     return result
 
 
+# 보석 기준을 통과하는 추천 문구
+GEM_RECOMMENDATIONS = ["🔥 강력 매수 (과매도 반등)", "✅ 매수 고려 (지지선 근접/모멘텀 전환)", "📈 상승 추세 매수"]
+
+
+# ✅ 종목 1개 심사 -> (상태, swing 분석 결과 또는 None, 보석이면 결과 딕셔너리)
+# 상태: "filtered"(재무 필터 불통과) / "analyzed"(분석 완료, 보석 아님) / "gem" / "failed"(분석 실패)
+def screen_gem_ticker(ticker, max_per, max_psr, min_market_cap_billion, min_high_proximity_pct, min_swing_score):
+    # 1. yfinance에서 기본 정보 가져오기 (PER, PSR, 시가총액)
+    info = get_ticker_info(ticker)  # 이후 swing_stock_data의 같은 종목 요청과 공유
+    remember_sector(ticker, info)
+
+    per = info.get("trailingPE")
+    psr = info.get("priceToSalesTrailing12Months")
+    market_cap = info.get("marketCap")  # 단위: 달러
+
+    # ✅ 2. 재무 필터링: PER, PSR, 시가총액 기준 적용
+    # None 값 처리 및 기준 적용
+    if (per is None or per > max_per) or \
+            (psr is None or psr > max_psr) or \
+            (market_cap is None or market_cap < min_market_cap_billion * 1_000_000_000):
+        print(
+            f"    - {ticker}: 재무 필터링 불통과 (PER: {per if per is not None else 'N/A'}, PSR: {psr if psr is not None else 'N/A'}, 시총: {market_cap / 1_000_000_000 if market_cap else 'N/A'}B)")
+        return "filtered", None, None
+
+    # 3. swing_stock_data를 통한 심층 분석
+    analysis_result = swing_stock_data(ticker)
+    if "Recommendation" not in analysis_result or "❌ 분석 실패" in analysis_result["Recommendation"]:
+        return "failed", analysis_result, None
+
+    # 4. "덜 오르고" 기준 적용 (52주 고가 대비 하락률)
+    high_proximity_pct = analysis_result.get("High_Proximity_Pct")
+    if high_proximity_pct is None or high_proximity_pct < min_high_proximity_pct:
+        return "analyzed", analysis_result, None
+
+    # 5. 최종 "보석" 기준: 매수 추천 & 점수 기준
+    if analysis_result["Recommendation"] not in GEM_RECOMMENDATIONS:
+        return "analyzed", analysis_result, None
+    if analysis_result.get("Score") is None or analysis_result["Score"] < min_swing_score:
+        return "analyzed", analysis_result, None
+
+    # ✅ PER, PSR, MarketCap 정보를 analysis_result에 추가
+    analysis_result['PER'] = per
+    analysis_result['PSR'] = psr
+    analysis_result['MarketCap'] = market_cap  # 달러 단위로 저장
+    print(f"    ✅ {ticker}: 보석 후보로 발굴! (점수: {analysis_result['Score']:.1f}, 추천: {analysis_result['Recommendation']})")
+    return "gem", analysis_result, analysis_result
+
+
+# ✅ 보석 발굴 스트리밍 버전 (진행 이벤트를 하나씩 yield)
+# 분석 결과는 점수 상위 target_num_gems개만 힙에 보관하므로 num_to_sample=None(전체 풀)이어도 메모리가 늘지 않습니다.
+# (섹터 상대 순위용으로는 종목별 순위 지표 몇 개만 보관)
+# 이벤트:
+#   {"type": "pool", "total": 분석 대상 수}
+#   {"type": "progress", "processed", "total", "ticker", "status", "gems_found", "top_gems": 현재 상위 보석 (점수순)}
+#   {"type": "done", "gems": 최종 보석 리스트}
+def iter_gem_candidates(
+        num_to_sample=150,
+        target_num_gems=20,
+        max_per=35,
+        max_psr=7,
+        min_market_cap_billion=5,
+        min_high_proximity_pct=10,
+        min_swing_score=6.5,
+        diversify=True
+):
+    sample_label = "전체" if num_to_sample is None else f"{num_to_sample}개"
+    print(f"💎 보석 발굴 시작: {sample_label} 종목 샘플링 후 분석 (재무/시가총액 필터링 적용)")
+
+    # ✅ gem_discovery 함수를 호출하여 초기 종목 풀 확보
+    initial_ticker_pool = gem_discovery(limit_yahoo=50, search_limit=10)
+
+    if not initial_ticker_pool:
+        print("❌ 초기 종목 풀을 수집할 수 없습니다. 보석 발굴 중단.")
+        yield {"type": "done", "gems": []}
+        return
+
+    # ✅ 52주 범위 인덱스로 '덜 오른 종목' 사전 필터 (info 조회/심층 분석 전에 일괄 다운로드 + 인덱스 조회로 거름)
+    try:
+        filtered_pool = prefilter_high_gap(initial_ticker_pool, min_high_proximity_pct)
+        print(f"📉 52주 범위 사전 필터: {len(initial_ticker_pool)}개 -> {len(filtered_pool)}개")
+        initial_ticker_pool = filtered_pool
+    except Exception as e:
+        print(f"❌ 52주 범위 사전 필터 실패 (전체 풀로 진행): {e}")
+
+    # 초기 종목 풀에서 무작위로 샘플링 (num_to_sample이 None이거나 풀보다 크면 전체를 섞어서 사용)
+    sample_size = len(initial_ticker_pool) if num_to_sample is None else min(num_to_sample, len(initial_ticker_pool))
+    tickers_to_process = random.sample(initial_ticker_pool, sample_size)
+    total = len(tickers_to_process)
+    yield {"type": "pool", "total": total}
+
+    # ✅ 분석할 종목 뉴스 감성을 한 번에 조회/점수화 (swing_stock_data는 메모리 캐시를 사용)
+    try:
+        news_sentiment(tickers_to_process)
+    except Exception as e:
+        print(f"❌ 뉴스 헤드라인 일괄 조회 실패 (종목별로 조회): {e}")
+
+    # 분산 선택 시에는 후보를 GEM_DIVERSIFY_POOL_FACTOR배 보관해 두고 마지막에 상관이 낮은 순으로 K개를 고름
+    heap_size = target_num_gems * (GEM_DIVERSIFY_POOL_FACTOR if diversify else 1)
+    top_heap = []  # (점수, -순번, 결과) 최소 힙: 가장 낮은 점수(동점이면 나중에 들어온 것)부터 밀려남
+    peer_rows = []  # 섹터 상대 순위 계산용 (분석 성공 종목 전체의 순위 지표만 보관)
+    history_buffer = []  # 스캔 이력 저장 버퍼 (일정 개수마다 저장 후 비움)
+
+    for processed_count, ticker in enumerate(tickers_to_process, start=1):
+        print(f"  -> {ticker} 상세 분석 중... ({processed_count}/{total})")
+
+        try:
+            status, analysis_result, gem = screen_gem_ticker(
+                ticker, max_per, max_psr, min_market_cap_billion, min_high_proximity_pct, min_swing_score
+            )
+            if analysis_result is not None and analysis_result.get("Score") is not None:
+                peer_rows.append({k: analysis_result.get(k) for k in ["ticker", "sector", *SECTOR_RANK_FIELDS]})
+                history_buffer.append(analysis_result)
+                if len(history_buffer) >= HISTORY_FLUSH_SIZE:
+                    record_scan(history_buffer, SOURCE_YF_SWING)
+                    history_buffer = []
+
+            if gem is not None:
+                entry = (gem["Score"], -processed_count, gem)
+                if len(top_heap) < heap_size:
+                    heapq.heappush(top_heap, entry)
+                elif entry[:2] > top_heap[0][:2]:
+                    heapq.heapreplace(top_heap, entry)
+
+            # API 요청 빈도 조절 (과도한 요청 방지)
+            time.sleep(0.5)  # 0.5초 대기
+
+        except Exception as e:
+            print(f"    ❌ {ticker} 분석 중 오류 발생: {e}")
+            status = "error"
+            time.sleep(1)  # 오류 발생 시 더 길게 대기
+
+        yield {
+            "type": "progress", "processed": processed_count, "total": total, "ticker": ticker, "status": status,
+            "gems_found": len(top_heap),
+            "top_gems": [e[2] for e in sorted(top_heap, key=lambda e: e[:2], reverse=True)[:target_num_gems]],
+        }
+
+    record_scan(history_buffer, SOURCE_YF_SWING)
+    potential_gems = [entry[2] for entry in top_heap]
+
+    # ✅ 분석한 전체 종목 기준 섹터 내 백분위 부여
+    if potential_gems and peer_rows:
+        peer_ranks = rank_within_sector(peer_rows).set_index("ticker")
+        rank_columns = [*SECTOR_RANK_FIELDS.values(), "Sector_Peers"]
+        for gem in potential_gems:
+            if gem["ticker"] in peer_ranks.index:
+                ranks = peer_ranks.loc[gem["ticker"], rank_columns]
+                gem.update({c: (None if pd.isna(v) else float(v)) for c, v in ranks.items()})
+
+    # 점수 기준으로 내림차순 정렬 (동점이면 섹터 내 점수 백분위 순)
+    final_gems = sorted(potential_gems,
+                        key=lambda x: (x.get("Score", 0), x.get("Score_Sector_Pct") or 0), reverse=True)
+
+    # ✅ 같은 흐름(고상관) 종목이 몰리지 않게 상위 K개 선택 (봉 저장소 기준, 실패하면 점수순 K개)
+    if diversify and len(final_gems) > 1:
+        try:
+            final_gems = diversify_top_k(final_gems, target_num_gems)
+            final_gems.sort(key=lambda x: (x.get("Score", 0), x.get("Score_Sector_Pct") or 0), reverse=True)
+            report = concentration_report([gem["ticker"] for gem in final_gems])
+            for gem in final_gems:
+                gem["Corr_Cluster"] = report["clusters"].get(gem["ticker"].upper())
+            for flag in report["flags"]:
+                print(flag["message"])
+        except Exception as e:
+            print(f"❌ 상관관계 분산 선택 실패 (점수순으로 진행): {e}")
+    final_gems = final_gems[:target_num_gems]
+
+    record_scan(final_gems, SOURCE_YF_GEM)
+    print(f"💎 보석 발굴 완료: 총 {len(final_gems)}개의 보석 종목 발굴.")
+    yield {"type": "done", "gems": final_gems}
+
+
 def get_gem_candidates(
         num_to_sample=150,  # (안정적) 수집된 전체 티커 풀에서 샘플링하여 분석할 종목의 수 (증가)
         target_num_gems=20,  # (안정적) 최종적으로 찾을 보석 종목의 목표 개수 (적정 수준 유지)
@@ -99,16 +312,18 @@ def get_gem_candidates(
         max_psr=7,  # (안정적) 최대 PSR (주가매출액비율) 기준 (미국 주식 특성 반영, 보수적 조정)
         min_market_cap_billion=5,  # (안정적) 최소 시가총액 (억 달러) 기준 (50억 달러 이상 기업 선호)
         min_high_proximity_pct=10,  # 52주 고점 대비 최소 하락률 (%) (덜 오른/조정받은 기준)
-        min_swing_score=6.5  # (안정적) swing_stock_data 분석 점수 최소 기준 (상향 조정)
+        min_swing_score=6.5,  # (안정적) swing_stock_data 분석 점수 최소 기준 (상향 조정)
+        diversify=True  # 고상관 종목이 몰리지 않게 상위 종목 분산 선택
 ):
     """
     Yahoo Finance에서 동적으로 수집한 종목들을 대상으로 최소 시가총액, 최대 PER/PSR,
     '덜 오르고' 기준과 기술적 매수 시그널을 통해 '숨겨진 보석' 종목들을 탐색합니다.
+    (iter_gem_candidates를 끝까지 실행한 결과)
 
     Args:
         num_to_sample (int): gem_discovery에서 수집된 전체 종목 풀에서
                              무작위로 샘플링하여 swing_stock_data로 분석할 종목의 수.
-                             (너무 많으면 시간이 오래 걸림)
+                             (너무 많으면 시간이 오래 걸림, None이면 전체 풀)
         target_num_gems (int): 최종적으로 반환할 보석 종목의 목표 개수.
         max_per (float): PER 필터링을 위한 최대값.
         max_psr (float): PSR 필터링을 위한 최대값.
@@ -116,84 +331,18 @@ def get_gem_candidates(
         min_high_proximity_pct (float): 52주 고점 대비 최소 하락률 (%).
                                         이 값 이상 하락한 종목을 '덜 오른/조정받은' 것으로 간주.
         min_swing_score (float): swing_stock_data 분석 점수 중 최소 기준.
+        diversify (bool): True면 후보를 2배수 보관한 뒤 이미 고른 종목과 상관이 높은
+                          종목을 뒤로 미뤄 상위 종목을 분산 선택.
 
     Returns:
         list: 발굴된 보석 종목들의 분석 결과 딕셔너리 리스트.
               (점수 기준으로 내림차순 정렬됨)
     """
-    print(f"💎 보석 발굴 시작: {num_to_sample}개 종목 샘플링 후 분석 (재무/시가총액 필터링 적용)")
-
-    # ✅ gem_discovery 함수를 호출하여 초기 종목 풀 확보
-    initial_ticker_pool = gem_discovery(limit_yahoo=50, search_limit=10)
-
-    if not initial_ticker_pool:
-        print("❌ 초기 종목 풀을 수집할 수 없습니다. 보석 발굴 중단.")
-        return []
-
-    # 초기 종목 풀에서 무작위로 샘플링
-    # initial_ticker_pool이 num_to_sample보다 작을 경우, 전체 리스트 사용
-    tickers_to_process = random.sample(initial_ticker_pool, min(num_to_sample, len(initial_ticker_pool)))
-
-    potential_gems = []
-    processed_count = 0
-
-    for ticker in tickers_to_process:
-        processed_count += 1
-        print(f"  -> {ticker} 상세 분석 중... ({processed_count}/{len(tickers_to_process)})")
-
-        try:
-            # 1. yfinance에서 기본 정보 가져오기 (PER, PSR, 시가총액)
-            info = yf.Ticker(ticker).info
-
-            per = info.get("trailingPE")
-            psr = info.get("priceToSalesTrailing12Months")
-            market_cap = info.get("marketCap")  # 단위: 달러
-
-            # ✅ 2. 재무 필터링: PER, PSR, 시가총액 기준 적용
-            # None 값 처리 및 기준 적용
-            if (per is None or per > max_per) or \
-                    (psr is None or psr > max_psr) or \
-                    (market_cap is None or market_cap < min_market_cap_billion * 1_000_000_000):
-                print(
-                    f"    - {ticker}: 재무 필터링 불통과 (PER: {per if per is not None else 'N/A'}, PSR: {psr if psr is not None else 'N/A'}, 시총: {market_cap / 1_000_000_000 if market_cap else 'N/A'}B)")
-                continue  # 다음 종목으로 넘어감
-
-            # 3. swing_stock_data를 통한 심층 분석
-            analysis_result = swing_stock_data(ticker)
-
-            if "Recommendation" in analysis_result and "❌ 분석 실패" not in analysis_result["Recommendation"]:
-                # 4. "덜 오르고" 기준 적용 (52주 고가 대비 하락률)
-                high_proximity_pct = analysis_result.get("High_Proximity_Pct")
-
-                if high_proximity_pct is not None and high_proximity_pct >= min_high_proximity_pct:
-                    # 5. 최종 "보석" 기준: 매수 추천 & 점수 기준
-                    if analysis_result["Recommendation"] in ["🔥 강력 매수 (과매도 반등)", "✅ 매수 고려 (지지선 근접/모멘텀 전환)",
-                                                             "📈 상승 추세 매수"]:
-                        if analysis_result.get("Score") is not None and analysis_result["Score"] >= min_swing_score:
-                            # ✅ PER, PSR, MarketCap 정보를 analysis_result에 추가
-                            analysis_result['PER'] = per
-                            analysis_result['PSR'] = psr
-                            analysis_result['MarketCap'] = market_cap # 달러 단위로 저장
-
-                            potential_gems.append(analysis_result)
-                            print(
-                                f"    ✅ {ticker}: 보석 후보로 발굴! (점수: {analysis_result['Score']:.1f}, 추천: {analysis_result['Recommendation']})")
-
-            # API 요청 빈도 조절 (과도한 요청 방지)
-            time.sleep(0.5)  # 0.5초 대기
-
-        except Exception as e:
-            print(f"    ❌ {ticker} 분석 중 오류 발생: {e}")
-            time.sleep(1)  # 오류 발생 시 더 길게 대기
-            continue
-
-    # 점수 기준으로 내림차순 정렬
-    sorted_gems = sorted(potential_gems, key=lambda x: x.get("Score", 0), reverse=True)
-
-    # 목표 개수만큼만 반환
-    final_gems = sorted_gems[:target_num_gems]
-
-    print(f"💎 보석 발굴 완료: 총 {len(final_gems)}개의 보석 종목 발굴.")
+    final_gems = []
+    for event in iter_gem_candidates(num_to_sample, target_num_gems, max_per, max_psr, min_market_cap_billion,
+                                     min_high_proximity_pct, min_swing_score, diversify):
+        if event["type"] == "done":
+            final_gems = event["gems"]
     return final_gems
 
 
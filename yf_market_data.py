@@ -1,16 +1,35 @@
-import yfinance as yf
-import fear_and_greed
-import pandas as pd
+from yf_client import download as yf_download, get_ticker_info
+from async_fetch import open_session, fetch_json, run_in_background
+from market_breadth import breadth_snapshot
+from bar_store import load_bars
+from sector_rotation import SECTOR_ETFS, refresh_sector_bars, rotation_records
+
+FEAR_GREED_URL = "https://production.dataviz.cnn.io/index/fearandgreed/graphdata"
+FEAR_GREED_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
+}
+
+
+# ✅ CNN 공포탐욕지수 조회 (비동기)
+async def fetch_fear_and_greed():
+    async with open_session(FEAR_GREED_HEADERS) as session:
+        data = await fetch_json(session, FEAR_GREED_URL)
+    fgi = data["fear_and_greed"]
+    return {"value": fgi["score"], "description": fgi["rating"]}
+
 
 def market_data():
 
+    # 공포탐욕지수는 yfinance 조회와 겹쳐서 미리 요청
+    fgi_future = run_in_background(fetch_fear_and_greed())
+
     try:
         # ✅ 선물 지수 현재가
-        nq_future_price = yf.Ticker("NQ=F").info.get("regularMarketPrice")
-        sp_future_price = yf.Ticker("ES=F").info.get("regularMarketPrice")
+        nq_future_price = get_ticker_info("NQ=F").get("regularMarketPrice")
+        sp_future_price = get_ticker_info("ES=F").get("regularMarketPrice")
 
         # ✅ 필요한 심볼을 한 번에 다운로드
-        data = yf.download(["^NDX", "^GSPC", "^VIX"], period="7d", interval="1d", group_by="ticker", auto_adjust=False)
+        data = yf_download(["^NDX", "^GSPC", "^VIX"], period="7d", interval="1d", group_by="ticker", auto_adjust=False)
 
         # ✅ 나스닥 지수
         nq = data["^NDX"]
@@ -82,9 +101,9 @@ def market_data():
         fgi_status = "❓ 정보 없음"
 
         try:
-            fgi_data = fear_and_greed.get()
-            fgi_value = round(fgi_data.value, 2)
-            fgi_comment = fgi_data.description
+            fgi_data = fgi_future.result(timeout=15)
+            fgi_value = round(fgi_data["value"], 2)
+            fgi_comment = fgi_data["description"]
 
             if fgi_value is not None:
                 if fgi_value <= 20:
@@ -103,23 +122,10 @@ def market_data():
             fgi_status = "❌ 데이터 로드 실패"
 
         #  ✅ 섹터별 정보 (SPDR ETF 사용)
-        sector_etfs = {
-            "Technology": {"korean_name": "기술주", "ticker": "XLK"},
-            "Healthcare": {"korean_name": "헬스케어", "ticker": "XLV"},
-            "Financials": {"korean_name": "금융주", "ticker": "XLF"},
-            "Consumer Discretionary": {"korean_name": "경기소비재", "ticker": "XLY"},
-            "Communication Services": {"korean_name": "통신서비스", "ticker": "XLC"},
-            "Industrials": {"korean_name": "산업재", "ticker": "XLI"},
-            "Consumer Staples": {"korean_name": "필수소비재", "ticker": "XLP"},
-            "Energy": {"korean_name": "에너지", "ticker": "XLE"},
-            "Utilities": {"korean_name": "유틸리티", "ticker": "XLU"},
-            "Real Estate": {"korean_name": "부동산", "ticker": "XLRE"},
-            "Materials": {"korean_name": "소재", "ticker": "XLB"}
-        }
+        # 섹터 ETF + SPY 1년 봉은 봉 저장소에 쌓아 두고 새 봉만 받음 (상대강도 로테이션 매트릭스와 공유)
+        sector_etfs = SECTOR_ETFS
         sectors_data = {}
-        sector_tickers = [info["ticker"] for info in sector_etfs.values()]
-
-        sector_download = yf.download(sector_tickers, period="5d", interval="1d", group_by="ticker", auto_adjust=False)
+        refresh_sector_bars()
 
         strong_sectors = []  # 강세 섹터 리스트
         weak_sectors = []  # 약세 섹터 리스트
@@ -128,13 +134,8 @@ def market_data():
             ticker = info["ticker"]
             korean_name = info["korean_name"]
 
-            # yfinance MultiIndex 또는 단일 티커 DataFrame 처리
-            if len(sector_tickers) > 1 and ticker in sector_download.columns:
-                sector_df = sector_download[ticker]
-            elif len(sector_tickers) == 1:  # 단일 티커 다운로드 시
-                sector_df = sector_download
-            else:
-                sector_df = pd.DataFrame()  # 데이터가 없는 경우 빈 DataFrame
+            # 최근 5거래일 봉 (저장된 봉이 없으면 빈 DataFrame)
+            sector_df = load_bars(ticker).dropna(subset=["Close"]).tail(5)
 
             sector_status = "❓ 데이터 부족"
             if not sector_df.empty and len(sector_df) >= 2:
@@ -195,6 +196,21 @@ def market_data():
         if fgi_status == "❌ 데이터 로드 실패":
             overall_market_outlook = "❌ 핵심 데이터(공포탐욕지수) 로드 실패로 판단 불가"
 
+        # --- ✅ 시장 폭 (봉 저장소 유니버스 기준, 배치 실행기가 갱신한 시계열을 읽기만 함) ---
+        breadth = breadth_snapshot()
+        breadth_comment = None
+        if breadth is not None and breadth["above_ma50_pct"] is not None:
+            index_up = overall_market_outlook in ["🟢 전반적인 시장 상승세 유지", "✅ 시장 강세 유지 (상승세 지속)",
+                                                  "📈 시장 과열 경고 (하락 위험 증가)"]
+            index_down = overall_market_outlook in ["🟠 전반적인 시장 약세/관망", "📉 극심한 공포/침체 (잠재적 매수 기회)",
+                                                    "⚠️ 시장 공포/불확실성 (신중 접근)"]
+            if index_up and breadth["above_ma50_pct"] < 40:
+                breadth_comment = "⚠️ 지수는 강하지만 50일선 위 종목이 적음 (소수 종목 주도 상승)"
+            elif index_down and breadth["mcclellan_osc"] > 0 and breadth["new_highs"] > breadth["new_lows"]:
+                breadth_comment = "💡 지수는 약하지만 시장 폭은 개선 중 (McClellan 오실레이터 양수, 신고가 우위)"
+            else:
+                breadth_comment = f"시장 폭: {breadth['status']}"
+
         # --- 종합 판단 메시지 구성 ---
         overall_market_outlook_details = {
             "summary": overall_market_outlook,
@@ -203,6 +219,8 @@ def market_data():
         }
         if not strong_sectors and not weak_sectors:
             overall_market_outlook_details["no_sector_trend"] = True
+        if breadth_comment:
+            overall_market_outlook_details["breadth_comment"] = breadth_comment
 
         return {
             "NASDAQ": {
@@ -226,6 +244,8 @@ def market_data():
                 "status": fgi_status
             },
             "Sectors": sectors_data,
+            "SectorRotation": rotation_records(),
+            "Breadth": breadth,
             "OverallMarketOutlook": overall_market_outlook_details
         }
 
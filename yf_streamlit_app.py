@@ -3,14 +3,36 @@ import pandas as pd
 import base64
 import time  # sleep 함수를 위해 필요
 
-# yf_swing_stock_data.py와 yf_market_data.py는 별도의 파일로 존재한다고 가정합니다.
-# 실제 실행 시 이 파일들이 같은 디렉토리에 있어야 합니다.
-from yf_swing_stock_data import swing_stock_data
-from yf_market_data import market_data
+# yfinance, ta, aiohttp, pyarrow 등 무거운 모듈은 실제로 필요한 시점에 임포트합니다.
+# (yf_swing_stock_data / yf_market_data / yf_gem_discovery / scan_history)
+# 배치 아티팩트가 유효하면 첫 화면은 이 모듈들 없이 바로 그려집니다. 임포트 비용은 bench_imports.py로 확인.
+from batch_runner import YF_DEFAULT_TICKERS, get_fresh_items, get_fresh_section, update_section, update_section_items
+from yf_view_models import memoize, memoize_per_ticker, build_summary_view, build_detail_view, build_gem_view
 
-# yf_gem_discovery.py에서 get_gem_candidates 함수 임포트
-# 이 파일이 yf_gem_discovery.py와 같은 디렉토리에 있어야 합니다.
-from yf_gem_discovery import get_gem_candidates
+
+# ✅ 종목 분석 (첫 호출 시 yfinance/ta 로드)
+def swing_stock_data(ticker, multi_timeframe=False):
+    from yf_swing_stock_data import swing_stock_data as _swing_stock_data
+    return _swing_stock_data(ticker, multi_timeframe=multi_timeframe)
+
+
+# ✅ 여러 종목 뉴스 감성 미리 조회 (종목별 분석이 Finviz를 한 종목씩 조회하지 않도록, 첫 호출 시 bs4/VADER 로드)
+def prefetch_news(tickers):
+    if not tickers:
+        return
+    try:
+        from news_sentiment import news_sentiment
+        news_sentiment(tickers)
+    except Exception as e:
+        print(f"❌ 뉴스 헤드라인 일괄 조회 실패 (종목별로 조회): {e}")
+
+
+# ✅ 스캔 이력 저장 (첫 호출 시 pyarrow 로드)
+def record_swing_scan(results):
+    if not results:
+        return None
+    from scan_history import record_scan, SOURCE_YF_SWING
+    return record_scan(results, SOURCE_YF_SWING)
 
 
 # 모바일 감지 함수 (변경 없음)
@@ -33,7 +55,8 @@ with st.sidebar:
 
 
 # ---
-# 이미지 base64 인코딩 함수 (변경 없음)
+# 이미지 base64 인코딩 함수 (파일 내용은 바뀌지 않으므로 프로세스당 한 번만 인코딩)
+@st.cache_data(show_spinner=False)
 def get_image_base64(image_path):
     try:
         with open(image_path, "rb") as img_file:
@@ -76,7 +99,15 @@ with tab2:
 
     @st.cache_data(ttl=300)
     def get_market_data_cached():
-        return market_data()
+        # 배치 실행기가 미리 계산한 스냅샷이 유효하면 바로 사용
+        precomputed_market = get_fresh_section("market")
+        if precomputed_market is not None:
+            return precomputed_market
+        from yf_market_data import market_data
+        market = market_data()
+        if "error" not in market:
+            update_section("market", market)
+        return market
 
 
     with st.spinner("🚀 시장 데이터 불러오는 중..."):
@@ -96,6 +127,8 @@ with tab2:
                 st.markdown(f"- **주요 강세 섹터:** {', '.join(outlook_details['strong_sectors'])}")
             if outlook_details['weak_sectors']:
                 st.markdown(f"- **주요 약세 섹터:** {', '.join(outlook_details['weak_sectors'])}")
+        if outlook_details.get("breadth_comment"):
+            st.markdown(f"- **{outlook_details['breadth_comment']}**")
         st.caption("이 판단은 주요 지수, 변동성, 시장 심리 및 섹터별 흐름을 종합한 결과입니다.")
 
         st.markdown("---")
@@ -127,6 +160,30 @@ with tab2:
             st.markdown(f"**상태:** {market_outlook['FearGreedIndex']['status']}")
             st.caption(f"상세 설명: {market_outlook['FearGreedIndex']['comment']}")
 
+        breadth = market_outlook.get("Breadth")
+        if breadth:
+            st.markdown("---")
+            st.markdown(f"### 🌐 시장 폭 (Market Breadth, {breadth['date']} · {breadth['issues']:,}개 종목)")
+            col_ad, col_ma, col_hl, col_mc = st.columns(4)
+            with col_ad:
+                st.metric(label="**상승 / 하락 종목**", value=f"{breadth['advances']:,} / {breadth['declines']:,}")
+            with col_ma:
+                st.metric(label="**50일선 위 종목 비율**", value=f"{breadth['above_ma50_pct']}%")
+                st.caption(f"20일선 {breadth['above_ma20_pct']}% · 200일선 {breadth['above_ma200_pct']}%")
+            with col_hl:
+                st.metric(label="**52주 신고가 / 신저가**", value=f"{breadth['new_highs']:,} / {breadth['new_lows']:,}")
+            with col_mc:
+                st.metric(label="**McClellan 오실레이터**", value=breadth['mcclellan_osc'])
+                st.caption(f"서머네이션 지수 {breadth['mcclellan_sum']}")
+            st.caption(f"상태: {breadth['status']}")
+
+            from market_breadth import load_breadth
+            breadth_history = load_breadth().tail(120)
+            if not breadth_history.empty:
+                st.line_chart(breadth_history[["above_ma20_pct", "above_ma50_pct", "above_ma200_pct"]].rename(
+                    columns={"above_ma20_pct": "20일선 위 %", "above_ma50_pct": "50일선 위 %",
+                             "above_ma200_pct": "200일선 위 %"}))
+
         st.markdown("---")
         st.markdown("### 📈 주요 섹터별 트렌드")
         sector_df_data = []
@@ -135,6 +192,25 @@ with tab2:
         sector_table_df = pd.DataFrame(sector_df_data)
         st.dataframe(sector_table_df, use_container_width=True, hide_index=True)
 
+        rotation = market_outlook.get("SectorRotation")
+        if rotation:
+            st.markdown("### 🔄 섹터 로테이션 (SPY 대비 상대강도)")
+            rotation_df = pd.DataFrame(rotation)
+            rotation_df["Rank_Change"] = rotation_df["Rank_Change"].map(
+                lambda v: "-" if v is None or pd.isna(v) else (f"▲{int(v)}" if v > 0 else (f"▼{int(-v)}" if v < 0 else "="))
+            )
+            rotation_df = rotation_df.rename(columns={
+                "Rank": "순위", "Rank_Change": "순위 변화", "korean_name": "섹터명", "ticker": "티커",
+                "RS_1w": "1주 %", "RS_1m": "1개월 %", "RS_3m": "3개월 %", "RS_6m": "6개월 %", "RS_Score": "RS 점수",
+                "RS_Ratio": "RS-Ratio", "RS_Momentum": "RS-Momentum", "Quadrant": "국면",
+            })
+            st.dataframe(
+                rotation_df[["순위", "순위 변화", "섹터명", "티커", "1주 %", "1개월 %", "3개월 %", "6개월 %", "RS 점수",
+                             "RS-Ratio", "RS-Momentum", "국면"]],
+                use_container_width=True, hide_index=True
+            )
+            st.caption("SPY 대비 초과 수익률(%) · 국면: 선도(RS-Ratio/Momentum 모두 100 이상) → 약화 → 부진 → 개선 순으로 순환합니다.")
+
 # tab3: 주식 분석 (수정 반영)
 with tab3:
     st.subheader("📈 주식 분석")
@@ -148,6 +224,26 @@ with tab3:
         st.session_state.default_tickers_loaded = False
     if "reanalyze_trigger" not in st.session_state:
         st.session_state.reanalyze_trigger = None  # 재분석 트리거용 상태 변수
+    if "ticker_versions" not in st.session_state:
+        st.session_state.ticker_versions = {}  # 종목별 분석 결과 버전 (뷰 모델 캐시 키)
+        st.session_state.data_version = 0
+    if "view_cache" not in st.session_state:
+        st.session_state.view_cache = {}  # 버전 키로 메모이제이션한 표/상세 보기
+
+
+    # 분석 결과 저장 (버전 증가 -> 해당 종목 화면만 다시 생성)
+    def store_ticker_data(ticker, data):
+        st.session_state.data_version += 1
+        st.session_state.ticker_data[ticker] = data
+        st.session_state.ticker_versions[ticker] = st.session_state.data_version
+
+
+    def drop_ticker_data(ticker):
+        st.session_state.ticker_data.pop(ticker, None)
+        st.session_state.ticker_versions.pop(ticker, None)
+
+    # 다중 시간대 분석 (종목 추가/재분석 시 60분봉을 받아 1시간/일/주봉 지표를 함께 계산)
+    use_mtf = st.checkbox("⏱️ 다중 시간대 분석 (1시간/일/주봉)", key="use_mtf")
 
     # 신규 종목 입력
     new_input = st.text_input("🎯 분석할 종목 입력 (예: AAPL)", "")
@@ -157,10 +253,11 @@ with tab3:
             st.warning(f"이미 추가된 종목입니다: {symbol}")
         else:
             with st.spinner(f"🔍 {symbol} 분석 중..."):
-                data = swing_stock_data(symbol)
+                data = swing_stock_data(symbol, multi_timeframe=use_mtf)
                 if data and "Recommendation" in data and "❌ 분석 실패" not in data["Recommendation"]:
                     st.session_state.tickers.append(symbol)
-                    st.session_state.ticker_data[symbol] = data
+                    store_ticker_data(symbol, data)
+                    record_swing_scan([data])
                 else:
                     st.error(f"❌ 데이터를 불러올 수 없거나 분석에 실패했습니다: {symbol}. 오류: {data.get('Recommendation', '알 수 없음')}")
             st.rerun()
@@ -170,12 +267,12 @@ with tab3:
     def delete_ticker_callback(ticker_to_delete):
         if ticker_to_delete in st.session_state.tickers:
             st.session_state.tickers.remove(ticker_to_delete)
-            st.session_state.ticker_data.pop(ticker_to_delete, None)
+            drop_ticker_data(ticker_to_delete)
 
 
     # 종목 재분석 함수
     def reanalyze_ticker_callback(ticker_to_reanalyze):
-        st.session_state.ticker_data.pop(ticker_to_reanalyze, None)
+        drop_ticker_data(ticker_to_reanalyze)
         st.session_state.reanalyze_trigger = ticker_to_reanalyze
 
 
@@ -183,9 +280,10 @@ with tab3:
     if st.session_state.reanalyze_trigger:
         ticker_to_reanalyze = st.session_state.reanalyze_trigger
         with st.spinner(f"🔍 {ticker_to_reanalyze} 재분석 중..."):
-            data = swing_stock_data(ticker_to_reanalyze)
+            data = swing_stock_data(ticker_to_reanalyze, multi_timeframe=use_mtf)
             if data and "Recommendation" in data and "❌ 분석 실패" not in data["Recommendation"]:
-                st.session_state.ticker_data[ticker_to_reanalyze] = data
+                store_ticker_data(ticker_to_reanalyze, data)
+                record_swing_scan([data])
             else:
                 st.error(
                     f"❌ {ticker_to_reanalyze} 재분석 중 데이터 로드 실패. 잠시 후 다시 시도해주세요. 오류: {data.get('Recommendation', '알 수 없음')}")
@@ -208,19 +306,31 @@ with tab3:
 
     # 기본 종목 로딩
     if not st.session_state.tickers and not st.session_state.default_tickers_loaded:
-        default_tickers = ["OPTT", "APP", "LAES", "TSSI"]
+        default_tickers = YF_DEFAULT_TICKERS
         default_load_successful_count = 0
+        # 배치 실행기가 미리 계산한 결과 중 유효한 것은 바로 사용하고, 오래된 종목만 다시 분석
+        precomputed_results = get_fresh_items("yf_watchlist", default_tickers)
+        prefetch_news([t for t in default_tickers if t not in precomputed_results])
+        live_results = {}
         for t in default_tickers:
+            if t in precomputed_results:
+                st.session_state.tickers.append(t)
+                store_ticker_data(t, precomputed_results[t])
+                default_load_successful_count += 1
+                continue
             with st.spinner(f" {t} 분석 중..."):
                 data = swing_stock_data(t)
                 if data and "Recommendation" in data and "❌ 분석 실패" not in data["Recommendation"]:
                     st.session_state.tickers.append(t)
-                    st.session_state.ticker_data[t] = data
+                    store_ticker_data(t, data)
+                    live_results[t] = data
                     default_load_successful_count += 1
                 else:
                     st.warning(f"기본 종목 '{t}' 로드 실패: {data.get('Recommendation', '알 수 없음')}")
 
         st.session_state.default_tickers_loaded = True
+        record_swing_scan(list(live_results.values()))
+        update_section_items("yf_watchlist", live_results)
         if default_load_successful_count > 0:
             st.rerun()
 
@@ -230,172 +340,64 @@ with tab3:
     # 핵심 요약 테이블
     if valid_tickers:
         st.markdown("### ✅ 핵심 요약 테이블")
-        rows = []
-        for t in valid_tickers:
-            data = st.session_state.ticker_data[t]
-            rows.append({
-                "종목": data.get("ticker"),
-                "현재가": f"${data.get('current_price'):.2f}" if data.get('current_price') is not None else "N/A",
-                "점수": f"{data.get('Score'):.1f}",
-                "추천": data.get("Recommendation")
-            })
-
-        rec_df = pd.DataFrame(rows).sort_values(by="점수", ascending=False)
+        view_cache = st.session_state.view_cache
+        versions = {t: st.session_state.ticker_versions.get(t) for t in valid_tickers}
+        # 관심 종목 전체 기준 섹터 내 상대 순위가 들어가므로 종목 구성/버전 중 하나라도 바뀌면 다시 생성
+        rec_df = memoize(view_cache, "summary", tuple(versions.items()), build_summary_view,
+                         [st.session_state.ticker_data[t] for t in valid_tickers])
         st.dataframe(rec_df, use_container_width=True, hide_index=True)
 
-        # 개별 종목 지표 상세 보기
+        # 개별 종목 지표 상세 보기 (바뀐 종목만 다시 생성)
+        detail_views = memoize_per_ticker(view_cache, "detail", versions, build_detail_view, st.session_state.ticker_data)
         with st.expander("📊 개별 종목 지표 상세 보기"):
             for t in valid_tickers:
-                data = st.session_state.ticker_data[t]
-                st.markdown(f"#### {t} - {data.get('Recommendation')} ({data.get('Score')}점)")
-
-                # 가격/추세 지표
-                st.markdown("##### 📉 가격/추세 지표")
-                trend_data = {
-                    "지표": ["현재가", "전일 종가", "5일 MA", "20일 MA", "60일 MA", "120일 MA", "추세"],
-                    "값": [
-                        f"${data.get('current_price'):.2f}" if data.get('current_price') is not None else "N/A",
-                        f"${data.get('prev_close_price'):.2f}" if data.get('prev_close_price') is not None else "N/A",
-                        f"${data.get('MA_5'):.2f}" if data.get('MA_5') is not None else "N/A",
-                        f"${data.get('MA_20'):.2f}" if data.get('MA_20') is not None else "N/A",
-                        f"${data.get('MA_60'):.2f}" if data.get('MA_60') is not None else "N/A",
-                        f"${data.get('MA_120'):.2f}" if data.get('MA_120') is not None else "N/A",
-                        data.get("Trend", "N/A")
-                    ]
-                }
-                st.dataframe(pd.DataFrame(trend_data), hide_index=True, use_container_width=True)
-
-                # 모멘텀/수급 지표
-                st.markdown("##### 📊 모멘텀/수급 지표")
-                momentum_data = {
-                    "지표": ["RSI(14)", "Stoch K", "Stoch D", "MACD", "MACD Signal", "MACD 추세", "거래량 배율", "거래대금(M$)"],
-                    "값": [
-                        f"{data.get('RSI_14'):.2f}" if data.get('RSI_14') is not None else "N/A",
-                        f"{data.get('Stoch_K'):.2f}" if data.get('Stoch_K') is not None else "N/A",
-                        f"{data.get('Stoch_D'):.2f}" if data.get('Stoch_D') is not None else "N/A",
-                        f"{data.get('MACD'):.2f}" if data.get('MACD') is not None else "N/A",
-                        f"{data.get('MACD_Signal'):.2f}" if data.get('MACD_Signal') is not None else "N/A",
-                        data.get("MACD_Trend", "N/A"),
-                        f"{data.get('Volume_Rate'):.2f}x" if data.get('Volume_Rate') is not None else "N/A",
-                        f"${data.get('Volume_Turnover_Million'):.2f}" if data.get(
-                            'Volume_Turnover_Million') is not None else "N/A"
-                    ]
-                }
-                st.dataframe(pd.DataFrame(momentum_data), hide_index=True, use_container_width=True)
-
-                # 시장 위치/기타 지표
-                st.markdown("##### 📦 시장 위치/기타 지표")
-                market_pos_data = {
-                    "지표": ["52주 고가 근접도(%)", "52주 저가 근접도(%)", "볼린저 상단", "볼린저 중간", "볼린저 하단", "현재가 BB 위치", "갭 상승률(%)",
-                           "3일 연속 마감"],
-                    "값": [
-                        f"{data.get('High_Proximity_Pct'):.2f}" if data.get(
-                            'High_Proximity_Pct') is not None else "N/A",
-                        f"{data.get('Low_Proximity_Pct'):.2f}" if data.get('Low_Proximity_Pct') is not None else "N/A",
-                        f"${data.get('BB_Upper'):.2f}" if data.get('BB_Upper') is not None else "N/A",
-                        f"${data.get('BB_Middle'):.2f}" if data.get('BB_Middle') is not None else "N/A",
-                        f"${data.get('BB_Lower'):.2f}" if data.get('BB_Lower') is not None else "N/A",
-                        data.get("Price_Position", "N/A"),
-                        f"{data.get('Gap_Up_Pct'):.2f}" if data.get('Gap_Up_Pct') is not None else "N/A",
-                        data.get("Consecutive_Closes", "N/A")
-                    ]
-                }
-                st.dataframe(pd.DataFrame(market_pos_data), hide_index=True, use_container_width=True)
-
-                # 옵션 정보
-                if data.get('option_expiry'):
-                    st.markdown("##### 💹 옵션 정보")
-                    option_data = {
-                        "지표": ["옵션 만기일", "최대 콜 스트라이크", "최대 콜 거래량", "최대 풋 스트라이크", "최대 풋 거래량"],
-                        "값": [
-                            data.get('option_expiry', "N/A"),
-                            f"${data.get('max_call_strike'):.2f}" if data.get('max_call_strike') is not None else "N/A",
-                            f"{data.get('max_call_volume'):,}" if data.get('max_call_volume') is not None else "N/A",
-                            f"${data.get('max_put_strike'):.2f}" if data.get('max_put_strike') is not None else "N/A",
-                            f"{data.get('max_put_volume'):,}" if data.get('max_put_volume') is not None else "N/A"
-                        ]
-                    }
-                    st.dataframe(pd.DataFrame(option_data), hide_index=True, use_container_width=True)
-
-                # 지지선 정보
-                st.markdown("---")
-                st.markdown("##### 📍 현재 가격 및 지지선 위치")
-                current_price = data.get('current_price')
-                support_1st = data.get('Support_1st')
-                support_2nd = data.get('Support_2nd')
-                support_3rd = data.get('Support_3rd')
-
-                support_level_data = {
-                    "지표": ["현재가", "1차 지지선 (MA 20)", "2차 지지선 (MA 60)", "3차 지지선 (MA 120)"],
-                    "값": [
-                        f"${current_price:.2f}" if current_price is not None else "N/A",
-                        f"${support_1st:.2f}" if support_1st is not None else "N/A",
-                        f"${support_2nd:.2f}" if support_2nd is not None else "N/A",
-                        f"${support_3rd:.2f}" if support_3rd is not None else "N/A"
-                    ]
-                }
-                st.dataframe(pd.DataFrame(support_level_data), hide_index=True, use_container_width=True)
-
-                if current_price is not None and support_1st is not None and support_2nd is not None and support_3rd is not None:
-                    if current_price >= support_1st:
-                        st.success(
-                            f"**현재 가격 (${current_price:.2f})**은 1차 지지선 (${support_1st:.2f}) 위에 있습니다. 긍정적인 신호입니다.")
-                    elif current_price >= support_2nd and current_price < support_1st:
-                        st.warning(
-                            f"**현재 가격 (${current_price:.2f})**은 1차 지지선 (${support_1st:.2f}) 아래에 있지만, 2차 지지선 (${support_2nd:.2f}) 위에 있습니다. 2차 지지선에서의 반등을 기대할 수 있습니다.")
-                    elif current_price >= support_3rd and current_price < support_2nd:
-                        st.warning(
-                            f"**현재 가격 (${current_price:.2f})**은 2차 지지선 (${support_2nd:.2f}) 아래에 있지만, 3차 지지선 (${support_3rd:.2f}) 위에 있습니다. 장기 지지선에서의 반등을 기대할 수 있습니다.")
-                    elif current_price < support_3rd:
-                        st.error(
-                            f"**현재 가격 (${current_price:.2f})**은 3차 지지선 (${support_3rd:.2f}) 아래에 있습니다. 장기 추세 이탈 가능성이 있으니 매우 주의가 필요합니다.")
+                for kind, content in detail_views[t]:
+                    if kind == "dataframe":
+                        st.dataframe(content, hide_index=True, use_container_width=True)
                     else:
-                        st.info("현재 가격과 지지선 위치를 파악할 수 없습니다.")
+                        getattr(st, kind)(content)  # markdown / success / warning / error / info
+
+        # 관심 종목 상관관계 / 집중도 (봉 저장소 기준, 버튼을 누르면 새 봉만 받아 갱신)
+        if len(valid_tickers) >= 2:
+            with st.expander("🧩 관심 종목 상관관계 / 집중도"):
+                from correlation import correlation_matrix, concentration_report
+                refresh_bars = st.button("📥 새 봉 받아서 다시 계산", key="refresh_correlation_btn")
+                corr = correlation_matrix(valid_tickers, refresh=refresh_bars)
+                report = concentration_report(valid_tickers, corr)
+                if not report["clusters"]:
+                    st.info("상관관계를 계산할 봉 데이터가 부족합니다. '새 봉 받아서 다시 계산'을 눌러주세요.")
                 else:
-                    st.info("지지선 정보를 불러올 수 없습니다. (데이터 부족 또는 계산 오류)")
-
-                st.markdown("---")
-
-                # 저항선 정보 추가
-                st.markdown("##### ⛰️ 현재 가격 및 저항선 위치")
-                resistance_1st = data.get('Resistance_1st')
-                resistance_2nd = data.get('Resistance_2nd')
-                resistance_3rd = data.get('Resistance_3rd')
-
-                resistance_level_data = {
-                    "지표": ["현재가", "1차 저항선", "2차 저항선", "3차 저항선"],
-                    "값": [
-                        f"${current_price:.2f}" if current_price is not None else "N/A",
-                        f"${resistance_1st:.2f}" if resistance_1st is not None else "N/A",
-                        f"${resistance_2nd:.2f}" if resistance_2nd is not None else "N/A",
-                        f"${resistance_3rd:.2f}" if resistance_3rd is not None else "N/A"
-                    ]
-                }
-                st.dataframe(pd.DataFrame(resistance_level_data), hide_index=True, use_container_width=True)
-
-                if current_price is not None and resistance_1st is not None and resistance_2nd is not None and resistance_3rd is not None:
-                    if current_price <= resistance_1st:
-                        st.success(
-                            f"**현재 가격 (${current_price:.2f})**은 1차 저항선 (${resistance_1st:.2f}) 아래에 있습니다. 상승 여력이 있을 수 있습니다.")
-                    elif current_price <= resistance_2nd and current_price > resistance_1st:
-                        st.warning(
-                            f"**현재 가격 (${current_price:.2f})**은 1차 저항선 (${resistance_1st:.2f})을 돌파했지만, 2차 저항선 (${resistance_2nd:.2f}) 아래에 있습니다. 추가 상승 시 2차 저항선에 유의해야 합니다.")
-                    elif current_price <= resistance_3rd and current_price > resistance_2nd:
-                        st.warning(
-                            f"**현재 가격 (${current_price:.2f})**은 2차 저항선 (${resistance_2nd:.2f})을 돌파했지만, 3차 저항선 (${resistance_3rd:.2f}) 아래에 있습니다. 장기 저항선 돌파 여부가 중요합니다.")
-                    elif current_price > resistance_3rd:
-                        st.error(
-                            f"**현재 가격 (${current_price:.2f})**은 3차 저항선 (${resistance_3rd:.2f}) 위에 있습니다. 강한 상승 모멘텀이지만, 과열될 수 있으니 주의가 필요합니다.")
-                    else:
-                        st.info("현재 가격과 저항선 위치를 파악할 수 없습니다.")
-                else:
-                    st.info("저항선 정보를 불러올 수 없습니다. (데이터 부족 또는 계산 오류)")
-
-                st.markdown("---")  # 각 종목 상세 보기 구분선
+                    col_bets, col_corr = st.columns(2)
+                    with col_bets:
+                        st.metric(label="**유효 독립 종목 수**", value=f"{report['effective_bets']} / {report['symbols']}")
+                    with col_corr:
+                        st.metric(label="**평균 상관계수**", value=report["avg_corr"])
+                    for flag in report["flags"]:
+                        st.warning(flag["message"])
+                    if not report["flags"]:
+                        st.success("✅ 특정 흐름에 몰린 종목 묶음이 없습니다.")
+                    import plotly.express as px
+                    ordered = list(report["clusters"])  # 군집(덴드로그램) 순서
+                    fig = px.imshow(corr.loc[ordered, ordered].round(2), zmin=-1, zmax=1, text_auto=True,
+                                    color_continuous_scale="RdBu_r")
+                    st.plotly_chart(fig, use_container_width=True)
+                    st.caption("일간 수익률 지수가중 상관계수 (반감기 60거래일) · 평균 상관 0.7 이상이면 같은 묶음으로 봅니다.")
 
     else:
         st.warning("분석할 종목이 없습니다. 새로운 종목을 추가해주세요.")
 
+    # 최근 알림 (스캔 결과가 저장될 때 직전 값과 비교해 추천/점수/MACD 변화 기록, alerts.py)
+    with st.expander("🔔 최근 알림", expanded=False):
+        from alerts import load_recent_alerts
+        recent_alerts = load_recent_alerts(30)
+        if recent_alerts:
+            st.dataframe(pd.DataFrame(recent_alerts)[["alerted_at", "source", "ticker", "message", "previous", "current"]]
+                         .rename(columns={"alerted_at": "시각", "source": "소스", "ticker": "종목", "message": "알림",
+                                          "previous": "이전", "current": "현재"}),
+                         use_container_width=True, hide_index=True)
+        else:
+            st.info("아직 발생한 알림이 없습니다.")
+
 # tab4: 보석 발굴 (UI 간소화 및 최적화)
 with tab4:
     st.subheader("💎 숨겨진 보석 발굴기")
@@ -407,7 +409,9 @@ with tab4:
 
     # 세션 상태 변수 초기화 (보석 발굴기 전용)
     if "gem_discovery_results" not in st.session_state:
-        st.session_state.gem_discovery_results = []
+        # 배치 실행기가 미리 찾은 보석 후보가 있으면 바로 표시
+        st.session_state.gem_discovery_results = get_fresh_section("gems") or []
+        st.session_state.gem_results_version = 0  # 결과가 바뀔 때마다 증가 (결과 테이블 캐시 키)
     if "gem_discovery_running" not in st.session_state:
         st.session_state.gem_discovery_running = False
 
@@ -415,20 +419,25 @@ with tab4:
     if st.button("💎 보석 발굴 시작", key="start_gem_discovery_btn"):
         st.session_state.gem_discovery_running = True
         st.session_state.gem_discovery_results = []  # 이전 결과 초기화
+        st.session_state.gem_results_version += 1
         st.rerun()  # 버튼 클릭 후 바로 재실행하여 진행 상태 표시
 
     # 보석 발굴 진행 중인 경우
     if st.session_state.gem_discovery_running:
         st.info("🚀 보석 발굴 중입니다. 잠시만 기다려 주세요...")
 
-        # 진행 상황을 보여줄 placeholder
+        # 진행 상황을 보여줄 placeholder (분석 1건마다 진행률과 현재 상위 보석 표를 갱신)
         progress_text_placeholder = st.empty()
         progress_bar_placeholder = st.progress(0)
-
-        with st.spinner("💎 보석 발굴 진행 중... (시간이 다소 소요될 수 있습니다)"):
-            # get_gem_candidates 함수 호출 (안정적인 설정 값 직접 전달)
-            # 이 함수는 이제 PER, PSR, MarketCap을 반환 딕셔너리에 포함합니다.
-            found_gems = get_gem_candidates(
+        live_table_placeholder = st.empty()
+
+        from yf_gem_discovery import iter_gem_candidates
+        status_labels = {"filtered": "재무 필터 제외", "analyzed": "분석 완료", "gem": "💎 보석 후보",
+                         "failed": "분석 실패", "error": "오류"}
+        progress_text_placeholder.markdown("🔎 종목 풀 수집 중...")
+        found_gems = []
+        # 안정적인 설정 값 직접 전달 (결과 딕셔너리에 PER, PSR, MarketCap 포함)
+        for event in iter_gem_candidates(
                 num_to_sample=150,
                 target_num_gems=20,
                 max_per=35,
@@ -436,41 +445,47 @@ with tab4:
                 min_market_cap_billion=5,  # 50억 달러
                 min_high_proximity_pct=10,
                 min_swing_score=6.5
-            )
-            st.session_state.gem_discovery_results = found_gems
-            st.session_state.gem_discovery_running = False
+        ):
+            if event["type"] == "pool":
+                progress_text_placeholder.markdown(f"🔎 분석 대상 {event['total']}개 종목")
+            elif event["type"] == "progress":
+                progress_bar_placeholder.progress(event["processed"] / max(event["total"], 1))
+                progress_text_placeholder.markdown(
+                    f"💎 {event['processed']}/{event['total']} · {event['ticker']}: "
+                    f"{status_labels.get(event['status'], event['status'])} · 발굴 {event['gems_found']}개")
+                if event["status"] == "gem":  # 상위 보석이 바뀔 수 있을 때만 표 다시 그림
+                    live_table_placeholder.dataframe(build_gem_view(event["top_gems"]),
+                                                     use_container_width=True, hide_index=True)
+            elif event["type"] == "done":
+                found_gems = event["gems"]
+
+        st.session_state.gem_discovery_results = found_gems
+        st.session_state.gem_results_version += 1
+        st.session_state.gem_discovery_running = False
+        update_section("gems", found_gems)
 
         # 작업 완료 후 프로그레스 바 숨기기
         progress_text_placeholder.empty()
         progress_bar_placeholder.empty()
+        live_table_placeholder.empty()
         st.rerun()  # 완료 후 UI 업데이트
 
     # 발굴된 보석 종목이 있을 경우 또는 발굴이 완료된 경우 결과 표시
     if not st.session_state.gem_discovery_running and st.session_state.gem_discovery_results:
         st.markdown("### ✨ 발굴된 보석 종목")
-        gem_rows = []
-        for gem in sorted(st.session_state.gem_discovery_results, key=lambda x: x.get("Score", 0), reverse=True):
-            # gem 딕셔너리에 PER, PSR, MarketCap이 직접 포함되어 있으므로 바로 사용합니다.
-            market_cap_val = gem.get('MarketCap')
-            per_val = gem.get('PER')
-            psr_val = gem.get('PSR')
-
-            market_cap_str = f"{market_cap_val / 1_000_000_000:.2f}B" if market_cap_val is not None else "N/A"
-            per_str = f"{per_val:.2f}" if per_val is not None else "N/A"
-            psr_str = f"{psr_val:.2f}" if psr_val is not None else "N/A"
-
-            gem_rows.append({
-                "종목": gem.get("ticker"),
-                "현재가": f"${gem.get('current_price'):.2f}" if gem.get('current_price') is not None else "N/A",
-                "시총": market_cap_str,
-                "PER": per_str,
-                "PSR": psr_str,
-                "52주 고점 근접도(%)": f"{gem.get('High_Proximity_Pct'):.2f}",
-                "RSI": f"{gem.get('RSI_14'):.2f}",
-                "점수": f"{gem.get('Score'):.1f}",
-                "추천": gem.get("Recommendation")
-            })
-        st.dataframe(pd.DataFrame(gem_rows), use_container_width=True, hide_index=True)
+        gem_df = memoize(st.session_state.view_cache, "gems", st.session_state.gem_results_version,
+                         build_gem_view, st.session_state.gem_discovery_results)
+        st.dataframe(gem_df, use_container_width=True, hide_index=True)
         st.info(f"총 {len(st.session_state.gem_discovery_results)}개의 잠재적 보석 종목이 발굴되었습니다.")
+
+        # 보석 후보 집중도 경고 (같은 흐름 종목이 여러 개면 사실상 한 종목에 몰아서 투자하는 것과 비슷)
+        from correlation import concentration_report
+        gem_report = memoize(st.session_state.view_cache, "gem_concentration", st.session_state.gem_results_version,
+                             concentration_report, [g["ticker"] for g in st.session_state.gem_discovery_results])
+        for flag in gem_report["flags"]:
+            st.warning(flag["message"])
+        if gem_report["effective_bets"] is not None:
+            st.caption(f"유효 독립 종목 수 {gem_report['effective_bets']} / {gem_report['symbols']} "
+                       f"(평균 상관 {gem_report['avg_corr']})")
     elif not st.session_state.gem_discovery_running and not st.session_state.gem_discovery_results:
         st.info("발굴된 종목이 없습니다. '보석 발굴 시작' 버튼을 눌러 다시 시도해 보세요.")
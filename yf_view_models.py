@@ -0,0 +1,263 @@
+import pandas as pd
+
+from sector_ranking import attach_sector_ranks
+
+# yf_streamlit_app 화면용 뷰 모델
+# Streamlit은 상호작용마다 스크립트 전체를 다시 실행하므로, 표/문구 생성은 여기서 한 번만 하고
+# 결과 버전(종목별 분석 버전, 보석 발굴 버전)이 바뀐 섹션만 다시 만듭니다.
+# 상세 보기는 블록 리스트로 표현합니다: ("markdown", 텍스트) / ("dataframe", DataFrame) / ("success"|"warning"|"error"|"info", 텍스트)
+
+
+# ✅ 버전 키 기반 메모이제이션 (cache: 세션에 보관하는 dict, 섹션 이름당 마지막 결과 1개만 유지)
+def memoize(cache: dict, name: str, key, builder, *args):
+    entry = cache.get(name)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+    value = builder(*args)
+    cache[name] = (key, value)
+    return value
+
+
+# ✅ 종목별 메모이제이션 (versions: {ticker: version}, 없어진 종목은 캐시에서 제거)
+def memoize_per_ticker(cache: dict, name: str, versions: dict, builder, results: dict):
+    entries = cache.get(name, {})
+    fresh = {}
+    for ticker, version in versions.items():
+        entry = entries.get(ticker)
+        if entry is None or entry[0] != version:
+            entry = (version, builder(results[ticker]))
+        fresh[ticker] = entry
+    cache[name] = fresh
+    return {ticker: entry[1] for ticker, entry in fresh.items()}
+
+
+def _score_sort_key(value):
+    # 점수 내림차순 정렬용 (점수 없음은 맨 뒤)
+    return -value if isinstance(value, (int, float)) and not pd.isna(value) else float("inf")
+
+
+# ✅ 핵심 요약 테이블 (관심 종목 전체 기준 섹터 내 백분위 포함, 점수 숫자 기준 정렬)
+def build_summary_view(results: list):
+    ranked_data = attach_sector_ranks(results)
+    rows = []
+    for data in sorted(ranked_data, key=lambda d: _score_sort_key(d.get("Score"))):
+        rows.append({
+            "종목": data.get("ticker"),
+            "섹터": data.get("sector") or "N/A",
+            "현재가": f"${data.get('current_price'):.2f}" if data.get('current_price') is not None else "N/A",
+            "점수": f"{data.get('Score'):.1f}" if data.get('Score') is not None else "N/A",
+            "섹터 내 점수 백분위(%)": f"{data.get('Score_Sector_Pct'):.0f}" if data.get('Score_Sector_Pct') is not None else "N/A",
+            "추천": data.get("Recommendation")
+        })
+    return pd.DataFrame(rows)
+
+
+def _indicator_table(labels: list, values: list):
+    return pd.DataFrame({"지표": labels, "값": values})
+
+
+def _support_message(current_price, support_1st, support_2nd, support_3rd):
+    if current_price is None or support_1st is None or support_2nd is None or support_3rd is None:
+        return "info", "지지선 정보를 불러올 수 없습니다. (데이터 부족 또는 계산 오류)"
+    if current_price >= support_1st:
+        return "success", f"**현재 가격 (${current_price:.2f})**은 1차 지지선 (${support_1st:.2f}) 위에 있습니다. 긍정적인 신호입니다."
+    elif current_price >= support_2nd and current_price < support_1st:
+        return "warning", f"**현재 가격 (${current_price:.2f})**은 1차 지지선 (${support_1st:.2f}) 아래에 있지만, 2차 지지선 (${support_2nd:.2f}) 위에 있습니다. 2차 지지선에서의 반등을 기대할 수 있습니다."
+    elif current_price >= support_3rd and current_price < support_2nd:
+        return "warning", f"**현재 가격 (${current_price:.2f})**은 2차 지지선 (${support_2nd:.2f}) 아래에 있지만, 3차 지지선 (${support_3rd:.2f}) 위에 있습니다. 장기 지지선에서의 반등을 기대할 수 있습니다."
+    elif current_price < support_3rd:
+        return "error", f"**현재 가격 (${current_price:.2f})**은 3차 지지선 (${support_3rd:.2f}) 아래에 있습니다. 장기 추세 이탈 가능성이 있으니 매우 주의가 필요합니다."
+    return "info", "현재 가격과 지지선 위치를 파악할 수 없습니다."
+
+
+def _resistance_message(current_price, resistance_1st, resistance_2nd, resistance_3rd):
+    if current_price is None or resistance_1st is None or resistance_2nd is None or resistance_3rd is None:
+        return "info", "저항선 정보를 불러올 수 없습니다. (데이터 부족 또는 계산 오류)"
+    if current_price <= resistance_1st:
+        return "success", f"**현재 가격 (${current_price:.2f})**은 1차 저항선 (${resistance_1st:.2f}) 아래에 있습니다. 상승 여력이 있을 수 있습니다."
+    elif current_price <= resistance_2nd and current_price > resistance_1st:
+        return "warning", f"**현재 가격 (${current_price:.2f})**은 1차 저항선 (${resistance_1st:.2f})을 돌파했지만, 2차 저항선 (${resistance_2nd:.2f}) 아래에 있습니다. 추가 상승 시 2차 저항선에 유의해야 합니다."
+    elif current_price <= resistance_3rd and current_price > resistance_2nd:
+        return "warning", f"**현재 가격 (${current_price:.2f})**은 2차 저항선 (${resistance_2nd:.2f})을 돌파했지만, 3차 저항선 (${resistance_3rd:.2f}) 아래에 있습니다. 장기 저항선 돌파 여부가 중요합니다."
+    elif current_price > resistance_3rd:
+        return "error", f"**현재 가격 (${current_price:.2f})**은 3차 저항선 (${resistance_3rd:.2f}) 위에 있습니다. 강한 상승 모멘텀이지만, 과열될 수 있으니 주의가 필요합니다."
+    return "info", "현재 가격과 저항선 위치를 파악할 수 없습니다."
+
+
+MTF_TIMEFRAME_LABELS = {"15m": "15분봉", "1h": "1시간봉", "1D": "일봉", "1W": "주봉"}
+
+
+def _fmt(value, pattern="{:.2f}"):
+    return pattern.format(value) if value is not None and not pd.isna(value) else "N/A"
+
+
+# 다중 시간대 지표 표 (시간대 × 지표, 계산된 시간대만)
+def _mtf_table(data: dict):
+    rows = []
+    for timeframe, label in MTF_TIMEFRAME_LABELS.items():
+        if data.get(f"Close_{timeframe}") is None:
+            continue
+        close, ma_20 = data.get(f"Close_{timeframe}"), data.get(f"MA_20_{timeframe}")
+        macd, signal = data.get(f"MACD_{timeframe}"), data.get(f"MACD_Signal_{timeframe}")
+        if None in (ma_20, macd, signal):
+            trend = "N/A"
+        else:
+            trend = "상승" if close > ma_20 and macd > signal else ("하락" if close < ma_20 and macd < signal else "혼조")
+        rows.append({
+            "시간대": label,
+            "종가": _fmt(close, "${:.2f}"),
+            "RSI(14)": _fmt(data.get(f"RSI_14_{timeframe}")),
+            "Stoch K": _fmt(data.get(f"Stoch_K_{timeframe}")),
+            "MACD": _fmt(macd),
+            "MACD Signal": _fmt(signal),
+            "20봉 MA": _fmt(ma_20, "${:.2f}"),
+            "거래량 배율": _fmt(data.get(f"Volume_Rate_{timeframe}"), "{:.2f}x"),
+            "추세": trend,
+        })
+    return pd.DataFrame(rows)
+
+
+# ✅ 개별 종목 지표 상세 보기 (블록 리스트)
+def build_detail_view(data: dict):
+    t = data.get("ticker")
+    blocks = [("markdown", f"#### {t} - {data.get('Recommendation')} ({data.get('Score')}점)")]
+
+    # 가격/추세 지표
+    blocks.append(("markdown", "##### 📉 가격/추세 지표"))
+    blocks.append(("dataframe", _indicator_table(
+        ["현재가", "전일 종가", "5일 MA", "20일 MA", "60일 MA", "120일 MA", "추세"],
+        [
+            f"${data.get('current_price'):.2f}" if data.get('current_price') is not None else "N/A",
+            f"${data.get('prev_close_price'):.2f}" if data.get('prev_close_price') is not None else "N/A",
+            f"${data.get('MA_5'):.2f}" if data.get('MA_5') is not None else "N/A",
+            f"${data.get('MA_20'):.2f}" if data.get('MA_20') is not None else "N/A",
+            f"${data.get('MA_60'):.2f}" if data.get('MA_60') is not None else "N/A",
+            f"${data.get('MA_120'):.2f}" if data.get('MA_120') is not None else "N/A",
+            data.get("Trend", "N/A")
+        ]
+    )))
+
+    # 모멘텀/수급 지표
+    blocks.append(("markdown", "##### 📊 모멘텀/수급 지표"))
+    blocks.append(("dataframe", _indicator_table(
+        ["RSI(14)", "Stoch K", "Stoch D", "MACD", "MACD Signal", "MACD 추세", "거래량 배율", "거래대금(M$)"],
+        [
+            f"{data.get('RSI_14'):.2f}" if data.get('RSI_14') is not None else "N/A",
+            f"{data.get('Stoch_K'):.2f}" if data.get('Stoch_K') is not None else "N/A",
+            f"{data.get('Stoch_D'):.2f}" if data.get('Stoch_D') is not None else "N/A",
+            f"{data.get('MACD'):.2f}" if data.get('MACD') is not None else "N/A",
+            f"{data.get('MACD_Signal'):.2f}" if data.get('MACD_Signal') is not None else "N/A",
+            data.get("MACD_Trend", "N/A"),
+            f"{data.get('Volume_Rate'):.2f}x" if data.get('Volume_Rate') is not None else "N/A",
+            f"${data.get('Volume_Turnover_Million'):.2f}" if data.get('Volume_Turnover_Million') is not None else "N/A"
+        ]
+    )))
+
+    # 시장 위치/기타 지표
+    blocks.append(("markdown", "##### 📦 시장 위치/기타 지표"))
+    blocks.append(("dataframe", _indicator_table(
+        ["52주 고가 근접도(%)", "52주 저가 근접도(%)", "볼린저 상단", "볼린저 중간", "볼린저 하단", "현재가 BB 위치", "갭 상승률(%)", "3일 연속 마감"],
+        [
+            f"{data.get('High_Proximity_Pct'):.2f}" if data.get('High_Proximity_Pct') is not None else "N/A",
+            f"{data.get('Low_Proximity_Pct'):.2f}" if data.get('Low_Proximity_Pct') is not None else "N/A",
+            f"${data.get('BB_Upper'):.2f}" if data.get('BB_Upper') is not None else "N/A",
+            f"${data.get('BB_Middle'):.2f}" if data.get('BB_Middle') is not None else "N/A",
+            f"${data.get('BB_Lower'):.2f}" if data.get('BB_Lower') is not None else "N/A",
+            data.get("Price_Position", "N/A"),
+            f"{data.get('Gap_Up_Pct'):.2f}" if data.get('Gap_Up_Pct') is not None else "N/A",
+            data.get("Consecutive_Closes", "N/A")
+        ]
+    )))
+
+    # 옵션 정보
+    if data.get('option_expiry'):
+        blocks.append(("markdown", "##### 💹 옵션 정보"))
+        blocks.append(("dataframe", _indicator_table(
+            ["옵션 만기일", "최대 콜 스트라이크", "최대 콜 거래량", "최대 풋 스트라이크", "최대 풋 거래량"],
+            [
+                data.get('option_expiry', "N/A"),
+                f"${data.get('max_call_strike'):.2f}" if data.get('max_call_strike') is not None else "N/A",
+                f"{data.get('max_call_volume'):,}" if data.get('max_call_volume') is not None else "N/A",
+                f"${data.get('max_put_strike'):.2f}" if data.get('max_put_strike') is not None else "N/A",
+                f"{data.get('max_put_volume'):,}" if data.get('max_put_volume') is not None else "N/A"
+            ]
+        )))
+
+    # 뉴스 감성 (최근 헤드라인이 있을 때만)
+    if data.get("News_Count"):
+        blocks.append(("markdown", "##### 📰 뉴스 감성"))
+        blocks.append(("dataframe", _indicator_table(
+            ["감성 점수 (시간 감쇠)", "최근 기사 수", "뉴스 활성도"],
+            [_fmt(data.get("News_Sentiment"), "{:+.2f}"), str(data.get("News_Count")), _fmt(data.get("News_Buzz"))]
+        )))
+        for item in data.get("News_Headlines") or []:
+            blocks.append(("markdown", f"- ({item['compound']:+.2f}) {item['headline']} `{item['published'][:16]}`"))
+
+    # 다중 시간대 지표 (multi_timeframe 분석 결과가 있을 때만)
+    if data.get("MTF_Timeframes"):
+        blocks.append(("markdown", "##### ⏱️ 다중 시간대 지표"))
+        blocks.append(("dataframe", _mtf_table(data)))
+        blocks.append(("info", f"상승 추세 시간대: {data.get('MTF_Uptrend_Count')}/{data.get('MTF_Timeframes')}"))
+
+    # 지지선 정보
+    current_price = data.get('current_price')
+    support_1st = data.get('Support_1st')
+    support_2nd = data.get('Support_2nd')
+    support_3rd = data.get('Support_3rd')
+    blocks.append(("markdown", "---"))
+    blocks.append(("markdown", "##### 📍 현재 가격 및 지지선 위치"))
+    blocks.append(("dataframe", _indicator_table(
+        ["현재가", "1차 지지선", "2차 지지선", "3차 지지선"],
+        [
+            f"${current_price:.2f}" if current_price is not None else "N/A",
+            f"${support_1st:.2f}" if support_1st is not None else "N/A",
+            f"${support_2nd:.2f}" if support_2nd is not None else "N/A",
+            f"${support_3rd:.2f}" if support_3rd is not None else "N/A"
+        ]
+    )))
+    blocks.append(_support_message(current_price, support_1st, support_2nd, support_3rd))
+
+    # 저항선 정보
+    resistance_1st = data.get('Resistance_1st')
+    resistance_2nd = data.get('Resistance_2nd')
+    resistance_3rd = data.get('Resistance_3rd')
+    blocks.append(("markdown", "---"))
+    blocks.append(("markdown", "##### ⛰️ 현재 가격 및 저항선 위치"))
+    blocks.append(("dataframe", _indicator_table(
+        ["현재가", "1차 저항선", "2차 저항선", "3차 저항선"],
+        [
+            f"${current_price:.2f}" if current_price is not None else "N/A",
+            f"${resistance_1st:.2f}" if resistance_1st is not None else "N/A",
+            f"${resistance_2nd:.2f}" if resistance_2nd is not None else "N/A",
+            f"${resistance_3rd:.2f}" if resistance_3rd is not None else "N/A"
+        ]
+    )))
+    blocks.append(_resistance_message(current_price, resistance_1st, resistance_2nd, resistance_3rd))
+
+    blocks.append(("markdown", "---"))  # 각 종목 상세 보기 구분선
+    return blocks
+
+
+# ✅ 발굴된 보석 종목 테이블 (점수 숫자 기준 정렬)
+def build_gem_view(gems: list):
+    gem_rows = []
+    for gem in sorted(gems, key=lambda x: _score_sort_key(x.get("Score"))):
+        market_cap_val = gem.get('MarketCap')
+        per_val = gem.get('PER')
+        psr_val = gem.get('PSR')
+
+        gem_rows.append({
+            "종목": gem.get("ticker"),
+            "현재가": f"${gem.get('current_price'):.2f}" if gem.get('current_price') is not None else "N/A",
+            "시총": f"{market_cap_val / 1_000_000_000:.2f}B" if market_cap_val is not None else "N/A",
+            "PER": f"{per_val:.2f}" if per_val is not None else "N/A",
+            "PSR": f"{psr_val:.2f}" if psr_val is not None else "N/A",
+            "52주 고점 근접도(%)": f"{gem.get('High_Proximity_Pct'):.2f}",
+            "RSI": f"{gem.get('RSI_14'):.2f}",
+            "점수": f"{gem.get('Score'):.1f}" if gem.get('Score') is not None else "N/A",
+            "섹터 내 점수 백분위(%)": f"{gem.get('Score_Sector_Pct'):.0f}" if gem.get('Score_Sector_Pct') is not None else "N/A",
+            "섹터 내 52주 고점 대비 하락 백분위(%)": f"{gem.get('High_Gap_Sector_Pct'):.0f}" if gem.get('High_Gap_Sector_Pct') is not None else "N/A",
+            "상관 묶음": gem.get("Corr_Cluster") if gem.get("Corr_Cluster") is not None else "N/A",
+            "추천": gem.get("Recommendation")
+        })
+    return pd.DataFrame(gem_rows)